@@ -0,0 +1,97 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+# Modules a lightweight worker imports, with the most milliseconds their import may take.
+# None of them may load pandas.
+IMPORT_BUDGETS_MS = {
+    'schwab_python_api.authentication': 200,
+    'schwab_python_api.transport': 200,
+    'schwab_python_api.decoding': 60,
+    'schwab_python_api.market_data': 250,
+    'schwab_python_api.accounts': 250,
+    'schwab_python_api.async_market_data': 250,
+    'schwab_python_api.orders': 250,
+    'schwab_python_api.transactions': 250,
+}
+
+# Modules that must stay out of sys.modules after importing the core modules
+HEAVY_MODULES = ['pandas']
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+def measureImport(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        dict: Cumulative import milliseconds of the module and the HEAVY_MODULES it loaded.
+    """
+    code = f"import sys, {module}; print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+
+    cumulativeUs = None
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is not None and match.group(4) == module:
+            cumulativeUs = int(match.group(2))
+
+    loaded = result.stdout.strip()
+    return {
+        'milliseconds': cumulativeUs / 1000 if cumulativeUs is not None else None,
+        'heavyModules': loaded.split(',') if loaded else [],
+    }
+
+def runImportBenchmark(modules=None, repeat=5):
+    """
+    Measure each module's import time as the minimum over several fresh interpreters.
+
+    Args:
+        modules (list, optional): Modules to measure. Defaults to IMPORT_BUDGETS_MS.
+        repeat (int, optional): Number of interpreters per module.
+
+    Returns:
+        dict: Keyed by module, with milliseconds, heavyModules, budgetMilliseconds and passed.
+    """
+    if modules is None:
+        modules = list(IMPORT_BUDGETS_MS)
+
+    results = {}
+    for module in modules:
+        runs = [measureImport(module) for i in range(repeat)]
+        milliseconds = min(run['milliseconds'] for run in runs)
+        budget = IMPORT_BUDGETS_MS.get(module)
+        results[module] = {
+            'milliseconds': milliseconds,
+            'heavyModules': runs[0]['heavyModules'],
+            'budgetMilliseconds': budget,
+            'passed': not runs[0]['heavyModules'] and (budget is None or milliseconds <= budget),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time regression benchmark of the pandas-free core modules.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON lines file the run is appended to.')
+    args = parser.parse_args()
+
+    results = runImportBenchmark(repeat=args.repeat)
+    for module, result in results.items():
+        status = 'ok' if result['passed'] else 'FAIL'
+        heavy = f" loads {', '.join(result['heavyModules'])}" if result['heavyModules'] else ''
+        print(f"{status:4} {module}: {result['milliseconds']:.1f} ms (budget {result['budgetMilliseconds']} ms){heavy}")
+
+    if args.output is not None:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps({'timestamp': datetime.now(timezone.utc).isoformat(), 'python': sys.version.split()[0], 'results': results}) + '\n')
+
+    sys.exit(0 if all(result['passed'] for result in results.values()) else 1)
+
+if __name__ == '__main__':
+    main()
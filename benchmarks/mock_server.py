@@ -0,0 +1,241 @@
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from benchmarks import payloads
+
+# Frequency types the price history endpoint accepts per period type, periodType defaults to day
+PRICE_HISTORY_FREQUENCY_TYPES = {
+    'day': ['minute'],
+    'month': ['daily', 'weekly'],
+    'year': ['daily', 'weekly', 'monthly'],
+    'ytd': ['daily', 'weekly'],
+}
+
+class MockSchwabServer:
+    def __init__(self, profile='small', latency=0.0, recordedDir=None, host='127.0.0.1', port=0):
+        """
+        Initialize a local stand-in for the Schwab market data and trader APIs.
+
+        Responses are synthetic payloads of the given profile, or recorded JSON responses named
+        <endpoint>.json in recordedDir (chains, pricehistory, quotes, expirationchain, accounts,
+        accountNumbers). Bodies are encoded once up front and gzip-compressed when the client
+        accepts it, so the server itself adds as little time as possible.
+
+        Price history requests are validated like the real endpoint and their candles are filtered
+        to startDate and endDate. Every request is logged in requests as (endpoint, path, params), and
+        status codes queued in failures[endpoint] are returned, one per request, instead of the payload.
+
+        Orders are accepted like the trader API: place (POST) and replace (PUT) answer 201 with the
+        new order in the Location header, cancel (DELETE) answers 200. Their bodies are logged in
+        orders as (method, path, order).
+
+        Args:
+            profile (str, optional): Payload size profile from payloads.PROFILES.
+            latency (float, optional): Seconds added before every response.
+            recordedDir (str, optional): Directory of recorded responses that override the synthetic ones.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on. 0 picks a free port.
+        """
+        self.latency = latency
+        self.bodies = {}
+        self.requestCount = 0
+        self.requests = []
+        self.failures = {}
+        self.orders = []
+        self.nextOrderId = 1000
+        self.lock = threading.Lock()
+
+        self._setBody('chains', payloads.optionChain(profile))
+        self.priceHistory = payloads.priceHistory(profile)
+        self._setBody('pricehistory', self.priceHistory)
+        self._setBody('expirationchain', payloads.expirationChain())
+        account = payloads.accountPositions(profile)
+        self._setBody('account', account)
+        self._setBody('accounts', [account])
+        self._setBody('accountNumbers', [{'accountNumber': account['securitiesAccount']['accountNumber'], 'hashValue': 'HASH'}])
+        self._setBody('orders', [])
+
+        if recordedDir is not None:
+            for filename in os.listdir(recordedDir):
+                name, extension = os.path.splitext(filename)
+                if extension == '.json':
+                    with open(os.path.join(recordedDir, filename), 'r') as f:
+                        payload = json.load(f)
+                    self._setBody(name, payload)
+                    if name == 'pricehistory':
+                        self.priceHistory = payload
+
+        self.server = ThreadingHTTPServer((host, port), self._handlerClass())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def _setBody(self, name, payload):
+        body = json.dumps(payload).encode()
+        self.bodies[name] = (body, gzip.compress(body, compresslevel=1))
+
+    @property
+    def baseUrl(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _route(self, path, query):
+        """
+        Map a request to its endpoint name and, for generated responses, its payload. A payload of None serves the stored body.
+        """
+        parts = path.strip('/').split('/')
+        if parts[:2] == ['marketdata', 'v1']:
+            endpoint = parts[2] if len(parts) > 2 else ''
+            if endpoint in ('chains', 'pricehistory', 'expirationchain'):
+                return endpoint, None
+            if endpoint == 'quotes':
+                symbols = query.get('symbols', [''])[0].split(',')
+                return 'quotes', payloads.quotes(symbols)
+            if len(parts) == 4 and parts[3] == 'quotes':
+                return 'quotes', payloads.quotes([parts[2]])
+        if parts[:2] == ['trader', 'v1'] and len(parts) > 2 and parts[2] == 'accounts':
+            if len(parts) == 3:
+                return 'accounts', None
+            if parts[3] == 'accountNumbers':
+                return 'accountNumbers', None
+            if len(parts) > 4 and parts[4] == 'orders':
+                return 'orders', None
+            return 'account', None
+        return None, None
+
+    def _priceHistoryResponse(self, query):
+        """
+        Validate the period and frequency of a price history request and cut the candles to its date range.
+
+        Returns:
+            tuple: (status, payload), with a payload of None to serve the stored body.
+        """
+        periodType = query.get('periodType', ['day'])[0]
+        frequencyType = query.get('frequencyType', [None])[0]
+        allowed = PRICE_HISTORY_FREQUENCY_TYPES.get(periodType)
+        if allowed is None or (frequencyType is not None and frequencyType not in allowed):
+            return 400, {'errors': [{'status': 400, 'title': 'Bad Request', 'detail': f"Invalid frequencyType {frequencyType} for periodType {periodType}"}]}
+
+        if 'startDate' not in query and 'endDate' not in query:
+            return 200, None
+        startMs = int(query.get('startDate', [0])[0])
+        endMs = int(query.get('endDate', [2 ** 62])[0])
+        candles = [candle for candle in self.priceHistory['candles'] if startMs <= candle['datetime'] <= endMs]
+        return 200, {**self.priceHistory, 'candles': candles, 'empty': len(candles) == 0}
+
+    def _handlerClass(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, without TCP_NODELAY the body waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def do_PUT(self):
+                self._respond('PUT')
+
+            def do_DELETE(self):
+                self._respond('DELETE')
+
+            def _respond(self, method):
+                length = int(self.headers.get('Content-Length', 0))
+                requestBody = self.rfile.read(length) if length else b''
+                with mock.lock:
+                    mock.requestCount += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                endpoint, payload = mock._route(parsed.path, query)
+                with mock.lock:
+                    mock.requests.append((endpoint, parsed.path, {key: values[0] for key, values in query.items()}))
+                    queued = mock.failures.get(endpoint)
+                    status = queued.pop(0) if queued else 200
+
+                if endpoint is None or (method != 'GET' and endpoint != 'orders'):
+                    status = 404
+                elif status == 200 and endpoint == 'pricehistory':
+                    status, payload = mock._priceHistoryResponse(query)
+                elif status == 200 and method != 'GET':
+                    self._orderResponse(method, parsed.path, requestBody)
+                    return
+
+                if status != 200:
+                    body = json.dumps(payload if payload is not None else {'errors': [{'status': status}]}).encode()
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                if payload is None:
+                    body, compressed = mock.bodies[endpoint]
+                else:
+                    body = json.dumps(payload).encode()
+                    compressed = None
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if compressed is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = compressed
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _orderResponse(self, method, path, requestBody):
+                with mock.lock:
+                    mock.orders.append((method, path, json.loads(requestBody) if requestBody else None))
+                    orderId = mock.nextOrderId
+                    mock.nextOrderId += 1
+
+                if method == 'DELETE':
+                    self.send_response(200)
+                else:
+                    # Place and replace both create an order, announced in the Location header
+                    accountPath = path.split('/orders')[0]
+                    self.send_response(201)
+                    self.send_header('Location', f"{mock.baseUrl}{accountPath}/orders/{orderId}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        return Handler
+
+    def start(self):
+        """
+        Serve requests on a background thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name='mock-schwab-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve synthetic or recorded Schwab API payloads.')
+    parser.add_argument('--profile', default='small', choices=sorted(payloads.PROFILES))
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--recorded-dir', default=None)
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    server = MockSchwabServer(profile=args.profile, latency=args.latency, recordedDir=args.recorded_dir, port=args.port)
+    print(f"Serving {args.profile} payloads on {server.baseUrl}")
+    server.server.serve_forever()
@@ -0,0 +1,234 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+# Payload sizes per benchmark profile
+PROFILES = {
+    'small': {'expirations': 5, 'strikes': 40, 'candleDays': 20, 'positions': 50, 'quotes': 100},
+    'full': {'expirations': 40, 'strikes': 300, 'candleDays': 252 * 3, 'positions': 2000, 'quotes': 500},
+}
+
+def _optionContract(rng, underlying, putCall, expiry, daysToExpiration, strike, underlyingPrice):
+    intrinsic = underlyingPrice - strike if putCall == 'CALL' else strike - underlyingPrice
+    mid = max(intrinsic, 0) + rng.uniform(0.05, 20.0)
+    spread = rng.uniform(0.05, 1.0)
+    symbol = f"{underlying:<6}{expiry:%y%m%d}{putCall[0]}{int(strike * 1000):08d}"
+    return {
+        'putCall': putCall,
+        'symbol': symbol,
+        'description': f"{underlying} {expiry:%m/%d/%Y} {strike} {putCall[0]}",
+        'exchangeName': 'OPR',
+        'bid': round(mid - spread / 2, 2),
+        'ask': round(mid + spread / 2, 2),
+        'last': round(mid, 2),
+        'mark': round(mid, 2),
+        'bidSize': rng.randint(1, 500),
+        'askSize': rng.randint(1, 500),
+        'bidAskSize': '10X10',
+        'lastSize': rng.randint(0, 50),
+        'highPrice': round(mid * 1.1, 2),
+        'lowPrice': round(mid * 0.9, 2),
+        'openPrice': 0.0,
+        'closePrice': round(mid, 2),
+        'totalVolume': rng.randint(0, 20000),
+        'tradeTimeInLong': 1718900000000,
+        'quoteTimeInLong': 1718900000000,
+        'netChange': round(rng.uniform(-2, 2), 2),
+        'volatility': round(rng.uniform(8, 60), 3),
+        'delta': round(rng.uniform(0, 1) * (1 if putCall == 'CALL' else -1), 3),
+        'gamma': round(rng.uniform(0, 0.01), 4),
+        'theta': round(-rng.uniform(0, 5), 3),
+        'vega': round(rng.uniform(0, 10), 3),
+        'rho': round(rng.uniform(-1, 1), 3),
+        'openInterest': rng.randint(0, 50000),
+        'timeValue': round(mid - max(intrinsic, 0), 2),
+        'theoreticalOptionValue': round(mid, 2),
+        'theoreticalVolatility': 29.0,
+        'optionDeliverablesList': [{'symbol': underlying, 'assetType': 'INDEX', 'deliverableUnits': 100.0}],
+        'strikePrice': strike,
+        'expirationDate': f"{expiry:%Y-%m-%d}T20:00:00.000+00:00",
+        'daysToExpiration': daysToExpiration,
+        'expirationType': 'W',
+        'lastTradingDay': 1718928000000,
+        'multiplier': 100.0,
+        'settlementType': 'P',
+        'deliverableNote': '',
+        'percentChange': round(rng.uniform(-10, 10), 2),
+        'markChange': round(rng.uniform(-2, 2), 2),
+        'markPercentChange': round(rng.uniform(-10, 10), 2),
+        'intrinsicValue': round(intrinsic, 2),
+        'extrinsicValue': round(mid - max(intrinsic, 0), 2),
+        'optionRoot': underlying,
+        'exerciseType': 'E',
+        'high52Week': round(mid * 2, 2),
+        'low52Week': round(mid / 2, 2),
+        'nonStandard': False,
+        'pennyPilot': True,
+        'inTheMoney': intrinsic > 0,
+        'mini': False,
+    }
+
+def optionChain(profile='small', underlying='SPXW', underlyingPrice=5000.0, seed=1):
+    """
+    Build a synthetic /chains response with calls and puts on every strike of every expiration.
+    """
+    sizes = PROFILES[profile]
+    rng = random.Random(seed)
+    start = date(2024, 6, 21)
+    callMap = {}
+    putMap = {}
+    for e in range(sizes['expirations']):
+        expiry = start + timedelta(days=7 * e)
+        daysToExpiration = (expiry - date(2024, 6, 20)).days
+        key = f"{expiry:%Y-%m-%d}:{daysToExpiration}"
+        callMap[key] = {}
+        putMap[key] = {}
+        for s in range(sizes['strikes']):
+            strike = underlyingPrice - 5 * (sizes['strikes'] // 2) + 5 * s
+            callMap[key][f"{float(strike)}"] = [_optionContract(rng, underlying, 'CALL', expiry, daysToExpiration, float(strike), underlyingPrice)]
+            putMap[key][f"{float(strike)}"] = [_optionContract(rng, underlying, 'PUT', expiry, daysToExpiration, float(strike), underlyingPrice)]
+    return {
+        'symbol': underlying,
+        'status': 'SUCCESS',
+        'strategy': 'SINGLE',
+        'interval': 0.0,
+        'isDelayed': False,
+        'isIndex': True,
+        'interestRate': 5.0,
+        'underlyingPrice': underlyingPrice,
+        'volatility': 29.0,
+        'daysToExpiration': 0.0,
+        'numberOfContracts': 2 * sizes['expirations'] * sizes['strikes'],
+        'assetMainType': 'INDEX',
+        'assetSubType': '',
+        'isChainTruncated': False,
+        'callExpDateMap': callMap,
+        'putExpDateMap': putMap,
+    }
+
+def priceHistory(profile='small', symbol='SPY', seed=2):
+    """
+    Build a synthetic /pricehistory response of regular session minute candles.
+    """
+    sizes = PROFILES[profile]
+    rng = random.Random(seed)
+    candles = []
+    price = 400.0
+    day = datetime(2021, 1, 4, 14, 30, tzinfo=timezone.utc)
+    tradingDays = 0
+    while tradingDays < sizes['candleDays']:
+        if day.weekday() < 5:
+            epoch = int(day.timestamp() * 1000)
+            for minute in range(390):
+                change = rng.gauss(0, 0.05)
+                candles.append({
+                    'open': round(price, 2),
+                    'high': round(price + abs(change) + 0.01, 2),
+                    'low': round(price - abs(change) - 0.01, 2),
+                    'close': round(price + change, 2),
+                    'volume': rng.randint(100, 100000),
+                    'datetime': epoch + minute * 60000,
+                })
+                price += change
+            tradingDays += 1
+        day += timedelta(days=1)
+    return {'symbol': symbol, 'empty': False, 'previousClose': 400.0, 'previousCloseDate': 1609718400000, 'candles': candles}
+
+def accountPositions(profile='small', accountNumber='12345678', seed=3):
+    """
+    Build a synthetic /accounts/{accountNumber}?fields=positions response with option and equity positions.
+    """
+    sizes = PROFILES[profile]
+    rng = random.Random(seed)
+    positions = []
+    for i in range(sizes['positions']):
+        quantity = rng.randint(1, 100)
+        if i % 4 == 0:
+            instrument = {'assetType': 'EQUITY', 'cusip': f"{i:09d}", 'symbol': f"EQ{i}", 'netChange': 0.5}
+        else:
+            underlying = f"U{i % 50}"
+            expiry = date(2024, 7, 19) + timedelta(days=7 * (i % 20))
+            putCall = 'CALL' if i % 2 else 'PUT'
+            strike = 50 + (i % 100)
+            instrument = {
+                'assetType': 'OPTION',
+                'cusip': f"0{underlying}.{expiry:%m%d%y}{putCall[0]}{strike}",
+                'symbol': f"{underlying:<6}{expiry:%y%m%d}{putCall[0]}{strike * 1000:08d}",
+                'description': f"{underlying} {expiry:%m/%d/%Y} {strike} {putCall}",
+                'netChange': 0.1,
+                'type': 'VANILLA',
+                'putCall': putCall,
+                'underlyingSymbol': underlying,
+            }
+        positions.append({
+            'shortQuantity': 0.0 if i % 3 else float(quantity),
+            'averagePrice': round(rng.uniform(1, 100), 4),
+            'currentDayProfitLoss': round(rng.uniform(-100, 100), 2),
+            'currentDayProfitLossPercentage': round(rng.uniform(-5, 5), 2),
+            'longQuantity': float(quantity) if i % 3 else 0.0,
+            'settledLongQuantity': float(quantity) if i % 3 else 0.0,
+            'settledShortQuantity': 0.0 if i % 3 else float(quantity),
+            'instrument': instrument,
+            'marketValue': round(rng.uniform(100, 10000), 2),
+            'maintenanceRequirement': 0.0,
+            'averageLongPrice': 1.0,
+            'taxLotAverageLongPrice': 1.0,
+            'longOpenProfitLoss': 0.0,
+            'previousSessionLongQuantity': float(quantity),
+            'currentDayCost': 0.0,
+        })
+    return {'securitiesAccount': {'type': 'MARGIN', 'accountNumber': accountNumber, 'roundTrips': 0, 'isDayTrader': False, 'isClosingOnlyRestricted': False, 'pfcbFlag': False, 'positions': positions}}
+
+def quotes(symbols, seed=4):
+    """
+    Build a synthetic /quotes response for the requested symbols.
+    """
+    rng = random.Random(seed)
+    result = {}
+    for symbol in symbols:
+        price = rng.uniform(10, 500)
+        result[symbol] = {
+            'assetMainType': 'EQUITY',
+            'symbol': symbol,
+            'quoteType': 'NBBO',
+            'realtime': True,
+            'ssid': 0,
+            'quote': {
+                '52WeekHigh': round(price * 1.5, 2),
+                '52WeekLow': round(price * 0.5, 2),
+                'askPrice': round(price + 0.01, 2),
+                'askSize': rng.randint(1, 10),
+                'bidPrice': round(price - 0.01, 2),
+                'bidSize': rng.randint(1, 10),
+                'closePrice': round(price, 2),
+                'highPrice': round(price * 1.01, 2),
+                'lastPrice': round(price, 2),
+                'lastSize': rng.randint(1, 1000),
+                'lowPrice': round(price * 0.99, 2),
+                'mark': round(price, 2),
+                'netChange': 0.0,
+                'netPercentChange': 0.0,
+                'openPrice': round(price, 2),
+                'quoteTime': 1718900000000,
+                'totalVolume': rng.randint(1000, 10000000),
+                'tradeTime': 1718900000000,
+            },
+        }
+    return result
+
+def expirationChain(expirations=60):
+    """
+    Build a synthetic /expirationchain response.
+    """
+    start = date(2024, 6, 21)
+    return {
+        'status': 'SUCCESS',
+        'expirationList': [
+            {
+                'expirationDate': f"{start + timedelta(days=7 * i):%Y-%m-%d}",
+                'daysToExpiration': 7 * i + 1,
+                'expirationType': 'W' if i % 4 else 'S',
+                'standard': i % 4 == 0,
+            }
+            for i in range(expirations)
+        ],
+    }
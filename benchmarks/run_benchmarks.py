@@ -0,0 +1,234 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from benchmarks import payloads
+from benchmarks.mock_server import MockSchwabServer
+from schwab_python_api import decoding
+from schwab_python_api.accounts import Accounts, ACCOUNT_POSITIONS_SCHEMA
+from schwab_python_api.authentication import SchwabAuth
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.option_chain import OptionChainParser, OPTION_CHAIN_SCHEMA
+from schwab_python_api.utilities import PRICE_HISTORY_SCHEMA
+from schwab_python_api.rate_limiter import RequestScheduler
+from schwab_python_api.transport import SchwabTransport
+
+class PreloadedMarketData(MarketData):
+    """
+    MarketData whose price history requests return already decoded candles, to time frame construction alone.
+    """
+    def __init__(self, authInstance, candles):
+        super().__init__(authInstance)
+        self.candles = candles
+
+    def getPriceHistoryCandles(self, symbol, **kwargs):
+        return self.candles
+
+def makeClients(server, concurrency):
+    # The mock server is not rate limited, so lift the client-side quotas
+    unlimited = {'requestsPerMinute': 1e12, 'burst': 1e12}
+    scheduler = RequestScheduler(quotas={'marketdata': unlimited, 'trader': unlimited})
+    transport = SchwabTransport(poolMaxSize=concurrency, scheduler=scheduler)
+
+    auth = SchwabAuth('benchmark', 'benchmark', 'https://127.0.0.1', transport=transport)
+    auth.accessToken = 'benchmark'
+    auth.accessTokenExpiry = time.time() + 10 ** 9
+
+    marketData = MarketData(auth)
+    marketData.baseUrl = f"{server.baseUrl}/marketdata/v1"
+    accounts = Accounts(auth)
+    accounts.baseUrl = f"{server.baseUrl}/trader/v1"
+    return auth, marketData, accounts
+
+def timeCalls(function, iterations):
+    """
+    Call function iterations times and summarize the latencies, plus the peak traced memory of one extra call.
+    """
+    function()
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    return {
+        'meanSeconds': float(latencies.mean()),
+        'p50Seconds': float(np.percentile(latencies, 50)),
+        'p95Seconds': float(np.percentile(latencies, 95)),
+        'minSeconds': float(latencies.min()),
+        'peakMemoryBytes': int(peak),
+    }
+
+def requestsPerSecond(function, concurrency, requests):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda i: function(), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+def runBenchmarks(profile='small', latency=0.0, iterations=5, concurrency=8, throughputRequests=40):
+    server = MockSchwabServer(profile=profile, latency=latency).start()
+    try:
+        auth, marketData, accounts = makeClients(server, concurrency)
+
+        chainJson = payloads.optionChain(profile)
+        chainBody = json.dumps(chainJson).encode()
+        historyJson = payloads.priceHistory(profile)
+        historyBody = json.dumps(historyJson).encode()
+        positionsJson = payloads.accountPositions(profile)
+        positionsBody = json.dumps(positionsJson).encode()
+        preloaded = PreloadedMarketData(auth, historyJson['candles'])
+        symbols = [f"S{i:04d}" for i in range(payloads.PROFILES[profile]['quotes'])]
+
+        # name: (end-to-end call, parse-only call, decode-only call, rows produced)
+        cases = {
+            'getOptionChains': (
+                lambda: marketData.getOptionChains('SPX'),
+                lambda: OptionChainParser().parse(chainJson),
+                lambda: decoding.decodeJson(chainBody, OPTION_CHAIN_SCHEMA),
+                len(OptionChainParser().parse(chainJson).index),
+            ),
+            'getOptionChains[splitLegs]': (
+                lambda: marketData.getOptionChains('SPX', splitLegs=True),
+                lambda: OptionChainParser().parseLegs(chainJson),
+                lambda: decoding.decodeJson(chainBody, OPTION_CHAIN_SCHEMA),
+                2 * len(OptionChainParser().parseLegs(chainJson)[0].index),
+            ),
+            'getPriceHistory': (
+                lambda: marketData.getPriceHistory('SPY'),
+                lambda: preloaded.getPriceHistory('SPY'),
+                lambda: decoding.decodeJson(historyBody, PRICE_HISTORY_SCHEMA),
+                len(historyJson['candles']),
+            ),
+            'getPriceHistory[epoch]': (
+                lambda: marketData.getPriceHistory('SPY', outputFormat='epoch'),
+                lambda: preloaded.getPriceHistory('SPY', outputFormat='epoch'),
+                lambda: decoding.decodeJson(historyBody, PRICE_HISTORY_SCHEMA),
+                len(historyJson['candles']),
+            ),
+            'getPriceHistory[numpy]': (
+                lambda: marketData.getPriceHistory('SPY', outputFormat='numpy'),
+                lambda: preloaded.getPriceHistory('SPY', outputFormat='numpy'),
+                lambda: decoding.decodeJson(historyBody, PRICE_HISTORY_SCHEMA),
+                len(historyJson['candles']),
+            ),
+            'getFormattedPositions': (
+                lambda: accounts.getFormattedPositions('HASH'),
+                lambda: accounts.formatPositions(positionsJson),
+                lambda: decoding.decodeJson(positionsBody, ACCOUNT_POSITIONS_SCHEMA),
+                len(positionsJson['securitiesAccount']['positions']),
+            ),
+            'getQuotesBulk': (
+                lambda: marketData.getQuotesBulk(symbols),
+                None,
+                None,
+                len(symbols),
+            ),
+            'getOptionExpirations': (
+                lambda: marketData.getOptionExpirations('SPX'),
+                None,
+                None,
+                len(payloads.expirationChain()['expirationList']),
+            ),
+            'getOptionExpirationsBulk': (
+                lambda: marketData.getOptionExpirationsBulk(symbols[:20]),
+                None,
+                None,
+                len(symbols[:20]) * len(payloads.expirationChain()['expirationList']),
+            ),
+        }
+
+        results = {}
+        for name, (endToEnd, parseOnly, decodeOnly, rows) in cases.items():
+            result = {'rows': rows, 'endToEnd': timeCalls(endToEnd, iterations)}
+            if parseOnly is not None:
+                result['parseOnly'] = timeCalls(parseOnly, iterations)
+                result['parseOnly']['rowsPerSecond'] = rows / result['parseOnly']['meanSeconds']
+            if decodeOnly is not None:
+                result['decodeOnly'] = timeCalls(decodeOnly, iterations)
+            result['requestsPerSecond'] = requestsPerSecond(endToEnd, concurrency, throughputRequests)
+            results[name] = result
+            print(f"{name}: end-to-end {result['endToEnd']['meanSeconds'] * 1000:.1f} ms, {result['requestsPerSecond']:.1f} req/s")
+
+        results['connectionStats'] = auth.transport.getConnectionStats()
+    finally:
+        server.stop()
+
+    return results
+
+def gitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def compareWithPrevious(output, run):
+    """
+    Print the change in mean end-to-end and parse-only latency against the last run of the same profile in output.
+    """
+    previous = None
+    try:
+        with open(output, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['profile'] == run['profile'] and record['latency'] == run['latency']:
+                    previous = record
+    except FileNotFoundError:
+        return
+
+    if previous is None:
+        return
+
+    print(f"Compared with {previous['timestamp']} ({previous.get('gitCommit')}):")
+    for name, result in run['results'].items():
+        before = previous['results'].get(name)
+        if before is None or 'endToEnd' not in result:
+            continue
+        for metric in ('endToEnd', 'parseOnly'):
+            if metric in result and metric in before:
+                change = result[metric]['meanSeconds'] / before[metric]['meanSeconds'] - 1
+                print(f"  {name} {metric}: {change * 100:+.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the endpoint methods against a local mock Schwab server.')
+    parser.add_argument('--profile', default='small', choices=sorted(payloads.PROFILES))
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency injected by the mock server.')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--throughput-requests', type=int, default=40)
+    parser.add_argument('--output', default='benchmark_results.jsonl', help='JSON lines file the run is appended to.')
+    args = parser.parse_args()
+
+    results = runBenchmarks(profile=args.profile, latency=args.latency, iterations=args.iterations, concurrency=args.concurrency, throughputRequests=args.throughput_requests)
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'gitCommit': gitCommit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'jsonBackend': decoding.getBackend(),
+        'profile': args.profile,
+        'latency': args.latency,
+        'iterations': args.iterations,
+        'concurrency': args.concurrency,
+        'results': results,
+    }
+
+    compareWithPrevious(args.output, run)
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"Results appended to {args.output}")
+
+if __name__ == '__main__':
+    main()
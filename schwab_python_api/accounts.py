@@ -1,16 +1,58 @@
-import requests
 from schwab_python_api.utilities import Utilities
-import pandas as pd
+from schwab_python_api.decoding import decodeJson, recordSchema
+from schwab_python_api.transport import RequestError, raiseForStatus
+from concurrent.futures import ThreadPoolExecutor
+
+# Decoding schema of the position fields of an account response requested with fields='positions'
+POSITION_INSTRUMENT_SCHEMA = recordSchema('PositionInstrument', {
+    'assetType': 'str',
+    'cusip': 'str',
+    'symbol': 'str',
+    'description': 'str',
+    'instrumentId': 'int',
+    'netChange': 'float',
+    'type': 'str',
+    'putCall': 'str',
+    'underlyingSymbol': 'str',
+})
+POSITION_SCHEMA = recordSchema('Position', {
+    **{field: 'float' for field in [
+        'shortQuantity', 'averagePrice', 'currentDayProfitLoss', 'currentDayProfitLossPercentage',
+        'longQuantity', 'settledLongQuantity', 'settledShortQuantity', 'agedQuantity', 'marketValue',
+        'maintenanceRequirement', 'averageLongPrice', 'averageShortPrice', 'taxLotAverageLongPrice',
+        'taxLotAverageShortPrice', 'longOpenProfitLoss', 'shortOpenProfitLoss',
+        'previousSessionLongQuantity', 'previousSessionShortQuantity', 'currentDayCost',
+    ]},
+    'instrument': POSITION_INSTRUMENT_SCHEMA,
+})
+ACCOUNT_POSITIONS_SCHEMA = recordSchema('AccountPositions', {
+    'securitiesAccount': recordSchema('SecuritiesAccount', {'type': 'str', 'accountNumber': 'str', 'positions': list[POSITION_SCHEMA]}),
+})
+
+class SnapshotError(RequestError):
+    def __init__(self, message, failedAccountIDs, statusCode=None):
+        """
+        A portfolio snapshot in which some accounts could not be fetched.
+
+        Args:
+            message (str): Description of the failure.
+            failedAccountIDs (list): Encrypted IDs of the accounts without positions data, None for a failed all-accounts request.
+            statusCode (int, optional): The HTTP status of the first failure.
+        """
+        super().__init__(message, statusCode)
+        self.failedAccountIDs = failedAccountIDs
 
 class Accounts:
-    def __init__(self, authInstance):
+    def __init__(self, authInstance, transport=None):
         """
         Initialize the Accounts class with an authentication instance.
         
         Args:
             authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to authInstance.transport.
         """
         self.authInstance = authInstance
+        self.transport = transport if transport is not None else authInstance.transport
         self.baseUrl = "https://api.schwabapi.com/trader/v1"
         
     def getHeaders(self):
@@ -21,7 +63,7 @@ class Accounts:
             dict: A dictionary containing the authorization header.
         """
         return {
-            'Authorization': f"Bearer {self.authInstance.accessToken}"
+            'Authorization': f"Bearer {self.authInstance.getAccessToken()}"
         }
         
     def getAccountNumbers(self):
@@ -33,8 +75,10 @@ class Accounts:
             dict: The JSON response containing the account numbers and encrypted values.
         """
         url = f"{self.baseUrl}/accounts/accountNumbers"
-        response = requests.get(url, headers=self.getHeaders())
-        return response.json()
+        with self.transport.call('accountNumbers') as call:
+            response = self.transport.get(url, headers=self.getHeaders())
+            with call.phase('decode'):
+                return decodeJson(response.content)
     
     def getAccounts(self, fields=None):
         """
@@ -47,12 +91,14 @@ class Accounts:
             dict: The JSON response containing the Account information.
         """
         url = f"{self.baseUrl}/accounts"
-        if fields != None:
-            params = {'fields': fields}
-            response = requests.get(url, headers=self.getHeaders(), params=params)
-        else:
-            response = requests.get(url, headers=self.getHeaders())
-        return response.json()
+        with self.transport.call('accounts') as call:
+            if fields != None:
+                params = {'fields': fields}
+                response = self.transport.get(url, headers=self.getHeaders(), params=params)
+            else:
+                response = self.transport.get(url, headers=self.getHeaders())
+            with call.phase('decode'):
+                return decodeJson(response.content)
     
     def getSpecificAccounts(self, accountID, fields=None):
         """
@@ -66,45 +112,176 @@ class Accounts:
             dict: The JSON response containing the Account information.
         """
         url = f"{self.baseUrl}/accounts/{accountID}"
-        if fields != None:
-            params = {'fields': fields}
-            response = requests.get(url, headers=self.getHeaders(), params=params)
-        else:
-            response = requests.get(url, headers=self.getHeaders())
-        return response.json()
+        with self.transport.call('accounts') as call:
+            if fields != None:
+                params = {'fields': fields}
+                response = self.transport.get(url, headers=self.getHeaders(), params=params)
+            else:
+                response = self.transport.get(url, headers=self.getHeaders())
+            with call.phase('decode'):
+                return decodeJson(response.content)
     
-    def getFormattedPositions(self, accountID):
-        # Get Unformatted Options Positions
-        data = self.getSpecificAccounts(accountID=accountID,fields='positions')
+    def getFormattedPositions(self, accountID, asFrame=True):
+        """
+        Get the positions of an account as a formatted DataFrame.
+        
+        Args:
+            accountID (str): Encrypted ID of the account
+            asFrame (boolean, optional): Return a DataFrame. If False, return the flattened position records without importing pandas.
+        
+        Returns:
+            DataFrame: One row per position, empty if the account has no positions, or a list of dicts if asFrame is False.
+        
+        Raises:
+            RequestError: If the account could not be fetched.
+        """
+        with self.transport.call('accounts') as call:
+            # Get Unformatted Options Positions
+            data = self._getPositionsJson(accountID)
+            with call.phase('frame'):
+                return self.formatPositions(data, asFrame=asFrame)
+
+    def _getPositionsJson(self, accountID=None):
+        """
+        Get one account, or all linked accounts, with fields='positions' decoded into ACCOUNT_POSITIONS_SCHEMA.
+        Raises RequestError on a non-2xx response, whose error body would otherwise decode as an account without positions.
+        """
+        if accountID is None:
+            url = f"{self.baseUrl}/accounts"
+            schema = list[ACCOUNT_POSITIONS_SCHEMA]
+        else:
+            url = f"{self.baseUrl}/accounts/{accountID}"
+            schema = ACCOUNT_POSITIONS_SCHEMA
+
+        with self.transport.call('accounts') as call:
+            response = self.transport.get(url, headers=self.getHeaders(), params={'fields': 'positions'})
+            raiseForStatus(response)
+            with call.phase('decode'):
+                return decodeJson(response.content, schema)
+
+    def formatPositions(self, data, asFrame=True):
+        """
+        Flatten and format the positions of one or more account responses.
         
+        Args:
+            data (dict or list): An account JSON response requested with fields='positions', or a list of them.
+            asFrame (boolean, optional): Return a formatted DataFrame. If False, return the flattened records without importing pandas.
+        
+        Returns:
+            DataFrame: One row per position with its accountNumber, empty if there are no positions,
+                or a list of dicts with the accountNumber, instrument and position fields if asFrame is False.
+        """
+        if not isinstance(data, list):
+            data = [data]
+
         # Extract Options Contract Data and Add to Dataframe
         flattened_products = []
-        if data is not None and 'securitiesAccount' in data and 'positions' in data['securitiesAccount']:
-            for position in data['securitiesAccount']['positions']:
-                product_dict = position['instrument']
-                flattened_products.append({**product_dict, **position})
+        for account in data:
+            if account is not None and 'securitiesAccount' in account and 'positions' in account['securitiesAccount']:
+                accountNumber = account['securitiesAccount'].get('accountNumber')
+                for position in account['securitiesAccount']['positions']:
+                    product_dict = position['instrument']
+                    flattened_products.append({'accountNumber': accountNumber, **product_dict, **position})
 
-            df_products = pd.DataFrame(flattened_products)
-        
-        # Extract Expiration Date and Strike from Contract Data
-        util = Utilities()
-        df_positions_raw = util.extractOptionsContractSpecifications(df_products)
+        if not asFrame:
+            return flattened_products
+
+        import pandas as pd
+        if len(flattened_products) == 0:
+            return pd.DataFrame()
+
+        df_products = pd.DataFrame(flattened_products)
         
         # Format Positions Dataframe with Common Headings
-        df_positions = self.formatPositionsDataFrame(df_positions_raw)
+        df_positions = self.formatPositionsDataFrame(df_products)
         return df_positions
-    
+
+    def getPortfolioSnapshot(self, accountIDs=None, maxWorkers=4, returnFailed=False):
+        """
+        Get the positions of several accounts as one consolidated table.
+        
+        Without accountIDs all linked accounts are fetched with a single getAccounts(fields='positions')
+        call. With accountIDs the accounts are fetched concurrently, one request each. If an account
+        cannot be fetched, a SnapshotError listing it in failedAccountIDs is raised, unless returnFailed is set.
+        
+        Args:
+            accountIDs (list, optional): Encrypted IDs of the accounts. Defaults to all linked accounts.
+            maxWorkers (int, optional): Number of accounts fetched concurrently.
+            returnFailed (boolean, optional): Return the positions of the fetched accounts along with the fetched account numbers and the failed account IDs instead of raising.
+        
+        Returns:
+            DataFrame: One row per position, indexed by accountNumber and contractSpec.
+                With returnFailed, a (snapshot, fetchedAccountNumbers, failedAccountIDs) tuple.
+        """
+        failedAccountIDs = []
+        errors = []
+        if accountIDs is None:
+            try:
+                data = self._getPositionsJson()
+            except RequestError as Error:
+                data = []
+                failedAccountIDs.append(None)
+                errors.append(Error)
+        else:
+            def fetch(accountID):
+                try:
+                    return self._getPositionsJson(accountID)
+                except RequestError as Error:
+                    return Error
+
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                results = list(executor.map(fetch, accountIDs))
+            data = []
+            for accountID, result in zip(accountIDs, results):
+                if isinstance(result, RequestError):
+                    failedAccountIDs.append(accountID)
+                    errors.append(result)
+                else:
+                    data.append(result)
+
+        if failedAccountIDs and not returnFailed:
+            raise SnapshotError(f"Schwab API getPortfolioSnapshot Failure: {len(failedAccountIDs)} account request(s) failed: {errors[0]}", failedAccountIDs, errors[0].statusCode)
+
+        # Accounts without positions still count as fetched, so their positions are known to be gone
+        fetchedAccountNumbers = [account['securitiesAccount'].get('accountNumber') for account in data
+                                 if account is not None and 'securitiesAccount' in account]
+
+        import pandas as pd
+        df_positions = self.formatPositions(data)
+        if len(df_positions.index) == 0:
+            df_positions = pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=['accountNumber', 'contractSpec']))
+        else:
+            # Schwab reports one position per instrument and account, keep the index unique regardless
+            df_positions.set_index(['accountNumber', 'contractSpec'], inplace=True)
+            df_positions = df_positions[~df_positions.index.duplicated(keep='first')].sort_index()
+
+        if returnFailed:
+            return df_positions, fetchedAccountNumbers, failedAccountIDs
+        return df_positions
+
     def formatPositionsDataFrame(self, df_positions_raw):
+        """
+        Add contract specification columns and common headings to flattened positions.
+        
+        Args:
+            df_positions_raw (DataFrame): Flattened positions with the instrument symbol in the 'symbol' column.
         
+        Returns:
+            DataFrame: The positions with expiry, expiryYear/Month/Day, strikePrice and quantity columns.
+                expiry is datetime64 (NaT for non-option positions); it used to be a '%d-%b-%y' string,
+                format it with df['expiry'].dt.strftime('%d-%b-%y') where the string is needed.
+        """
+        # Extract Expiration Date and Strike from Contract Data in one pass over the distinct symbols
+        contracts = Utilities().parseOsiSymbols(df_positions_raw['symbol'], fields=['expiry', 'strike'])
+        df_positions_raw['expiry'] = contracts['expiry']
+        df_positions_raw['strikePrice'] = contracts['strike']
+
         df_positions_raw.rename(columns={
             'symbol': 'contractSpec', 
             'underlyingSymbol': 'symbol', 
             'putCall': 'callPut', 
             }, inplace=True)
         
-        # Convert 'expiry' column to datetime format
-        df_positions_raw['expiry'] = pd.to_datetime(df_positions_raw['expiry'], format='%d-%b-%y')
-
         # Extract year, month, and day components
         df_positions_raw['expiryYear'] = df_positions_raw['expiry'].dt.year
         df_positions_raw['expiryMonth'] = df_positions_raw['expiry'].dt.month
@@ -112,13 +289,7 @@ class Accounts:
         
         df_positions_raw['quantity'] = df_positions_raw['longQuantity'] - df_positions_raw['shortQuantity']
 
-        # Format the 'expiry' column
-        df_positions_raw['expiry'] = df_positions_raw['expiry'].dt.strftime('%d-%b-%y')
-        
         # Replace 'symbol' values with 'contractSpec' values where 'assetType' is 'EQUITY'
         df_positions_raw.loc[df_positions_raw['assetType'].isin(['EQUITY', 'COLLECTIVE_INVESTMENT', 'MUTUAL_FUND', 'INDEX']), 'symbol'] = df_positions_raw['contractSpec']
         
         return df_positions_raw
-        
-        
-    
\ No newline at end of file
@@ -0,0 +1,197 @@
+import asyncio
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from schwab_python_api.market_data import MarketData
+
+class AsyncMarketData:
+    def __init__(self, authInstance, maxConcurrency=10, transport=None, cache=None):
+        """
+        Initialize the asyncio counterpart of MarketData.
+
+        Each coroutine runs the matching MarketData method on a worker thread over the shared
+        pooled transport, so results are the same DataFrames and dicts the sync API returns.
+
+        Args:
+            authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            maxConcurrency (int, optional): Maximum number of requests in flight at once.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to the transport of authInstance.
+            cache (ResponseCache, optional): Response cache shared by the worker threads.
+        """
+        self.marketData = MarketData(authInstance, transport=transport, cache=cache)
+        self.maxConcurrency = maxConcurrency
+        self.executor = ThreadPoolExecutor(max_workers=maxConcurrency, thread_name_prefix='schwab-async')
+        # A semaphore is bound to the loop it is first used on, so keep one per running loop
+        self.semaphores = weakref.WeakKeyDictionary()
+
+        # Keep enough keep-alive connections around for every concurrent request
+        if self.marketData.transport.poolMaxSize < maxConcurrency:
+            warnings.warn(f"AsyncMarketData: transport pool size {self.marketData.transport.poolMaxSize} is smaller than maxConcurrency {maxConcurrency}, extra connections will not be reused", stacklevel=2)
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.maxConcurrency)
+
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, partial(method, *args, **kwargs))
+
+    async def getQuotes(self, symbols):
+        """
+        Get current quote for the specified symbols.
+
+        Args:
+            symbols (list): A list of symbols to get quote for.
+
+        Returns:
+            dict: The JSON response containing the quote.
+        """
+        return await self._run(self.marketData.getQuotes, symbols)
+
+    async def getQuote(self, symbol):
+        """
+        Get current quote for a single specified symbol.
+
+        Args:
+            symbol (str): A single symbol to get quote for.
+
+        Returns:
+            dict: The JSON response containing the quote.
+        """
+        return await self._run(self.marketData.getQuote, symbol)
+
+    async def getOptionExpirations(self, symbol):
+        """
+        Get option expirations for the specified symbol.
+
+        Args:
+            symbol (str): The symbol to get option expirations for.
+
+        Returns:
+            DataFrame: The option expirations.
+        """
+        return await self._run(self.marketData.getOptionExpirations, symbol)
+
+    async def getOptionChainJson(self, symbol, **filters):
+        """
+        Get the decoded option chain response for the specified symbol.
+
+        Args:
+            symbol (str): The symbol to get option chains for.
+            **filters: Optional parameters accepted by MarketData.getOptionChainJson.
+
+        Returns:
+            dict: The decoded option chain, or None on failure.
+        """
+        return await self._run(self.marketData.getOptionChainJson, symbol, **filters)
+
+    async def getOptionChains(self, symbol, fromDate=None, toDate=None, splitLegs=False, asFrame=True, contractType=None, strikeCount=None, strikeRange=None, strike=None, expMonth=None, optionType=None):
+        """
+        Get option chains for the specified symbol and expiration date.
+
+        Args:
+            symbol (str): The symbol to get option chains for.
+            fromDate (str, optional): The starting date expiration date for the options.
+            toDate (str, optional): The ending date expiration date for the options.
+            splitLegs (boolean, optional): Return the calls and puts as separate DataFrames.
+            asFrame (boolean, optional): Return DataFrames. If False, return NumPy columns per leg.
+            contractType (str, optional): CALL, PUT or ALL.
+            strikeCount (int, optional): Number of strikes above and below the at-the-money price.
+            strikeRange (str, optional): ITM, NTM, OTM, SAK, SBK, SNK or ALL.
+            strike (float, optional): Only this strike price.
+            expMonth (str, optional): Expiration month, JAN to DEC or ALL.
+            optionType (str, optional): S (standard), NS (non-standard) or ALL.
+
+        Returns:
+            DataFrame: The option chain.
+        """
+        return await self._run(self.marketData.getOptionChains, symbol, fromDate=fromDate, toDate=toDate, splitLegs=splitLegs, asFrame=asFrame,
+                                     contractType=contractType, strikeCount=strikeCount, strikeRange=strikeRange, strike=strike, expMonth=expMonth, optionType=optionType)
+
+    async def getPriceHistory(self, symbol, **kwargs):
+        """
+        Get price history for the specified symbol.
+
+        Args:
+            symbol (str): The symbol to get price history for.
+            **kwargs: Optional parameters accepted by MarketData.getPriceHistory.
+
+        Returns:
+            DataFrame: The price history.
+        """
+        return await self._run(self.marketData.getPriceHistory, symbol, **kwargs)
+
+    async def _gather(self, method, symbols, **kwargs):
+        """
+        Run method for every symbol concurrently. A symbol whose call raises is reported and maps to None.
+        """
+        results = await asyncio.gather(*[method(symbol, **kwargs) for symbol in symbols], return_exceptions=True)
+        gathered = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Schwab API {method.__name__} Failure: Ticker: {symbol}: {result}")
+                result = None
+            elif isinstance(result, BaseException):
+                raise result
+            gathered[symbol] = result
+        return gathered
+
+    async def gatherQuote(self, symbols):
+        """
+        Fetch single-symbol quotes for many symbols concurrently.
+
+        Args:
+            symbols (list): The symbols to get quotes for.
+
+        Returns:
+            dict: Quote JSON keyed by symbol, None for symbols whose request failed.
+        """
+        return await self._gather(self.getQuote, symbols)
+
+    async def gatherOptionExpirations(self, symbols):
+        """
+        Fetch option expirations for many symbols concurrently.
+
+        Args:
+            symbols (list): The symbols to get option expirations for.
+
+        Returns:
+            dict: Expiration DataFrames keyed by symbol, None for symbols whose request failed.
+        """
+        return await self._gather(self.getOptionExpirations, symbols)
+
+    async def gatherOptionChains(self, symbols, fromDate=None, toDate=None, **kwargs):
+        """
+        Fetch option chains for many symbols concurrently.
+
+        Args:
+            symbols (list): The symbols to get option chains for.
+            fromDate (str, optional): The starting date expiration date for the options.
+            toDate (str, optional): The ending date expiration date for the options.
+            **kwargs: Optional parameters accepted by getOptionChains.
+
+        Returns:
+            dict: Option chain DataFrames keyed by symbol, None for symbols whose request failed.
+        """
+        return await self._gather(self.getOptionChains, symbols, fromDate=fromDate, toDate=toDate, **kwargs)
+
+    async def gatherPriceHistory(self, symbols, **kwargs):
+        """
+        Fetch price history for many symbols concurrently.
+
+        Args:
+            symbols (list): The symbols to get price history for.
+            **kwargs: Optional parameters accepted by MarketData.getPriceHistory.
+
+        Returns:
+            dict: Price history DataFrames keyed by symbol, None for symbols whose request failed.
+        """
+        return await self._gather(self.getPriceHistory, symbols, **kwargs)
+
+    def close(self):
+        """
+        Shut down the worker threads.
+        """
+        self.executor.shutdown(wait=False)
@@ -1,12 +1,16 @@
-import requests
 import base64
 import urllib
 from urllib.parse import urlencode, unquote
 import webbrowser
 import json
+import os
+import tempfile
+import threading
+import time
+from schwab_python_api.transport import SchwabTransport
 
 class SchwabAuth:
-    def __init__(self, clientId, clientSecret, redirectUri):
+    def __init__(self, clientId, clientSecret, redirectUri, transport=None):
         self.clientId = clientId
         self.clientSecret = clientSecret
         self.redirectUri = redirectUri
@@ -16,6 +20,15 @@ class SchwabAuth:
         self.refreshToken = None
         self.id_token = None
         self.tokenFilename = 'schwab_token.json'
+        # Access token lifecycle: expiry in epoch seconds and how early to refresh before it
+        self.accessTokenExpiry = None
+        self.refreshMargin = 300
+        self.minimumValidity = 60
+        self.tokenLock = threading.Lock()
+        self.refreshThread = None
+        self.stopRefreshEvent = threading.Event()
+        # Pooled HTTP transport shared with the MarketData and Accounts clients
+        self.transport = transport if transport is not None else SchwabTransport()
 
     def getAuthUrl(self):
         params = {
@@ -39,12 +52,9 @@ class SchwabAuth:
             'code': authorizationCode,
             'redirect_uri': self.redirectUri
         }
-        response = requests.post(self.tokenUrl, headers=headers, data=data)
+        response = self.transport.post(self.tokenUrl, headers=headers, data=data)
         if response.status_code == 200:
-            tokens = response.json()
-            self.accessToken = tokens['access_token']
-            self.refreshToken = tokens['refresh_token']
-            self.id_token = tokens['id_token']
+            self.storeTokens(response.json())
         else:
             raise Exception(f"Failed to obtain tokens: {response.text}")
 
@@ -58,11 +68,9 @@ class SchwabAuth:
             'grant_type': 'refresh_token',
             'refresh_token': self.refreshToken
         }
-        response = requests.post(self.tokenUrl, headers=headers, data=data)
+        response = self.transport.post(self.tokenUrl, headers=headers, data=data)
         if response.status_code == 200:
-            tokens = response.json()
-            self.accessToken = tokens['access_token']
-
+            self.storeTokens(response.json())
         else:
             raise Exception(f"Failed to refresh access token: {response.text}")
         
@@ -91,27 +99,142 @@ class SchwabAuth:
 
         self.saveTokenFile()
         
+    def storeTokens(self, tokens):
+        """
+        Record the tokens of a token endpoint response along with the access token expiry.
+        
+        Args:
+            tokens (dict): The JSON response of the token endpoint.
+        """
+        self.accessToken = tokens['access_token']
+        self.accessTokenExpiry = time.time() + tokens.get('expires_in', 1800)
+        if 'refresh_token' in tokens:
+            self.refreshToken = tokens['refresh_token']
+        if 'id_token' in tokens:
+            self.id_token = tokens['id_token']
+
+    def isAccessTokenValid(self, minimumValidity=None):
+        """
+        Check whether the access token is present and valid for at least minimumValidity seconds.
+        
+        Args:
+            minimumValidity (float, optional): Seconds the token must remain valid. Defaults to self.minimumValidity.
+        
+        Returns:
+            bool: True if the access token can be used.
+        """
+        if minimumValidity is None:
+            minimumValidity = self.minimumValidity
+        if self.accessToken is None:
+            return False
+        # Tokens assigned by hand carry no expiry, trust them as before
+        if self.accessTokenExpiry is None:
+            return True
+        return self.accessTokenExpiry - time.time() > minimumValidity
+
     def saveTokenFile(self):
+        """
+        Persist the refresh token, access token and access token expiry.
+        
+        The file is written to a temporary file and moved into place so concurrent readers never see a partial file.
+        """
         infoToSerialize = {
             'refresh_token': self.refreshToken,
+            'access_token': self.accessToken,
+            'access_token_expiry': self.accessTokenExpiry,
         }
         
-        serializedData = json.dumps(infoToSerialize)
-        
-        with open(self.tokenFilename, 'w', encoding='utf-8') as f:
-            json.dump(serializedData, f, ensure_ascii=False, indent=4)
+        directory = os.path.dirname(os.path.abspath(self.tokenFilename))
+        fd, tempFilename = tempfile.mkstemp(dir=directory, prefix='.schwab_token_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(infoToSerialize, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tempFilename, self.tokenFilename)
+        except BaseException:
+            os.remove(tempFilename)
+            raise
         
     def loadTokenFile(self):
+        """
+        Load persisted tokens. A persisted access token is only used while it is still valid.
+        """
         with open(self.tokenFilename, 'r') as f:
-            serializedData = json.load(f)
+            deserializedInfo = json.load(f)
             
-        deserializedInfo = json.loads(serializedData)
+        # Token files written by earlier versions hold a JSON encoded string
+        if isinstance(deserializedInfo, str):
+            deserializedInfo = json.loads(deserializedInfo)
         
         self.refreshToken = deserializedInfo['refresh_token']
+
+        accessToken = deserializedInfo.get('access_token')
+        accessTokenExpiry = deserializedInfo.get('access_token_expiry')
+        if accessToken is not None and accessTokenExpiry is not None and accessTokenExpiry > time.time():
+            self.accessToken = accessToken
+            self.accessTokenExpiry = accessTokenExpiry
+        
+    def getAccessToken(self, minimumValidity=None):
+        """
+        Get an access token valid for at least minimumValidity seconds, refreshing it if needed.
+        
+        Concurrent callers wait on a single refresh. Before refreshing, the token file is
+        re-read so a token already refreshed by another process is reused.
         
-    def getAccessToken(self):
-        if self.accessToken == None:
-            self.loadTokenFile()
+        Args:
+            minimumValidity (float, optional): Seconds the token must remain valid. Defaults to self.minimumValidity.
+        
+        Returns:
+            str: The access token.
+        """
+        if self.isAccessTokenValid(minimumValidity):
+            return self.accessToken
+
+        with self.tokenLock:
+            # Another caller may have refreshed while we waited for the lock
+            if self.isAccessTokenValid(minimumValidity):
+                return self.accessToken
+
+            if os.path.exists(self.tokenFilename) or self.refreshToken is None:
+                self.loadTokenFile()
+                if self.isAccessTokenValid(minimumValidity):
+                    return self.accessToken
+
             self.refreshAccessToken()
+            self.saveTokenFile()
             
-        return self.accessToken
\ No newline at end of file
+        return self.accessToken
+
+    def startAutoRefresh(self):
+        """
+        Start a background thread that refreshes the access token refreshMargin seconds before it expires.
+        """
+        if self.refreshThread is not None and self.refreshThread.is_alive():
+            return
+        
+        self.stopRefreshEvent.clear()
+        self.refreshThread = threading.Thread(target=self._autoRefreshLoop, name='schwab-token-refresh', daemon=True)
+        self.refreshThread.start()
+
+    def stopAutoRefresh(self):
+        """
+        Stop the background refresh thread.
+        """
+        self.stopRefreshEvent.set()
+        if self.refreshThread is not None:
+            self.refreshThread.join()
+            self.refreshThread = None
+
+    def _autoRefreshLoop(self):
+        while not self.stopRefreshEvent.is_set():
+            try:
+                self.getAccessToken(minimumValidity=self.refreshMargin)
+                if self.accessTokenExpiry is None:
+                    waitSeconds = self.refreshMargin
+                else:
+                    waitSeconds = self.accessTokenExpiry - self.refreshMargin - time.time()
+            except Exception as Error:
+                print(f"Unable to refresh access token. Error: {Error}")
+                waitSeconds = 30
+            self.stopRefreshEvent.wait(max(waitSeconds, 1))
@@ -0,0 +1,253 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+from schwab_python_api.utilities import Utilities, CANDLE_DTYPE
+
+class CandleCacheError(RuntimeError):
+    def __init__(self, message, failedRanges):
+        """
+        Raised when some missing ranges of a cache update could not be fetched.
+
+        Args:
+            message (str): Description of the failure.
+            failedRanges (list): (startMs, endMs, error) of every range that was not fetched.
+        """
+        super().__init__(message)
+        self.failedRanges = failedRanges
+
+class CandleCache:
+    def __init__(self, marketData, cacheDir='schwab_candle_cache'):
+        """
+        Initialize an incremental on-disk candle cache in front of MarketData.getPriceHistory.
+
+        Each symbol, frequency and extended-hours combination is stored as a file of fixed-width
+        CANDLE_DTYPE records sorted by datetime, plus a JSON list of the epoch millisecond ranges
+        that have already been fetched. Only ranges that are not covered yet are requested, and
+        reads are served from a read-only memory map of the records file.
+
+        Args:
+            marketData (MarketData): The client used to fetch missing ranges.
+            cacheDir (str, optional): Root directory of the cache.
+        """
+        self.marketData = marketData
+        self.cacheDir = cacheDir
+        # One lock per key directory, so updates of different symbols never wait on each other
+        self.keyLocks = {}
+        self.keyLocksLock = threading.Lock()
+
+    def _keyDirectory(self, symbol, frequencyType, frequency, needExtendedHoursData):
+        safeSymbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        session = 'ext' if needExtendedHoursData else 'rth'
+        return os.path.join(self.cacheDir, safeSymbol, f"{frequencyType}_{frequency}_{session}")
+
+    def _keyLock(self, directory):
+        with self.keyLocksLock:
+            return self.keyLocks.setdefault(directory, threading.Lock())
+
+    def _loadCoverage(self, directory):
+        path = os.path.join(directory, 'coverage.json')
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _saveCoverage(self, directory, coverage):
+        fd, tempFilename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(coverage, f)
+        os.replace(tempFilename, os.path.join(directory, 'coverage.json'))
+
+    def _addCoverage(self, coverage, startMs, endMs):
+        """
+        Add a range to the coverage list, merging overlapping and adjacent ranges.
+        """
+        ranges = sorted(coverage + [[startMs, endMs]])
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            if start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    def _missingRanges(self, coverage, startMs, endMs):
+        """
+        Get the parts of [startMs, endMs] that are not covered yet.
+        """
+        missing = []
+        cursor = startMs
+        for start, end in coverage:
+            if end < cursor:
+                continue
+            if start > endMs:
+                break
+            if start > cursor:
+                missing.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+        if cursor <= endMs:
+            missing.append((cursor, endMs))
+        return missing
+
+    def _completeUntil(self):
+        """
+        Candles before the start of the current US/Eastern day no longer change and may be marked as covered.
+        """
+        today = datetime.now(ZoneInfo('US/Eastern')).replace(hour=0, minute=0, second=0, microsecond=0)
+        return int(today.timestamp() * 1000) - 1
+
+    def _readRecords(self, directory):
+        path = os.path.join(directory, 'candles.bin')
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode='r')
+
+    def _writeRecords(self, directory, candles):
+        """
+        Append candles to the records file, rewriting it only when they do not sort after the stored ones.
+        """
+        if len(candles) == 0:
+            return
+
+        path = os.path.join(directory, 'candles.bin')
+        existing = self._readRecords(directory)
+        if len(existing) == 0 or candles['datetime'][0] > existing['datetime'][-1]:
+            with open(path, 'ab') as f:
+                f.write(candles.tobytes())
+            return
+
+        combined = np.concatenate([np.asarray(existing), candles])
+        combined = combined[np.argsort(combined['datetime'], kind='stable')]
+        # Keep the most recently fetched copy of each candle
+        keep = np.append(combined['datetime'][1:] != combined['datetime'][:-1], True)
+        combined = combined[keep]
+        del existing
+
+        fd, tempFilename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(combined.tobytes())
+        os.replace(tempFilename, path)
+
+    def update(self, symbol, startDate, endDate=None, frequencyType='daily', frequency=1, needExtendedHoursData=False):
+        """
+        Fetch and store only the parts of the range that are not cached yet.
+
+        Args:
+            symbol (str): The symbol to cache price history for.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            needExtendedHoursData (boolean, optional): Include extended hours candles.
+
+        Returns:
+            int: Number of missing ranges that were fetched.
+
+        Raises:
+            CandleCacheError: If any missing range failed. The ranges that succeeded are stored and
+                the failed ones stay uncovered, so the next update fetches them again.
+        """
+        if endDate is None:
+            endDate = datetime.now(timezone.utc)
+
+        util = Utilities()
+        startMs = util.convertDatetimeToUnixEpoch(startDate)
+        endMs = util.convertDatetimeToUnixEpoch(endDate)
+        directory = self._keyDirectory(symbol, frequencyType, frequency, needExtendedHoursData)
+        keyLock = self._keyLock(directory)
+
+        with keyLock:
+            os.makedirs(directory, exist_ok=True)
+            missing = self._missingRanges(self._loadCoverage(directory), startMs, endMs)
+
+        # The key lock is not held while fetching. A range fetched twice by concurrent updates
+        # is merged by _writeRecords, which keeps one copy of each candle.
+        completeUntil = self._completeUntil()
+        failedRanges = []
+        for rangeStart, rangeEnd in missing:
+            # Long ranges are fetched as concurrent server-sized windows
+            try:
+                for records in self.marketData.iterPriceHistoryWindows(
+                    symbol,
+                    startDate=datetime.fromtimestamp(rangeStart / 1000, timezone.utc),
+                    endDate=datetime.fromtimestamp(rangeEnd / 1000, timezone.utc),
+                    frequencyType=frequencyType,
+                    frequency=frequency,
+                    needExtendedHoursData=needExtendedHoursData,
+                    asFrame=False,
+                ):
+                    with keyLock:
+                        self._writeRecords(directory, records)
+            except Exception as Error:
+                failedRanges.append((rangeStart, rangeEnd, Error))
+                continue
+
+            # Ranges reaching into the current session stay uncovered so they are refetched
+            if rangeStart <= completeUntil:
+                with keyLock:
+                    coverage = self._addCoverage(self._loadCoverage(directory), rangeStart, min(rangeEnd, completeUntil))
+                    self._saveCoverage(directory, coverage)
+
+        if failedRanges:
+            raise CandleCacheError(f"Unable to update candle cache for {symbol}: {len(failedRanges)} of {len(missing)} ranges failed: {failedRanges[0][2]}", failedRanges)
+        return len(missing)
+
+    def read(self, symbol, startDate, endDate=None, frequencyType='daily', frequency=1, needExtendedHoursData=False):
+        """
+        Read cached candles without any network calls.
+
+        Args:
+            symbol (str): The symbol to read.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            needExtendedHoursData (boolean, optional): Read the extended hours series.
+
+        Returns:
+            ndarray: A read-only memory-mapped slice of CANDLE_DTYPE records.
+        """
+        if endDate is None:
+            endDate = datetime.now(timezone.utc)
+
+        util = Utilities()
+        startMs = util.convertDatetimeToUnixEpoch(startDate)
+        endMs = util.convertDatetimeToUnixEpoch(endDate)
+        directory = self._keyDirectory(symbol, frequencyType, frequency, needExtendedHoursData)
+
+        records = self._readRecords(directory)
+        first = np.searchsorted(records['datetime'], startMs, side='left')
+        last = np.searchsorted(records['datetime'], endMs, side='right')
+        return records[first:last]
+
+    def getPriceHistory(self, symbol, startDate, endDate=None, frequencyType='daily', frequency=1, needExtendedHoursData=False, asFrame=True):
+        """
+        Get price history, fetching only the ranges missing from the cache.
+
+        Args:
+            symbol (str): The symbol to get price history for.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            needExtendedHoursData (boolean, optional): Include extended hours candles.
+            asFrame (boolean, optional): Return a DataFrame instead of the memory-mapped records.
+
+        Returns:
+            DataFrame: The candles with datetime in epoch milliseconds, or the CANDLE_DTYPE records if asFrame is False.
+
+        Raises:
+            CandleCacheError: If part of the range could not be fetched. read returns what is cached.
+        """
+        if endDate is None:
+            endDate = datetime.now(timezone.utc)
+
+        self.update(symbol, startDate, endDate, frequencyType=frequencyType, frequency=frequency, needExtendedHoursData=needExtendedHoursData)
+        records = self.read(symbol, startDate, endDate, frequencyType=frequencyType, frequency=frequency, needExtendedHoursData=needExtendedHoursData)
+        if not asFrame:
+            return records
+        return Utilities().candleArrayToFrame(records)
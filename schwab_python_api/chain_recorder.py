@@ -0,0 +1,319 @@
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from schwab_python_api.utilities import nanEqual
+
+# Fields compared between polls to decide whether a contract changed
+QUOTE_FIELDS = [
+    'bid',
+    'ask',
+    'last_price',
+    'volume',
+    'open_interest',
+    'itm',
+    'net_change',
+    'delta',
+    'gamma',
+    'theta',
+    'vega',
+    'rho',
+    'iv',
+]
+
+# One index entry per snapshot: capture time in epoch milliseconds, log offset, record length, keyframe flag
+INDEX_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('offset', np.int64),
+    ('length', np.int64),
+    ('keyframe', np.int64),
+])
+
+class OptionChainRecorder:
+    def __init__(self, marketData, symbols, logDir='schwab_chain_log', interval=5.0, keyframeInterval=100, fromDate=None, toDate=None, maxWorkers=4):
+        """
+        Initialize a recorder that polls option chains and appends delta-encoded snapshots to a columnar log.
+
+        Each symbol has an append-only <symbol>.log of snapshot records and a <symbol>.idx time
+        index of fixed-width INDEX_DTYPE entries. A snapshot record is a compressed npz archive of column
+        arrays holding only the contracts whose QUOTE_FIELDS changed since the previous poll,
+        plus the contracts that disappeared. Every keyframeInterval snapshots, and after a
+        restart, a full snapshot is written so replay never has to start far back.
+
+        Args:
+            marketData (MarketData): The client used to fetch the option chains.
+            symbols (list): The underlyings to record.
+            logDir (str, optional): Directory of the log files.
+            interval (float, optional): Seconds between polls.
+            keyframeInterval (int, optional): Number of snapshots between full snapshots.
+            fromDate (str, optional): The starting expiration date passed to getOptionChains.
+            toDate (str, optional): The ending expiration date passed to getOptionChains.
+            maxWorkers (int, optional): Number of symbols polled concurrently.
+        """
+        self.marketData = marketData
+        self.symbols = list(symbols)
+        self.logDir = logDir
+        self.interval = interval
+        self.keyframeInterval = keyframeInterval
+        self.fromDate = fromDate
+        self.toDate = toDate
+        self.maxWorkers = maxWorkers
+
+        # Last recorded chain and number of snapshots since the last keyframe, per symbol
+        self.state = {}
+        self.sinceKeyframe = {}
+        self.stats = {'snapshots': 0, 'contractsPolled': 0, 'contractsWritten': 0, 'bytesWritten': 0}
+        self.statsLock = threading.Lock()
+
+        self.stopEvent = threading.Event()
+        self.thread = None
+        os.makedirs(self.logDir, exist_ok=True)
+
+    def _paths(self, symbol):
+        safeSymbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.logDir, f"{safeSymbol}.log"), os.path.join(self.logDir, f"{safeSymbol}.idx")
+
+    def _encodeRecord(self, df_rows, removed):
+        import pandas as pd
+        columns = {}
+        for column in df_rows.columns:
+            values = df_rows[column].to_numpy()
+            if values.dtype.kind not in 'biufcM':
+                # Store object columns as fixed-width bool or unicode arrays so records load without
+                # pickle, with a null mask so missing values do not come back as 'None' or 'nan'
+                missing = pd.isna(values).astype(bool)
+                present = values[~missing]
+                if len(present) > 0 and all(isinstance(value, (bool, np.bool_)) for value in present):
+                    values = np.where(missing, False, values).astype(bool)
+                else:
+                    values = np.where(missing, '', values).astype(str)
+                if missing.any():
+                    columns[f'__null__{column}'] = missing
+            columns[column] = values
+        columns['__removed__'] = np.asarray(removed, dtype=str)
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **columns)
+        return buffer.getvalue()
+
+    def _decodeRecord(self, data):
+        import pandas as pd
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            columns = {name: archive[name] for name in archive.files}
+        removed = columns.pop('__removed__')
+        for name in [name for name in columns if name.startswith('__null__')]:
+            missing = columns.pop(name)
+            column = name[len('__null__'):]
+            values = columns[column].astype(object)
+            values[missing] = None
+            columns[column] = values
+        df_rows = pd.DataFrame(columns)
+        if 'symbol' in df_rows.columns:
+            df_rows.index = pd.Index(df_rows['symbol'].to_numpy())
+        return df_rows, removed
+
+    def _append(self, symbol, timestamp, record, keyframe):
+        logPath, indexPath = self._paths(symbol)
+        with open(logPath, 'ab') as f:
+            offset = f.tell()
+            f.write(record)
+        entry = np.array([(timestamp, offset, len(record), int(keyframe))], dtype=INDEX_DTYPE)
+        with open(indexPath, 'ab') as f:
+            f.write(entry.tobytes())
+
+    def _changedRows(self, previous, current):
+        """
+        Get the contracts that are new or whose quote fields differ from the previous snapshot, and the removed contract symbols.
+        """
+        common = current.index.intersection(previous.index)
+        new = current.index.difference(previous.index)
+        removed = previous.index.difference(current.index)
+
+        fields = [field for field in QUOTE_FIELDS if field in current.columns]
+        before = previous.loc[common, fields].to_numpy(dtype=np.float64)
+        after = current.loc[common, fields].to_numpy(dtype=np.float64)
+        changed = common[~nanEqual(before, after).all(axis=1)]
+
+        return current.loc[changed.append(new)], removed
+
+    def capture(self, symbol, timestamp=None):
+        """
+        Poll one option chain and append the snapshot to the log.
+
+        Args:
+            symbol (str): The underlying to capture.
+            timestamp (int, optional): Capture time in epoch milliseconds. Defaults to now.
+
+        Returns:
+            int: Number of contracts written.
+        """
+        import pandas as pd
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        df_calls, df_puts = self.marketData.getOptionChains(symbol, fromDate=self.fromDate, toDate=self.toDate, splitLegs=True)
+        current = pd.concat([df_calls, df_puts], ignore_index=True)
+        if len(current.index) == 0:
+            return 0
+        current.index = pd.Index(current['symbol'].to_numpy())
+
+        previous = self.state.get(symbol)
+        keyframe = previous is None or self.sinceKeyframe.get(symbol, 0) >= self.keyframeInterval
+        if keyframe:
+            df_rows = current
+            removed = []
+            self.sinceKeyframe[symbol] = 0
+        else:
+            df_rows, removed = self._changedRows(previous, current)
+            self.sinceKeyframe[symbol] += 1
+
+        record = self._encodeRecord(df_rows, removed)
+        self._append(symbol, timestamp, record, keyframe)
+        self.state[symbol] = current
+
+        with self.statsLock:
+            self.stats['snapshots'] += 1
+            self.stats['contractsPolled'] += len(current.index)
+            self.stats['contractsWritten'] += len(df_rows.index)
+            self.stats['bytesWritten'] += len(record)
+        return len(df_rows.index)
+
+    def captureAll(self, timestamp=None):
+        """
+        Capture a snapshot of every symbol, polling up to maxWorkers symbols concurrently.
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        def captureSymbol(symbol):
+            try:
+                return self.capture(symbol, timestamp=timestamp)
+            except Exception as Error:
+                print(f"Unable to capture option chain for {symbol}. Error: {Error}")
+                return 0
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            return dict(zip(self.symbols, executor.map(captureSymbol, self.symbols)))
+
+    def run(self, iterations=None):
+        """
+        Capture snapshots every interval seconds until stop() is called or iterations snapshots were taken.
+        """
+        count = 0
+        nextTick = time.monotonic()
+        while not self.stopEvent.is_set() and (iterations is None or count < iterations):
+            self.captureAll()
+            count += 1
+            nextTick += self.interval
+            self.stopEvent.wait(max(nextTick - time.monotonic(), 0))
+
+    def start(self):
+        """
+        Start recording on a background thread.
+        """
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self.run, name='schwab-chain-recorder', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the background recording thread.
+        """
+        self.stopEvent.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def getStats(self):
+        """
+        Get the number of snapshots, polled and written contracts and bytes written.
+        """
+        with self.statsLock:
+            stats = dict(self.stats)
+        if stats['contractsWritten'] > 0:
+            stats['compressionRatio'] = stats['contractsPolled'] / stats['contractsWritten']
+        return stats
+
+    def readIndex(self, symbol):
+        """
+        Get the memory-mapped time index of a symbol.
+
+        Returns:
+            ndarray: INDEX_DTYPE entries in capture order.
+        """
+        logPath, indexPath = self._paths(symbol)
+        if not os.path.exists(indexPath) or os.path.getsize(indexPath) == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.memmap(indexPath, dtype=INDEX_DTYPE, mode='r')
+
+    def _readRecord(self, logFile, entry):
+        logFile.seek(int(entry['offset']))
+        return self._decodeRecord(logFile.read(int(entry['length'])))
+
+    def _apply(self, state, df_rows, removed, keyframe):
+        import pandas as pd
+        if keyframe or state is None:
+            return df_rows
+        state = state.drop(index=df_rows.index.append(pd.Index(removed)), errors='ignore')
+        return pd.concat([state, df_rows])
+
+    def replay(self, symbol, start=None, end=None):
+        """
+        Replay the recorded snapshots of a symbol.
+
+        Args:
+            symbol (str): The underlying to replay.
+            start (int, optional): First capture time in epoch milliseconds. Defaults to the beginning of the log.
+            end (int, optional): Last capture time in epoch milliseconds. Defaults to the end of the log.
+
+        Yields:
+            tuple: (timestamp, DataFrame) with the full reconstructed chain at each capture time.
+        """
+        index = self.readIndex(symbol)
+        if len(index) == 0:
+            return
+
+        first = 0 if start is None else np.searchsorted(index['timestamp'], start, side='left')
+        last = len(index) if end is None else np.searchsorted(index['timestamp'], end, side='right')
+        if first >= last:
+            return
+
+        # Rebuild from the last keyframe at or before the first requested snapshot
+        keyframes = np.flatnonzero(index['keyframe'][:first + 1])
+        position = keyframes[-1] if len(keyframes) else 0
+
+        logPath, indexPath = self._paths(symbol)
+        state = None
+        with open(logPath, 'rb') as logFile:
+            for i in range(position, last):
+                df_rows, removed = self._readRecord(logFile, index[i])
+                state = self._apply(state, df_rows, removed, bool(index[i]['keyframe']))
+                if i >= first:
+                    yield int(index[i]['timestamp']), state
+
+    def asOf(self, symbol, timestamp):
+        """
+        Get the option chain of a symbol as it was last recorded at or before timestamp.
+
+        Args:
+            symbol (str): The underlying.
+            timestamp (int): Epoch milliseconds.
+
+        Returns:
+            DataFrame: The reconstructed chain, empty if nothing was recorded before timestamp.
+        """
+        import pandas as pd
+        index = self.readIndex(symbol)
+        position = np.searchsorted(index['timestamp'], timestamp, side='right') - 1
+        if position < 0:
+            return pd.DataFrame()
+
+        # Several snapshots may share a capture time, the last one wins
+        captureTime = int(index[position]['timestamp'])
+        state = pd.DataFrame()
+        for replayTime, state in self.replay(symbol, start=captureTime, end=captureTime):
+            pass
+        return state
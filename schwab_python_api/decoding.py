@@ -0,0 +1,82 @@
+import json
+from typing import Optional, TypedDict
+
+# Optional fast decoders, tried in order: msgspec decodes into the response schemas and skips
+# fields they do not list, orjson and the stdlib decode the whole body into plain dicts
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Value types of the column kinds used by the parsers. Fields may be null or missing.
+KIND_TYPES = {
+    'int': Optional[int],
+    'float': Optional[float],
+    'str': Optional[str],
+    'bool': Optional[bool],
+}
+
+def recordSchema(name, fields):
+    """
+    Build a TypedDict schema of a JSON object from the fields a parser reads.
+
+    Args:
+        name (str): Name of the schema type.
+        fields (dict): JSON key to column kind ('int', 'float', 'str', 'bool') or to a type.
+
+    Returns:
+        type: A TypedDict with every field optional.
+    """
+    return TypedDict(name, {key: KIND_TYPES.get(kind, kind) for key, kind in fields.items()}, total=False)
+
+_decoders = {}
+
+def _decoder(schema):
+    decoder = _decoders.get(schema)
+    if decoder is None:
+        decoder = _decoders[schema] = msgspec.json.Decoder(schema) if schema is not None else msgspec.json.Decoder()
+    return decoder
+
+def getBackend():
+    """
+    Get the name of the JSON decoder in use.
+
+    Returns:
+        str: 'msgspec', 'orjson' or 'json'.
+    """
+    if msgspec is not None:
+        return 'msgspec'
+    if orjson is not None:
+        return 'orjson'
+    return 'json'
+
+def decodeJson(content, schema=None):
+    """
+    Decode a JSON response body, into the given schema when msgspec is installed.
+
+    With msgspec the result holds only the fields of the schema. A body that does not match the
+    schema, e.g. a string where a number is expected, is decoded in full instead. Without msgspec
+    the whole body is decoded with orjson, or the stdlib json module.
+
+    Args:
+        content (bytes): The response body.
+        schema (type, optional): A TypedDict, dict or list type describing the response.
+
+    Returns:
+        dict or list: The decoded response.
+    """
+    if msgspec is not None:
+        if schema is not None:
+            try:
+                return _decoder(schema).decode(content)
+            except msgspec.ValidationError:
+                pass
+        return _decoder(None).decode(content)
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
@@ -0,0 +1,164 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+
+class ExpirationCalendar:
+    def __init__(self, marketData, expiryTypes=None, maxWorkers=4, retries=2, priority=None):
+        """
+        Initialize a precomputed lookup from underlyings to their option expirations.
+
+        refresh fetches the expirations of a universe once with getOptionExpirationsBulk and keeps
+        a sorted datetime64 array per underlying, so option chain requests can be planned with
+        binary searches instead of repeated expiration chain calls.
+
+        Args:
+            marketData (MarketData): The client used to fetch the expirations.
+            expiryTypes (list, optional): Only keep these expiration types, e.g. ['S'] for standard monthlies. Defaults to all.
+            maxWorkers (int, optional): Number of underlyings fetched concurrently.
+            retries (int, optional): Number of retries per failed underlying.
+            priority (int, optional): RequestScheduler priority class of the requests.
+        """
+        self.marketData = marketData
+        self.expiryTypes = expiryTypes
+        self.maxWorkers = maxWorkers
+        self.retries = retries
+        self.priority = priority
+        self.expirations = {}
+        self.refreshedAt = {}
+        self.failedSymbols = []
+        self.lock = threading.Lock()
+
+    def refresh(self, symbols):
+        """
+        Fetch the expirations of the given underlyings and replace their entries in the lookup.
+
+        An underlying that still fails after its retries keeps its previous entry and refresh time,
+        and is listed in failedSymbols until a later refresh of it succeeds.
+
+        Args:
+            symbols (list): The underlyings.
+
+        Returns:
+            list: The underlyings that have at least one expiration.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        columns, failedSymbols = self.marketData.getOptionExpirationsBulk(symbols, maxWorkers=self.maxWorkers, retries=self.retries, priority=self.priority, asFrame=False, returnFailed=True)
+
+        mask = ~np.isnat(columns['expiry'])
+        if self.expiryTypes is not None:
+            mask &= np.isin(columns['expiryType'], self.expiryTypes)
+        tickers = columns['ticker'][mask]
+        expiries = columns['expiry'][mask]
+
+        # Group by ticker with one sort, each group sorted by expiry
+        order = np.lexsort((expiries, tickers.astype(str)))
+        tickers = tickers[order]
+        expiries = expiries[order]
+        bounds = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+        starts = np.concatenate([[0], bounds]) if len(tickers) else np.array([], dtype=np.int64)
+        ends = np.concatenate([bounds, [len(tickers)]]) if len(tickers) else np.array([], dtype=np.int64)
+
+        found = {tickers[start]: np.unique(expiries[start:end]) for start, end in zip(starts, ends)}
+        # A fetched underlying without expirations drops its previous entry
+        failed = set(failedSymbols)
+        fetched = [symbol for symbol in symbols if symbol not in failed]
+        lookup = {symbol: found.get(symbol, np.array([], dtype='datetime64[D]')) for symbol in fetched}
+
+        if failedSymbols:
+            print(f"Unable to refresh the expirations of {len(failedSymbols)} underlying(s), keeping their previous expirations")
+        now = datetime.now()
+        with self.lock:
+            self.expirations.update(lookup)
+            self.refreshedAt.update({symbol: now for symbol in fetched})
+            self.failedSymbols = [symbol for symbol in self.failedSymbols if symbol not in lookup and symbol not in failed] + failedSymbols
+        return [symbol for symbol in fetched if len(lookup[symbol])]
+
+    def retryFailed(self):
+        """
+        Refresh the underlyings that failed in earlier refreshes.
+
+        Returns:
+            list: The underlyings that have at least one expiration.
+        """
+        return self.refresh(list(self.failedSymbols))
+
+    def getExpirations(self, symbol):
+        """
+        Get all known expirations of an underlying.
+
+        Args:
+            symbol (str): The underlying.
+
+        Returns:
+            ndarray: Sorted datetime64[D] expirations, empty if the underlying is not in the lookup.
+        """
+        return self.expirations.get(symbol, np.array([], dtype='datetime64[D]'))
+
+    def nextExpirations(self, symbol, count=1, asOf=None, minDte=0):
+        """
+        Get the next expirations of an underlying.
+
+        Args:
+            symbol (str): The underlying.
+            count (int, optional): Number of expirations.
+            asOf (date, optional): The reference date. Defaults to today.
+            minDte (int, optional): Skip expirations fewer than this many days after asOf.
+
+        Returns:
+            ndarray: Up to count datetime64[D] expirations on or after asOf + minDte.
+        """
+        if asOf is None:
+            asOf = datetime.now().date()
+        expirations = self.getExpirations(symbol)
+        first = np.searchsorted(expirations, np.datetime64(asOf, 'D') + minDte, side='left')
+        return expirations[first:first + count]
+
+    def getNextExpirations(self, symbols=None, count=1, asOf=None, minDte=0):
+        """
+        Get the next expirations of many underlyings.
+
+        Args:
+            symbols (list, optional): The underlyings. Defaults to every underlying in the lookup.
+            count (int, optional): Number of expirations per underlying.
+            asOf (date, optional): The reference date. Defaults to today.
+            minDte (int, optional): Skip expirations fewer than this many days after asOf.
+
+        Returns:
+            dict: Sorted datetime64[D] expirations keyed by underlying.
+        """
+        if symbols is None:
+            symbols = list(self.expirations)
+        return {symbol: self.nextExpirations(symbol, count=count, asOf=asOf, minDte=minDte) for symbol in symbols}
+
+    def getChainDateRange(self, symbol, count=1, asOf=None, minDte=0):
+        """
+        Get the fromDate and toDate that limit an option chain request to the next expirations.
+
+        Args:
+            symbol (str): The underlying.
+            count (int, optional): Number of expirations to cover.
+            asOf (date, optional): The reference date. Defaults to today.
+            minDte (int, optional): Skip expirations fewer than this many days after asOf.
+
+        Returns:
+            tuple: fromDate and toDate as 'yyyy-MM-dd' strings for getOptionChainJson, or None if no expiration is left.
+        """
+        expirations = self.nextExpirations(symbol, count=count, asOf=asOf, minDte=minDte)
+        if len(expirations) == 0:
+            return None
+        return str(expirations[0]), str(expirations[-1])
+
+    def isStale(self, maxAge=timedelta(hours=12), symbols=None):
+        """
+        Check whether any of the underlyings has no successful refresh, or one older than maxAge.
+
+        Args:
+            maxAge (timedelta, optional): The oldest refresh that is still fresh.
+            symbols (list, optional): The underlyings to check. Defaults to every underlying refreshed so far, including failed ones.
+        """
+        if symbols is None:
+            symbols = list(self.refreshedAt) + self.failedSymbols
+        if not symbols:
+            return True
+        now = datetime.now()
+        return any(symbol not in self.refreshedAt or now - self.refreshedAt[symbol] > maxAge for symbol in symbols)
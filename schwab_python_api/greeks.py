@@ -0,0 +1,312 @@
+import numpy as np
+
+SECONDS_PER_YEAR = 365.0 * 24 * 3600
+
+# Shortest time to expiry used for contracts expiring today, in years (one minute)
+MINIMUM_TIME_TO_EXPIRY = 60.0 / SECONDS_PER_YEAR
+
+# Coefficients of W. J. Cody's rational Chebyshev approximations of erf and erfc (CALERF, netlib specfun),
+# accurate to about 1e-16 relative in double precision
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02, 3.20937758913846947e03, 1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03, 2.84423683343917062e03)
+_ERFC_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01, 2.98635138197400131e02,
+           8.81952221241769090e02, 1.71204761263407058e03, 2.05107837782607147e03, 1.23033935479799725e03,
+           2.15311535474403846e-8)
+_ERFC_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02, 1.62138957456669019e03,
+           3.29079923573345963e03, 4.36261909014324716e03, 3.43936767414372164e03, 1.23033935480374942e03)
+_ERFC_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1, 1.60837851487422766e-2,
+           6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERFC_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1, 6.05183413124413191e-2,
+           2.33520497626869185e-3)
+
+def erfc(x):
+    """
+    Vectorized complementary error function, accurate to about 1e-15 relative outside the subnormal range.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.abs(x)
+    result = np.full_like(y, np.nan)
+
+    small = y <= 0.46875
+    ysq = np.square(y[small])
+    xnum = _ERF_A[4] * ysq
+    xden = ysq
+    for i in range(3):
+        xnum = (xnum + _ERF_A[i]) * ysq
+        xden = (xden + _ERF_B[i]) * ysq
+    result[small] = 1.0 - y[small] * (xnum + _ERF_A[3]) / (xden + _ERF_B[3])
+
+    middle = ~small & (y <= 4.0)
+    ym = y[middle]
+    xnum = _ERFC_C[8] * ym
+    xden = ym
+    for i in range(7):
+        xnum = (xnum + _ERFC_C[i]) * ym
+        xden = (xden + _ERFC_D[i]) * ym
+    result[middle] = _scaledExp(ym) * (xnum + _ERFC_C[7]) / (xden + _ERFC_D[7])
+
+    large = y > 4.0
+    yl = y[large]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1.0 / np.square(yl)
+        xnum = _ERFC_P[5] * inverse
+        xden = inverse
+        for i in range(4):
+            xnum = (xnum + _ERFC_P[i]) * inverse
+            xden = (xden + _ERFC_Q[i]) * inverse
+        tail = (1.0 / np.sqrt(np.pi) - inverse * (xnum + _ERFC_P[4]) / (xden + _ERFC_Q[4])) / yl
+        result[large] = np.where(np.isinf(yl), 0.0, _scaledExp(yl) * tail)
+
+    return np.where(x < 0, 2.0 - result, result)
+
+def _scaledExp(y):
+    """
+    exp(-y * y) with y * y split at a multiple of 1/16, as in CALERF, to avoid rounding error in the square.
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        head = np.trunc(y * 16.0) / 16.0
+        return np.exp(-head * head) * np.exp(-(y - head) * (y + head))
+
+def normCdf(x):
+    """
+    Vectorized standard normal CDF, through erfc so that the lower tail keeps its relative precision.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    return 0.5 * erfc(-x / np.sqrt(2.0))
+
+def normPdf(x):
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2.0 * np.pi)
+
+class BlackScholesEngine:
+    def __init__(self, rate=0.0, dividendYield=0.0, maxIterations=100, tolerance=1e-6):
+        """
+        Initialize a vectorized Black-Scholes pricing, greeks and implied volatility engine.
+
+        Greeks follow the conventions of the Schwab chain: theta per calendar day, vega and rho per
+        one percentage point.
+
+        Args:
+            rate (float, optional): Continuously compounded risk-free rate.
+            dividendYield (float, optional): Continuously compounded dividend yield of the underlying.
+            maxIterations (int, optional): Maximum solver iterations for implied volatility.
+            tolerance (float, optional): Price tolerance of the implied volatility solver.
+        """
+        self.rate = rate
+        self.dividendYield = dividendYield
+        self.maxIterations = maxIterations
+        self.tolerance = tolerance
+
+    def _d1d2(self, spot, strike, timeToExpiry, rate, dividendYield, volatility):
+        sqrtT = np.sqrt(timeToExpiry)
+        d1 = (np.log(spot / strike) + (rate - dividendYield + 0.5 * volatility * volatility) * timeToExpiry) / (volatility * sqrtT)
+        return d1, d1 - volatility * sqrtT
+
+    def price(self, spot, strike, timeToExpiry, volatility, isCall, rate=None, dividendYield=None):
+        """
+        Get Black-Scholes prices.
+
+        Args:
+            spot (float or ndarray): Underlying price.
+            strike (ndarray): Strike prices.
+            timeToExpiry (ndarray): Years to expiry.
+            volatility (ndarray): Annualized volatilities.
+            isCall (ndarray): True for calls, False for puts.
+            rate (float, optional): Overrides the engine rate.
+            dividendYield (float, optional): Overrides the engine dividend yield.
+
+        Returns:
+            ndarray: The option prices.
+        """
+        rate = self.rate if rate is None else rate
+        dividendYield = self.dividendYield if dividendYield is None else dividendYield
+        d1, d2 = self._d1d2(spot, strike, timeToExpiry, rate, dividendYield, volatility)
+        discountedSpot = spot * np.exp(-dividendYield * timeToExpiry)
+        discountedStrike = strike * np.exp(-rate * timeToExpiry)
+        call = discountedSpot * normCdf(d1) - discountedStrike * normCdf(d2)
+        put = discountedStrike * normCdf(-d2) - discountedSpot * normCdf(-d1)
+        return np.where(isCall, call, put)
+
+    def greeks(self, spot, strike, timeToExpiry, volatility, isCall, rate=None, dividendYield=None):
+        """
+        Get the price and greeks of every contract.
+
+        Returns:
+            dict: theoretical, delta, gamma, theta, vega and rho arrays.
+        """
+        rate = self.rate if rate is None else rate
+        dividendYield = self.dividendYield if dividendYield is None else dividendYield
+        d1, d2 = self._d1d2(spot, strike, timeToExpiry, rate, dividendYield, volatility)
+        sqrtT = np.sqrt(timeToExpiry)
+        spotDiscount = np.exp(-dividendYield * timeToExpiry)
+        strikeDiscount = np.exp(-rate * timeToExpiry)
+        pdf = normPdf(d1)
+        cdf1 = normCdf(d1)
+        cdf2 = normCdf(d2)
+
+        callPrice = spot * spotDiscount * cdf1 - strike * strikeDiscount * cdf2
+        putPrice = strike * strikeDiscount * (1 - cdf2) - spot * spotDiscount * (1 - cdf1)
+
+        decay = -spot * spotDiscount * pdf * volatility / (2 * sqrtT)
+        callTheta = decay - rate * strike * strikeDiscount * cdf2 + dividendYield * spot * spotDiscount * cdf1
+        putTheta = decay + rate * strike * strikeDiscount * (1 - cdf2) - dividendYield * spot * spotDiscount * (1 - cdf1)
+
+        return {
+            'theoretical': np.where(isCall, callPrice, putPrice),
+            'delta': np.where(isCall, spotDiscount * cdf1, spotDiscount * (cdf1 - 1)),
+            'gamma': spotDiscount * pdf / (spot * volatility * sqrtT),
+            'theta': np.where(isCall, callTheta, putTheta) / 365.0,
+            'vega': spot * spotDiscount * pdf * sqrtT / 100.0,
+            'rho': np.where(isCall, strike * timeToExpiry * strikeDiscount * cdf2, -strike * timeToExpiry * strikeDiscount * (1 - cdf2)) / 100.0,
+        }
+
+    def impliedVolatility(self, optionPrice, spot, strike, timeToExpiry, isCall, rate=None, dividendYield=None):
+        """
+        Solve for implied volatility of every contract at once with safeguarded Newton iterations.
+
+        Newton steps that leave the bracket of known lower and upper volatilities fall back to
+        bisection, so every contract with a price inside its no-arbitrage bounds converges.
+
+        Args:
+            optionPrice (ndarray): Option prices, e.g. bid, ask or mid.
+            spot (float or ndarray): Underlying price.
+            strike (ndarray): Strike prices.
+            timeToExpiry (ndarray): Years to expiry.
+            isCall (ndarray): True for calls, False for puts.
+            rate (float, optional): Overrides the engine rate.
+            dividendYield (float, optional): Overrides the engine dividend yield.
+
+        Returns:
+            ndarray: Annualized implied volatilities, NaN where the price is missing or outside its bounds
+                or the solver did not converge within maxIterations.
+        """
+        rate = self.rate if rate is None else rate
+        dividendYield = self.dividendYield if dividendYield is None else dividendYield
+        optionPrice, strike, timeToExpiry, isCall = np.broadcast_arrays(
+            np.asarray(optionPrice, dtype=np.float64),
+            np.asarray(strike, dtype=np.float64),
+            np.asarray(timeToExpiry, dtype=np.float64),
+            np.asarray(isCall, dtype=bool),
+        )
+        spot = np.broadcast_to(np.asarray(spot, dtype=np.float64), optionPrice.shape)
+
+        discountedSpot = spot * np.exp(-dividendYield * timeToExpiry)
+        discountedStrike = strike * np.exp(-rate * timeToExpiry)
+        lowerBound = np.where(isCall, np.maximum(discountedSpot - discountedStrike, 0), np.maximum(discountedStrike - discountedSpot, 0))
+        upperBound = np.where(isCall, discountedSpot, discountedStrike)
+        valid = np.isfinite(optionPrice) & (optionPrice > lowerBound) & (optionPrice < upperBound) & (timeToExpiry > 0)
+
+        result = np.full(optionPrice.shape, np.nan)
+        if not valid.any():
+            return result
+
+        price = optionPrice[valid]
+        spot = spot[valid]
+        strike = strike[valid]
+        timeToExpiry = timeToExpiry[valid]
+        isCall = isCall[valid]
+
+        low = np.full(price.shape, 1e-4)
+        high = np.full(price.shape, 5.0)
+        volatility = np.full(price.shape, 0.3)
+        active = np.ones(price.shape, dtype=bool)
+        for iteration in range(self.maxIterations):
+            index = np.flatnonzero(active)
+            if len(index) == 0:
+                break
+            sigma = volatility[index]
+            d1, d2 = self._d1d2(spot[index], strike[index], timeToExpiry[index], rate, dividendYield, sigma)
+            model = self.price(spot[index], strike[index], timeToExpiry[index], sigma, isCall[index], rate, dividendYield)
+            difference = model - price[index]
+
+            converged = np.abs(difference) < self.tolerance
+            active[index[converged]] = False
+
+            # Tighten the bracket: price increases with volatility
+            tooHigh = difference > 0
+            high[index] = np.where(tooHigh, sigma, high[index])
+            low[index] = np.where(tooHigh, low[index], sigma)
+
+            vega = spot[index] * np.exp(-dividendYield * timeToExpiry[index]) * normPdf(d1) * np.sqrt(timeToExpiry[index])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = sigma - difference / vega
+            outside = ~np.isfinite(newton) | (newton <= low[index]) | (newton >= high[index])
+            step = np.where(outside, 0.5 * (low[index] + high[index]), newton)
+            volatility[index] = np.where(converged, sigma, step)
+
+        # Contracts still active after maxIterations have no reliable volatility
+        volatility[active] = np.nan
+        result[valid] = volatility
+        return result
+
+    def _timeToExpiry(self, df_chain, asOf):
+        """
+        Years from asOf to the 16:00 US/Eastern close of each expiration date.
+        """
+        import pandas as pd
+        expiry = pd.to_datetime(pd.DataFrame({
+            'year': df_chain['expiration_year'],
+            'month': df_chain['expiration_month'],
+            'day': df_chain['expiration_day'],
+        })) + pd.Timedelta(hours=16)
+        expirySeconds = pd.DatetimeIndex(expiry).tz_localize('US/Eastern').as_unit('s').asi8
+        return np.maximum((expirySeconds - asOf.timestamp()) / SECONDS_PER_YEAR, MINIMUM_TIME_TO_EXPIRY)
+
+    def _repriceLeg(self, df_chain, prefix, isCall, underlyingPrice, timeToExpiry, rate, dividendYield):
+        strike = df_chain[f"{prefix}strike_price"].to_numpy(dtype=np.float64)
+        bid = df_chain[f"{prefix}bid"].to_numpy(dtype=np.float64)
+        ask = df_chain[f"{prefix}ask"].to_numpy(dtype=np.float64)
+        # A zero bid or ask means no market on that side
+        bid = np.where(bid > 0, bid, np.nan)
+        ask = np.where(ask > 0, ask, np.nan)
+        mid = 0.5 * (bid + ask)
+
+        ivBid = self.impliedVolatility(bid, underlyingPrice, strike, timeToExpiry, isCall, rate, dividendYield)
+        ivAsk = self.impliedVolatility(ask, underlyingPrice, strike, timeToExpiry, isCall, rate, dividendYield)
+        ivMid = self.impliedVolatility(mid, underlyingPrice, strike, timeToExpiry, isCall, rate, dividendYield)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            greeks = self.greeks(underlyingPrice, strike, timeToExpiry, ivMid, isCall, rate, dividendYield)
+
+        df_chain[f"{prefix}iv"] = ivMid
+        df_chain[f"{prefix}iv_bid"] = ivBid
+        df_chain[f"{prefix}iv_ask"] = ivAsk
+        for name, values in greeks.items():
+            df_chain[f"{prefix}{name}"] = values
+
+    def repriceChain(self, df_chain, underlyingPrice, rate=None, dividendYield=None, asOf=None):
+        """
+        Recompute implied volatilities and greeks of a whole option chain for a new underlying price.
+
+        Accepts the wide frame of MarketData.getOptionChains or a long-format leg frame from
+        getOptionChains(splitLegs=True). The iv, delta, gamma, theta, vega and rho columns are
+        replaced, replacing the server's sentinel values, and iv_bid, iv_ask and theoretical
+        columns are added.
+
+        Args:
+            df_chain (DataFrame): The option chain.
+            underlyingPrice (float): The new underlying price.
+            rate (float, optional): Overrides the engine rate.
+            dividendYield (float, optional): Overrides the engine dividend yield.
+            asOf (datetime, optional): Valuation time. Defaults to now.
+
+        Returns:
+            DataFrame: A repriced copy of the chain.
+        """
+        import pandas as pd
+        rate = self.rate if rate is None else rate
+        dividendYield = self.dividendYield if dividendYield is None else dividendYield
+        if asOf is None:
+            asOf = pd.Timestamp.now(tz='UTC')
+
+        df_chain = df_chain.copy()
+        if len(df_chain.index) == 0:
+            return df_chain
+
+        timeToExpiry = self._timeToExpiry(df_chain, asOf)
+        if 'option_type' in df_chain.columns:
+            isCall = (df_chain['option_type'] == 'CALL').to_numpy()
+            self._repriceLeg(df_chain, '', isCall, underlyingPrice, timeToExpiry, rate, dividendYield)
+        else:
+            self._repriceLeg(df_chain, 'call_', True, underlyingPrice, timeToExpiry, rate, dividendYield)
+            self._repriceLeg(df_chain, 'put_', False, underlyingPrice, timeToExpiry, rate, dividendYield)
+        return df_chain
@@ -0,0 +1,478 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlparse
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Phases of an endpoint call, in the order they happen:
+#   queue - waiting on the RequestScheduler
+#   connect - DNS lookup, TCP and TLS handshake of new connections
+#   ttfb - request sent until the response headers arrive
+#   download - reading the response body
+#   decode - JSON decoding
+#   frame - building the DataFrame or array returned to the caller
+PHASES = ('queue', 'connect', 'ttfb', 'download', 'decode', 'frame')
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds, in bytes, of the response size histogram buckets
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+_ENDPOINT_SEGMENT = re.compile(r'^[a-z][A-Za-z]*$')
+
+_local = threading.local()
+
+def endpointFromUrl(url):
+    """
+    Name the endpoint of a Schwab API URL by its last lowercase path segment, skipping symbols, hashes and ids.
+
+    Args:
+        url (str): The request URL, e.g. https://api.schwabapi.com/marketdata/v1/AAPL/quotes.
+
+    Returns:
+        str: The endpoint name, e.g. quotes.
+    """
+    segments = [segment for segment in urlparse(url).path.split('/') if _ENDPOINT_SEGMENT.match(segment)]
+    return segments[-1] if segments else 'unknown'
+
+def _addConnectTime(seconds):
+    _local.connectSeconds = getattr(_local, 'connectSeconds', 0.0) + seconds
+
+def takeConnectTime():
+    """
+    Get and reset the seconds this thread spent opening connections since the last call.
+    """
+    seconds = getattr(_local, 'connectSeconds', 0.0)
+    _local.connectSeconds = 0.0
+    return seconds
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _addConnectTime(time.perf_counter() - start)
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _addConnectTime(time.perf_counter() - start)
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+# Connection pool classes that time the connect of every new connection
+TIMED_POOL_CLASSES = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+class CallRecord:
+    def __init__(self, endpoint):
+        """
+        Timings and counters of one endpoint call, which may span several HTTP requests when retried.
+
+        Args:
+            endpoint (str): The endpoint name.
+        """
+        self.endpoint = endpoint
+        self.timings = {}
+        self.responseBytes = 0
+        self.wireBytes = 0
+        self.status = None
+        self.requests = 0
+        self.error = None
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    @property
+    def retries(self):
+        return max(self.requests - 1, 0)
+
+    def addTiming(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def phase(self, phase):
+        """
+        Time a block of code as the given phase.
+
+        Args:
+            phase (str): One of PHASES.
+
+        Returns:
+            context manager: Adds the elapsed time of the block to the phase.
+        """
+        return _PhaseTimer(self, phase)
+
+    def setError(self, error):
+        self.error = str(error)
+
+    def asDict(self):
+        return {
+            'endpoint': self.endpoint,
+            'seconds': self.seconds,
+            'timings': dict(self.timings),
+            'responseBytes': self.responseBytes,
+            'wireBytes': self.wireBytes,
+            'status': self.status,
+            'requests': self.requests,
+            'retries': self.retries,
+            'error': self.error,
+        }
+
+class _PhaseTimer:
+    __slots__ = ('record', 'phase', 'start')
+
+    def __init__(self, record, phase):
+        self.record = record
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.record.addTiming(self.phase, time.perf_counter() - self.start)
+        return False
+
+class _NullCall:
+    """
+    Stands in for a CallRecord and its scope when instrumentation is disabled, every method is a no-op.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+    def phase(self, phase):
+        return self
+
+    def addTiming(self, phase, seconds):
+        pass
+
+    def setError(self, error):
+        pass
+
+NULL_CALL = _NullCall()
+
+class _CallScope:
+    __slots__ = ('instrumentation', 'endpoint', 'record', 'previous')
+
+    def __init__(self, instrumentation, endpoint):
+        self.instrumentation = instrumentation
+        self.endpoint = endpoint
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'call', None)
+        # Requests made on behalf of the active call of the same endpoint, e.g. retries, join it
+        if self.previous is not None and self.previous.endpoint == self.endpoint:
+            self.record = None
+            return self.previous
+        self.record = CallRecord(self.endpoint)
+        _local.call = self.record
+        return self.record
+
+    def __exit__(self, excType, excValue, traceback):
+        if self.record is None:
+            return False
+        _local.call = self.previous
+        self.record.seconds = time.perf_counter() - self.record.start
+        if excValue is not None and self.record.error is None:
+            self.record.setError(excValue)
+        self.instrumentation.emit(self.record)
+        return False
+
+class Instrumentation:
+    def __init__(self, sinks=None, enabled=True):
+        """
+        Collect per-endpoint call records and hand them to pluggable sinks.
+
+        Attach it to a SchwabTransport to instrument every client sharing that transport. A sink is
+        any object with a record(callRecord) method, such as HistogramRegistry.
+
+        Args:
+            sinks (list, optional): The sinks every finished call is passed to.
+            enabled (boolean, optional): Record calls. When False calls cost one attribute check.
+        """
+        self.sinks = list(sinks) if sinks is not None else []
+        self.enabled = enabled
+
+    def addSink(self, sink):
+        self.sinks.append(sink)
+
+    def call(self, endpoint):
+        """
+        Open the scope of one endpoint call on the current thread.
+
+        Args:
+            endpoint (str): The endpoint name, e.g. chains.
+
+        Returns:
+            context manager: Yields the CallRecord to add phase timings to.
+        """
+        if not self.enabled:
+            return NULL_CALL
+        return _CallScope(self, endpoint)
+
+    def emit(self, record):
+        for sink in self.sinks:
+            try:
+                sink.record(record)
+            except Exception as Error:
+                print(f"Instrumentation sink {type(sink).__name__} failed: {Error}")
+
+class Histogram:
+    def __init__(self, buckets):
+        """
+        Fixed-bucket histogram with a running count and sum.
+
+        Args:
+            buckets (tuple): Sorted bucket upper bounds. Values above the last bound go to an overflow bucket.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimate, or None if nothing was observed.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+class HistogramRegistry:
+    def __init__(self, latencyBuckets=LATENCY_BUCKETS, sizeBuckets=SIZE_BUCKETS):
+        """
+        In-process sink that aggregates call records into per-endpoint histograms and counters.
+
+        Args:
+            latencyBuckets (tuple, optional): Bucket upper bounds in seconds for the call and phase timings.
+            sizeBuckets (tuple, optional): Bucket upper bounds in bytes for the response sizes.
+        """
+        self.latencyBuckets = latencyBuckets
+        self.sizeBuckets = sizeBuckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = {}
+            self.phases = {}
+            self.sizes = {}
+            self.statuses = {}
+            self.retries = {}
+            self.errors = {}
+
+    def record(self, call):
+        endpoint = call.endpoint
+        with self.lock:
+            if endpoint not in self.calls:
+                self.calls[endpoint] = Histogram(self.latencyBuckets)
+                self.sizes[endpoint] = Histogram(self.sizeBuckets)
+                self.retries[endpoint] = 0
+                self.errors[endpoint] = 0
+            self.calls[endpoint].observe(call.seconds)
+            for phase, seconds in call.timings.items():
+                histogram = self.phases.get((endpoint, phase))
+                if histogram is None:
+                    histogram = self.phases[(endpoint, phase)] = Histogram(self.latencyBuckets)
+                histogram.observe(seconds)
+            if call.requests:
+                self.sizes[endpoint].observe(call.responseBytes)
+            statusKey = (endpoint, str(call.status))
+            self.statuses[statusKey] = self.statuses.get(statusKey, 0) + 1
+            self.retries[endpoint] += call.retries
+            if call.error is not None or (call.status is not None and call.status >= 400):
+                self.errors[endpoint] += 1
+
+    def getSnapshot(self):
+        """
+        Summarize the recorded calls per endpoint.
+
+        Returns:
+            dict: Keyed by endpoint, with the call count, errors, retries, status counts, call and per-phase latency summaries in seconds and response size summary in bytes.
+        """
+        with self.lock:
+            snapshot = {}
+            for endpoint, histogram in self.calls.items():
+                snapshot[endpoint] = {
+                    'calls': histogram.count,
+                    'errors': self.errors[endpoint],
+                    'retries': self.retries[endpoint],
+                    'statuses': {status: count for (name, status), count in self.statuses.items() if name == endpoint},
+                    'seconds': histogram.summary(),
+                    'phases': {phase: self.phases[(endpoint, phase)].summary() for phase in PHASES if (endpoint, phase) in self.phases},
+                    'responseBytes': self.sizes[endpoint].summary(),
+                }
+            return snapshot
+
+class PrometheusExporter:
+    def __init__(self, registry, namespace='schwab_api'):
+        """
+        Render a HistogramRegistry in the Prometheus text exposition format.
+
+        Args:
+            registry (HistogramRegistry): The registry to export.
+            namespace (str, optional): Prefix of every metric name.
+        """
+        self.registry = registry
+        self.namespace = namespace
+        self.server = None
+
+    def _histogramLines(self, name, labels, histogram):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return lines
+
+    def render(self):
+        """
+        Render the current registry contents.
+
+        Returns:
+            str: The metrics in Prometheus text format.
+        """
+        prefix = self.namespace
+        registry = self.registry
+        with registry.lock:
+            lines = [
+                f'# HELP {prefix}_call_seconds End-to-end time of an endpoint call.',
+                f'# TYPE {prefix}_call_seconds histogram',
+            ]
+            for endpoint, histogram in sorted(registry.calls.items()):
+                lines += self._histogramLines(f'{prefix}_call_seconds', f'endpoint="{endpoint}"', histogram)
+
+            lines += [
+                f'# HELP {prefix}_phase_seconds Time of an endpoint call spent per phase.',
+                f'# TYPE {prefix}_phase_seconds histogram',
+            ]
+            for (endpoint, phase), histogram in sorted(registry.phases.items()):
+                lines += self._histogramLines(f'{prefix}_phase_seconds', f'endpoint="{endpoint}",phase="{phase}"', histogram)
+
+            lines += [
+                f'# HELP {prefix}_response_bytes Decompressed response body size.',
+                f'# TYPE {prefix}_response_bytes histogram',
+            ]
+            for endpoint, histogram in sorted(registry.sizes.items()):
+                lines += self._histogramLines(f'{prefix}_response_bytes', f'endpoint="{endpoint}"', histogram)
+
+            lines += [
+                f'# HELP {prefix}_calls_total Endpoint calls by final HTTP status.',
+                f'# TYPE {prefix}_calls_total counter',
+            ]
+            for (endpoint, status), count in sorted(registry.statuses.items()):
+                lines.append(f'{prefix}_calls_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines += [
+                f'# HELP {prefix}_retries_total Requests repeated after a failed attempt.',
+                f'# TYPE {prefix}_retries_total counter',
+            ]
+            for endpoint, count in sorted(registry.retries.items()):
+                lines.append(f'{prefix}_retries_total{{endpoint="{endpoint}"}} {count}')
+
+            lines += [
+                f'# HELP {prefix}_errors_total Endpoint calls that raised or ended with an error status.',
+                f'# TYPE {prefix}_errors_total counter',
+            ]
+            for endpoint, count in sorted(registry.errors.items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{endpoint}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def writeTextFile(self, path):
+        """
+        Atomically write the metrics to a file, e.g. for the node exporter textfile collector.
+
+        Args:
+            path (str): The .prom file to write.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tempPath = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.render())
+        os.replace(tempPath, path)
+
+    def serve(self, port=9464, host='127.0.0.1'):
+        """
+        Serve the metrics at /metrics on a background thread.
+
+        Args:
+            port (int, optional): Port to listen on.
+            host (str, optional): Interface to listen on.
+
+        Returns:
+            ThreadingHTTPServer: The running server. Call stop() to shut it down.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='schwab-metrics', daemon=True).start()
+        return self.server
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
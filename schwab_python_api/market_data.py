@@ -1,20 +1,92 @@
-import requests
 from urllib import parse 
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
-import pandas as pd
-import json
-from schwab_python_api.utilities import Utilities
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+import numpy as np
+from schwab_python_api.utilities import Utilities, CANDLE_DTYPE, PRICE_HISTORY_SCHEMA
+from schwab_python_api.rate_limiter import RequestScheduler
+from schwab_python_api.option_chain import OptionChainParser, OPTION_CHAIN_SCHEMA
+from schwab_python_api.decoding import decodeJson, recordSchema
+from schwab_python_api.transport import RequestError, callWithRetries, raiseForStatus
+
+# Column name, key in the 'quote' object of a /quotes entry and column type
+QUOTE_COLUMNS = [
+    ('bidPrice', 'bidPrice', 'float'),
+    ('askPrice', 'askPrice', 'float'),
+    ('lastPrice', 'lastPrice', 'float'),
+    ('mark', 'mark', 'float'),
+    ('bidSize', 'bidSize', 'int'),
+    ('askSize', 'askSize', 'int'),
+    ('lastSize', 'lastSize', 'int'),
+    ('openPrice', 'openPrice', 'float'),
+    ('highPrice', 'highPrice', 'float'),
+    ('lowPrice', 'lowPrice', 'float'),
+    ('closePrice', 'closePrice', 'float'),
+    ('netChange', 'netChange', 'float'),
+    ('netPercentChange', 'netPercentChange', 'float'),
+    ('totalVolume', 'totalVolume', 'int'),
+    ('quoteTime', 'quoteTime', 'int'),
+    ('tradeTime', 'tradeTime', 'int'),
+    ('52WeekHigh', '52WeekHigh', 'float'),
+    ('52WeekLow', '52WeekLow', 'float'),
+]
+
+# Period type sent with a date range, the default period type 'day' only accepts minute candles
+PRICE_HISTORY_PERIOD_TYPES = {
+    'minute': 'day',
+    'daily': 'year',
+    'weekly': 'year',
+    'monthly': 'year',
+}
+
+# Decoding schema of the /quotes fields read by getQuotesBulk, keyed by symbol
+QUOTES_SCHEMA = dict[str, recordSchema('QuoteEntry', {
+    'assetMainType': 'str',
+    'symbol': 'str',
+    'quote': recordSchema('Quote', {key: kind for name, key, kind in QUOTE_COLUMNS}),
+})]
+
+# Decoding schema of an /expirationchain response
+EXPIRATION_CHAIN_SCHEMA = recordSchema('ExpirationChain', {
+    'status': 'str',
+    'expirationList': list[recordSchema('Expiration', {'expirationDate': 'str', 'daysToExpiration': 'int', 'expirationType': 'str', 'standard': 'bool'})],
+})
+
+# Longest range, in days, requested per pricehistory call when backfilling by frequency type
+PRICE_HISTORY_WINDOW_DAYS = {
+    'minute': 10,
+    'daily': 365 * 20,
+    'weekly': 365 * 20,
+    'monthly': 365 * 20,
+}
+
+class BulkRequestError(RequestError):
+    def __init__(self, message, failedSymbols, statusCode=None):
+        """
+        A bulk request in which some symbols could not be fetched.
+
+        Args:
+            message (str): Description of the failure.
+            failedSymbols (list): The symbols without a result.
+            statusCode (int, optional): The HTTP status of the first failure.
+        """
+        super().__init__(message, statusCode)
+        self.failedSymbols = failedSymbols
 
 class MarketData:
-    def __init__(self, authInstance):
+    def __init__(self, authInstance, transport=None, cache=None):
         """
         Initialize the MarketData class with an authentication instance.
         
         Args:
             authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to authInstance.transport.
+            cache (ResponseCache, optional): Response cache consulted before every request. Defaults to no caching.
         """
         self.authInstance = authInstance
+        self.transport = transport if transport is not None else authInstance.transport
+        self.cache = cache
         self.baseUrl = "https://api.schwabapi.com/marketdata/v1"
 
     def getHeaders(self):
@@ -25,9 +97,26 @@ class MarketData:
             dict: A dictionary containing the authorization header.
         """
         return {
-            'Authorization': f"Bearer {self.authInstance.accessToken}"
+            'Authorization': f"Bearer {self.authInstance.getAccessToken()}"
         }
 
+    def _get(self, endpoint, url, params=None, priority=None):
+        """
+        Send a GET request through the response cache, if one is configured.
+        
+        Args:
+            endpoint (str): Endpoint name, used for the cache TTL lookup.
+            url (str): The request URL.
+            params (dict, optional): Query string parameters.
+            priority (int, optional): RequestScheduler priority class.
+        
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if self.cache is None:
+            return self.transport.get(url, headers=self.getHeaders(), params=params, priority=priority)
+        return self.cache.get(endpoint, url, params, lambda: self.transport.get(url, headers=self.getHeaders(), params=params, priority=priority))
+
     def getQuotes(self, symbols):
         """
         Get current quote for the specified symbols.
@@ -46,10 +135,119 @@ class MarketData:
         params = {'symbols': symbol_str}
 
         # Make the GET request
-        response = requests.get(url, headers=self.getHeaders(), params=params)
-        
-        return response.json()
+        with self.transport.call('quotes') as call:
+            response = self._get('quotes', url, params=params)
+            with call.phase('decode'):
+                return decodeJson(response.content)
     
+    def _batchSymbols(self, symbols, maxSymbolsPerBatch, maxQueryLength):
+        """
+        Split symbols into batches whose URL-encoded symbols parameter stays under maxQueryLength characters.
+        """
+        batches = []
+        batch = []
+        length = 0
+        for symbol in symbols:
+            # Encoded symbol plus the encoded comma separator
+            encodedLength = len(parse.quote(symbol, safe='')) + 3
+            if batch and (len(batch) >= maxSymbolsPerBatch or length + encodedLength > maxQueryLength):
+                batches.append(batch)
+                batch = []
+                length = 0
+            batch.append(symbol)
+            length += encodedLength
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _fetchQuoteBatch(self, batch, fields, retries):
+        """
+        Fetch one batch of quotes, retrying only this batch on failure.
+        """
+        url = f"{self.baseUrl}/quotes"
+        params = {'symbols': ','.join(batch)}
+        if fields is not None:
+            params['fields'] = fields
+
+        with self.transport.call('quotes') as call:
+            def fetch():
+                response = self._get('quotes', url, params=params)
+                raiseForStatus(response)
+                with call.phase('decode'):
+                    return decodeJson(response.content, QUOTES_SCHEMA)
+
+            return callWithRetries(fetch, retries, f"Quote batch of {len(batch)} symbols starting with {batch[0]}")
+
+    def getQuotesBulk(self, symbols, fields='quote', maxWorkers=4, retries=2, maxSymbolsPerBatch=500, maxQueryLength=2000, asFrame=True, returnFailed=False):
+        """
+        Get current quotes for a large symbol universe as a columnar table.
+        
+        The symbols are split into URL-safe batches that are fetched concurrently. A failed batch
+        is retried on its own. If a batch still fails, a BulkRequestError listing its symbols in
+        failedSymbols is raised, unless returnFailed is set.
+        
+        Args:
+            symbols (list): The symbols to get quotes for.
+            fields (str, optional): Quote field groups to request (quote, fundamental, extended, reference, regular).
+            maxWorkers (int, optional): Number of batches fetched concurrently.
+            retries (int, optional): Number of retries per failed batch.
+            maxSymbolsPerBatch (int, optional): Maximum number of symbols per request.
+            maxQueryLength (int, optional): Maximum length of the encoded symbols parameter per request.
+            asFrame (boolean, optional): Return a DataFrame. If False, return the columns without importing pandas.
+            returnFailed (boolean, optional): Return the quotes of the successful batches along with the symbols of the failed ones instead of raising.
+        
+        Returns:
+            DataFrame: One row per symbol, indexed by symbol, with assetMainType and the QUOTE_COLUMNS fields,
+                or a dict of those columns as NumPy arrays plus a 'symbol' array if asFrame is False.
+                With returnFailed, a (quotes, failedSymbols) tuple.
+        """
+        # Drop duplicates while keeping the caller's order
+        symbols = list(dict.fromkeys(symbols))
+        batches = self._batchSymbols(symbols, maxSymbolsPerBatch, maxQueryLength)
+
+        # The batches are recorded as 'quotes' calls on the worker threads, this call covers the whole fan-out
+        with self.transport.call('quotesBulk') as call:
+            quotes = {}
+            failed = set()
+            errors = []
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                futures = {executor.submit(self._fetchQuoteBatch, batch, fields, retries): batch for batch in batches}
+                for future in as_completed(futures):
+                    try:
+                        quotes.update(future.result())
+                    except Exception as Error:
+                        call.setError(Error)
+                        failed.update(futures[future])
+                        errors.append(Error)
+
+            failedSymbols = [symbol for symbol in symbols if symbol in failed]
+            if failedSymbols and not returnFailed:
+                raise BulkRequestError(f"Schwab API getQuotesBulk Failure: {len(failedSymbols)} of {len(symbols)} symbols failed: {errors[0]}", failedSymbols, getattr(errors[0], 'statusCode', None))
+
+            with call.phase('frame'):
+                # Keep the requested order and skip the 'errors' entry and invalid symbols
+                found = [symbol for symbol in symbols if isinstance(quotes.get(symbol), dict)]
+                records = [quotes[symbol].get('quote', {}) for symbol in found]
+
+                columns = {'assetMainType': np.array([quotes[symbol].get('assetMainType') for symbol in found], dtype=object)}
+                for name, key, kind in QUOTE_COLUMNS:
+                    array = np.array([record.get(key) for record in records], dtype=np.float64)
+                    if kind == 'int' and not np.isnan(array).any():
+                        array = array.astype(np.int64)
+                    columns[name] = array
+
+                if not asFrame:
+                    columns['symbol'] = np.array(found, dtype=object)
+                    result = columns
+                else:
+                    import pandas as pd
+                    columns['assetMainType'] = pd.Categorical(columns['assetMainType'])
+                    result = pd.DataFrame(columns, index=pd.Index(found, name='symbol'))
+
+            if returnFailed:
+                return result, failedSymbols
+            return result
+
     def getQuote(self, symbol):
         """
         Get current quote for a single specified symbol.
@@ -65,13 +263,104 @@ class MarketData:
         
         url = f"{self.baseUrl}/{html_symbol}/quotes"
         params = {}
-        response = requests.get(url, headers=self.getHeaders(), params=params)
-        if response.status_code == 200:
-            return response.json()
+        with self.transport.call('quotes') as call:
+            response = self._get('quotes', url, params=params)
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getQuote Failure: Ticker: {symbol}: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def getInstruments(self, symbol, projection='symbol-search'):
+        """
+        Get instrument details by symbol and projection.
         
-        else:
-            print(f"Schwab API getQuote Failure: Ticker: {symbol}: Response Status Code {response.status_code}: {response.reason}")
-            return None
+        Args:
+            symbol (str): The symbol, or a search pattern depending on projection.
+            projection (str, optional): symbol-search, symbol-regex, desc-search, desc-regex, search or fundamental.
+        
+        Returns:
+            dict: The JSON response containing the instruments.
+        """
+        url = f"{self.baseUrl}/instruments"
+        params = {'symbol': symbol, 'projection': projection}
+        with self.transport.call('instruments') as call:
+            response = self._get('instruments', url, params=params)
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getInstruments Failure: Symbol: {symbol}: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def getInstrumentByCusip(self, cusip):
+        """
+        Get instrument details by CUSIP.
+        
+        Args:
+            cusip (str): The CUSIP of the instrument.
+        
+        Returns:
+            dict: The JSON response containing the instrument.
+        """
+        url = f"{self.baseUrl}/instruments/{cusip}"
+        with self.transport.call('instruments') as call:
+            response = self._get('instruments', url)
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getInstrumentByCusip Failure: CUSIP: {cusip}: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def _fetchExpirationChain(self, symbol, retries=0, priority=None):
+        """
+        Fetch and decode the expiration chain of one symbol, retrying on failure.
+        """
+        url = f"{self.baseUrl}/expirationchain"
+        params = {'symbol': symbol}
+
+        with self.transport.call('expirationchain') as call:
+            def fetch():
+                response = self._get('expirationchain', url, params=params, priority=priority)
+                raiseForStatus(response)
+                with call.phase('decode'):
+                    return decodeJson(response.content, EXPIRATION_CHAIN_SCHEMA)
+
+            return callWithRetries(fetch, retries, f"Expiration chain of {symbol}")
+
+    def _expirationColumns(self, symbol, data, timestamp):
+        """
+        Convert one expiration chain response into typed NumPy columns in a single pass.
+        """
+        expirations = data.get('expirationList') or [] if data is not None else []
+        count = len(expirations)
+
+        # ISO dates parse straight into datetime64, and the date parts are derived from it
+        expiry = np.array([(expiration.get('expirationDate') or '')[:10] for expiration in expirations], dtype='datetime64[D]')
+        months = expiry.astype('datetime64[M]')
+        daysToExpiration = np.array([expiration.get('daysToExpiration') for expiration in expirations], dtype=np.float64)
+        if not np.isnan(daysToExpiration).any():
+            daysToExpiration = daysToExpiration.astype(np.int64)
+        standard = np.array([expiration.get('standard') for expiration in expirations], dtype=object)
+        if not any(value is None for value in standard):
+            standard = standard.astype(bool)
+
+        return {
+            'ticker': np.full(count, symbol, dtype=object),
+            'timestamp': np.full(count, np.datetime64(timestamp, 'us')),
+            'expiry': expiry,
+            'year': expiry.astype('datetime64[Y]').astype(np.int64) + 1970,
+            'month': months.astype(np.int64) % 12 + 1,
+            'day': (expiry - months.astype('datetime64[D]')).astype(np.int64) + 1,
+            'expiryType': np.array([expiration.get('expirationType') for expiration in expirations], dtype=object),
+            'daysToExpiration': daysToExpiration,
+            'standard': standard,
+        }
 
     def getOptionExpirations(self, symbol):
         """
@@ -81,65 +370,160 @@ class MarketData:
             symbol (str): The symbol to get option expirations for.
         
         Returns:
-            dict: The JSON response containing the option expirations.
+            DataFrame: One row per expiration with ticker, timestamp, year, month, day and expiryType, empty on failure.
         """
+        import pandas as pd
         endpoint = '/expirationchain'
-        try:
-            url = f"{self.baseUrl}{endpoint}"
-            params = {'symbol': symbol}
-            response = requests.get(url, headers=self.getHeaders(), params=params)
-
-            if response is not None and response.status_code == 200:
-
-                # Define headers for dataframe
-                header = [
-                    'ticker',
-                    'timestamp',
-                    'year',
-                    'month',
-                    'day',
-                    'expiryType'
-                ]
-
-                # Create dataframe to store options chain information
-                df_exp_date = pd.DataFrame(columns = header)
-
-                parsed = json.loads(response.text)
-
-                # Handle and parse response
-                data = response.json()
-                timestamp = datetime.now()
-                if data is not None and 'expirationList' in data:
-                    i = 0
-                    for expirationDate in data['expirationList']:
-                        date = datetime.strptime(expirationDate['expirationDate'], "%Y-%m-%d")
-                        df_exp_date.loc[len(df_exp_date.index)] =[
-                            symbol,
-                            timestamp,
-                            date.year,
-                            date.month,
-                            date.day,
-                            expirationDate['expirationType']
-                        ]
-                        i = i + 1
-                    return df_exp_date
-                else:
-                    print("No expiration dates available.")
+        with self.transport.call('expirationchain') as call:
+            try:
+                url = f"{self.baseUrl}{endpoint}"
+                params = {'symbol': symbol}
+                response = self._get('expirationchain', url, params=params)
+
+                if response is not None and response.status_code == 200:
+
+                    # Handle and parse response
+                    with call.phase('decode'):
+                        data = decodeJson(response.content, EXPIRATION_CHAIN_SCHEMA)
+                    if data is not None and 'expirationList' in data:
+                        with call.phase('frame'):
+                            columns = self._expirationColumns(symbol, data, datetime.now())
+                            return pd.DataFrame({name: columns[name] for name in ['ticker', 'timestamp', 'year', 'month', 'day', 'expiryType']})
+                    else:
+                        print("No expiration dates available.")
+                        df_exp_date = pd.DataFrame()  
+                        return df_exp_date
+                
+                elif response is not None:
+                    print(f"Endpoint {endpoint} returned status {response.status_code}: {response.text}, {response.url}")
                     df_exp_date = pd.DataFrame()  
                     return df_exp_date
-            
-            elif response is not None:
-                print(f"Endpoint {endpoint} returned status {response.status_code}: {response.text}, {response.url}")
+                
+            except Exception as Error:
+                call.setError(Error)
+                print(f"Unable to obtain option chain expirations. Error: {Error}")    
                 df_exp_date = pd.DataFrame()  
                 return df_exp_date
-            
-        except Exception as Error:
-            print(f"Unable to obtain option chain expirations. Error: {Error}")    
-            df_exp_date = pd.DataFrame()  
-            return df_exp_date
-            
 
-    def getOptionChains(self, symbol, fromDate=None, toDate=None):
+    def getOptionExpirationsBulk(self, symbols, maxWorkers=4, retries=2, priority=None, asFrame=True, returnFailed=False):
+        """
+        Get the option expirations of many underlyings as one typed table.
+        
+        The expiration chains are fetched concurrently and their columns are joined in one step.
+        A failed symbol is retried on its own. If a symbol still fails, a BulkRequestError listing
+        it in failedSymbols is raised, unless returnFailed is set.
+        
+        Args:
+            symbols (list): The underlyings to get expirations for.
+            maxWorkers (int, optional): Number of symbols fetched concurrently.
+            retries (int, optional): Number of retries per failed symbol.
+            priority (int, optional): RequestScheduler priority class of the requests.
+            asFrame (boolean, optional): Return a DataFrame. If False, return the columns without importing pandas.
+            returnFailed (boolean, optional): Return the expirations of the successful symbols along with the failed symbols instead of raising.
+        
+        Returns:
+            DataFrame: One row per expiration, indexed by ticker and expiry (datetime64), with timestamp, year, month, day,
+                expiryType, daysToExpiration and standard columns, or a dict of NumPy columns including ticker and expiry if asFrame is False.
+                With returnFailed, a (expirations, failedSymbols) tuple.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        timestamp = datetime.now()
+
+        # The symbols are recorded as 'expirationchain' calls on the worker threads, this call covers the whole fan-out
+        with self.transport.call('expirationsBulk') as call:
+            chains = {}
+            errors = []
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                futures = {executor.submit(self._fetchExpirationChain, symbol, retries, priority): symbol for symbol in symbols}
+                for future in as_completed(futures):
+                    try:
+                        chains[futures[future]] = future.result()
+                    except Exception as Error:
+                        call.setError(Error)
+                        errors.append(Error)
+
+            failedSymbols = [symbol for symbol in symbols if symbol not in chains]
+            if failedSymbols and not returnFailed:
+                raise BulkRequestError(f"Schwab API getOptionExpirationsBulk Failure: {len(failedSymbols)} of {len(symbols)} symbols failed: {errors[0]}", failedSymbols, getattr(errors[0], 'statusCode', None))
+
+            with call.phase('frame'):
+                parts = [self._expirationColumns(symbol, chains[symbol], timestamp) for symbol in symbols if symbol in chains]
+                if not parts:
+                    parts = [self._expirationColumns(None, None, timestamp)]
+                columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+                if not np.issubdtype(columns['daysToExpiration'].dtype, np.integer) and not np.isnan(columns['daysToExpiration']).any():
+                    columns['daysToExpiration'] = columns['daysToExpiration'].astype(np.int64)
+
+                if not asFrame:
+                    result = columns
+                else:
+                    import pandas as pd
+                    columns['expiryType'] = pd.Categorical(columns['expiryType'])
+                    index = pd.MultiIndex.from_arrays([columns.pop('ticker'), columns.pop('expiry')], names=['ticker', 'expiry'])
+                    result = pd.DataFrame(columns, index=index).sort_index()
+
+            if returnFailed:
+                return result, failedSymbols
+            return result
+
+    def getOptionChainJson(self, symbol, fromDate=None, toDate=None, contractType=None, strikeCount=None, strikeRange=None, strike=None, expMonth=None, optionType=None, priority=None):
+        """
+        Get the decoded option chain response, with every filter the chains endpoint supports applied server-side.
+        
+        Args:
+            symbol (str): The symbol to get option chains for.
+            fromDate (str, optional): The starting date expiration date for the options.
+            toDate (str, optional): The ending date expiration date for the options. If fromDate populated and toDate not populated, toDate defaulted to fromDate
+            contractType (str, optional): CALL, PUT or ALL.
+            strikeCount (int, optional): Number of strikes above and below the at-the-money price.
+            strikeRange (str, optional): Moneyness range: ITM, NTM, OTM, SAK (strikes above market), SBK (strikes below market), SNK (strikes near market) or ALL.
+            strike (float, optional): Only this strike price.
+            expMonth (str, optional): Expiration month, JAN to DEC or ALL.
+            optionType (str, optional): S (standard), NS (non-standard) or ALL.
+            priority (int, optional): RequestScheduler priority class of the request.
+        
+        Returns:
+            dict: The response decoded into OPTION_CHAIN_SCHEMA, or None on failure.
+        """
+        endpoint = '/chains'
+        url = f"{self.baseUrl}{endpoint}"
+        params = {'symbol': symbol}
+
+        if fromDate is not None:
+            params['fromDate'] = fromDate
+            if toDate is None:
+                params['toDate'] = fromDate
+            else:
+                params['toDate'] = toDate
+        if contractType is not None:
+            params['contractType'] = contractType
+        if strikeCount is not None:
+            params['strikeCount'] = strikeCount
+        if strikeRange is not None:
+            params['range'] = strikeRange
+        if strike is not None:
+            params['strike'] = strike
+        if expMonth is not None:
+            params['expMonth'] = expMonth
+        if optionType is not None:
+            params['optionType'] = optionType
+
+        with self.transport.call('chains') as call:
+            try:
+                response = self._get('chains', url, params=params, priority=priority)
+
+                if response is not None and response.status_code == 200:
+                    with call.phase('decode'):
+                        return decodeJson(response.content, OPTION_CHAIN_SCHEMA)
+
+                elif response is not None:
+                    print(f"Endpoint {endpoint} returned status {response.status_code}: {response.text}, {response.url} for symbol: {symbol} fromDate: {fromDate} toDate: {toDate}")
+            except Exception as Error:
+                call.setError(Error)
+                print(f"Unable to obtain option chains. Error: {Error}")
+        return None
+
+    def getOptionChains(self, symbol, fromDate=None, toDate=None, splitLegs=False, asFrame=True, contractType=None, strikeCount=None, strikeRange=None, strike=None, expMonth=None, optionType=None):
         """
         Get option chains for the specified symbol and expiration date.
         
@@ -147,125 +531,76 @@ class MarketData:
             symbol (str): The symbol to get option chains for.
             fromDate (str, optional): The starting date expiration date for the options.
             toDate (str, optional): The ending date expiration date for the options. If fromDate populated and toDate not populated, toDate defaulted to fromDate
+            splitLegs (boolean, optional): Return the call and put legs as separate long-format frames instead of one row per strike.
+            asFrame (boolean, optional): Return DataFrames. If False, return the OptionChainParser.parseColumns leg columns without importing pandas.
+            contractType, strikeCount, strikeRange, strike, expMonth, optionType (optional): Server-side filters, see getOptionChainJson.
         
         Returns:
-            dict: The JSON response containing the option chains.
-        """
-        try:
-            endpoint = '/chains'
-            url = f"{self.baseUrl}{endpoint}"
-            params = {'symbol': symbol}
-
-            current_timestamp = int(datetime.now(timezone.utc).timestamp())
-            if fromDate is not None:
-                params['fromDate'] = fromDate
-                if toDate is None:
-                    params['toDate'] = fromDate
-                else:
-                    params['toDate'] = toDate
+            DataFrame: The option chain with call and put columns per expiration and strike, or a tuple of (calls, puts) DataFrames if splitLegs is set.
+                If asFrame is False, a dict of 'call' and 'put' column dicts, or None on failure.
+        """
+        if not asFrame:
+            df_option_chain = None
+        elif splitLegs:
+            import pandas as pd
+            df_option_chain = (pd.DataFrame(), pd.DataFrame())
+        else:
+            import pandas as pd
+            df_option_chain = pd.DataFrame()
 
-            response = requests.get(url, headers=self.getHeaders(), params=params)
-            option_data_raw = response.json()
+        # The chain request joins this call, so one record holds its network, decode and frame timings
+        with self.transport.call('chains') as call:
+            try:
+                current_timestamp = int(datetime.now(timezone.utc).timestamp())
+                option_data_raw = self.getOptionChainJson(symbol, fromDate=fromDate, toDate=toDate, contractType=contractType, strikeCount=strikeCount, strikeRange=strikeRange, strike=strike, expMonth=expMonth, optionType=optionType)
 
-            if response is not None and response.status_code == 200:
-                # Initialize an empty list to hold the processed option chain data
-                option_data = []
-                
-                # Extract call and put maps
-                call_map = option_data_raw.get('callExpDateMap', {})
-                put_map = option_data_raw.get('putExpDateMap', {})
-                
-                
-                # Iterate through each expiration date in the callExpDateMap
-                for expiry in call_map:
-                    expiry_date_str, dte = expiry.split(':')
-                    expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d')
-                    
-                    # Create a set of common strikes in both call and put maps for this expiry
-                    call_strikes = set(call_map.get(expiry, {}).keys())
-                    put_strikes = set(put_map.get(expiry, {}).keys())
-                    common_strikes = sorted(call_strikes.intersection(put_strikes), key=float)
-                    
-                    # Iterate through each strike price within the expiration date
-                    for strike_price in common_strikes:
-                        call_option = call_map[expiry][strike_price][0]
-                        put_option = put_map[expiry][strike_price][0]
-                        # Add the parsed data to the list
-                        option_data.append({
-                            'timestamp': current_timestamp,
-                            'call_timestamp': call_option.get('quoteTimeInLong'),
-                            'call_symbol': call_option.get('symbol'),
-                            'call_option_root': call_option.get('optionRoot'),
-                            'call_option_type': call_option.get('putCall'),
-                            'call_strike_price': call_option.get('strikePrice'),
-                            'call_volume': call_option.get('totalVolume'),
-                            'call_open_interest': call_option.get('openInterest'),
-                            'call_last_price': call_option.get('last'),
-                            'call_bid': call_option.get('bid'),
-                            'call_ask': call_option.get('ask'),
-                            'call_itm': max(call_option.get('intrinsicValue'),0),
-                            'call_net_change': call_option.get('netChange'),
-                            'call_delta': call_option.get('delta'),
-                            'call_gamma': call_option.get('gamma'),
-                            'call_theta': call_option.get('theta'),
-                            'call_vega': call_option.get('vega'),
-                            'call_rho': call_option.get('rho'),
-                            'call_iv': call_option.get('volatility')/100,
-                            'call_osi': call_option.get('symbol'),
-                            'put_timestamp': put_option.get('quoteTimeInLong'),
-                            'put_symbol': put_option.get('symbol'),
-                            'put_option_root': put_option.get('optionRoot'),
-                            'put_option_type': put_option.get('putCall'),
-                            'put_strike_price': put_option.get('strikePrice'),
-                            'put_volume': put_option.get('totalVolume'),
-                            'put_open_interest': put_option.get('openInterest'),
-                            'put_last_price': put_option.get('last'),
-                            'put_bid': put_option.get('bid'),
-                            'put_ask': put_option.get('ask'),
-                            'put_itm': max(put_option.get('intrinsicValue'),0),
-                            'put_net_change': put_option.get('netChange'),
-                            'put_delta': put_option.get('delta'),
-                            'put_gamma': put_option.get('gamma'),
-                            'put_theta': put_option.get('theta'),
-                            'put_vega': put_option.get('vega'),
-                            'put_rho': put_option.get('rho'),
-                            'put_iv': put_option.get('volatility')/100,
-                            'put_osi': put_option.get('symbol'),
-                            'expiration_year': expiry_date.year,
-                            'expiration_month': expiry_date.month,
-                            'expiration_day': expiry_date.day,
-                            'expiration_date': expiry_date.strftime('%d-%b-%y'),
-                        })
-                # Convert the list to a DataFrame
-                df_option_chain = pd.DataFrame(option_data)
-
-            elif response is not None:
-                print(f"Endpoint {endpoint} returned status {response.status_code}: {response.text}, {response.url} for symbol: {symbol} fromDate: {fromDate} toDate: {toDate}")
-        except Exception as Error:
-            print(f"Unable to obtain option chains. Error: {Error}")    
-            df_option_chain = pd.DataFrame()   
+                if option_data_raw is not None:
+                    with call.phase('frame'):
+                        parser = OptionChainParser()
+                        if not asFrame:
+                            df_option_chain = parser.parseColumns(option_data_raw)
+                        elif splitLegs:
+                            df_option_chain = parser.parseLegs(option_data_raw, timestamp=current_timestamp)
+                        else:
+                            df_option_chain = parser.parse(option_data_raw, timestamp=current_timestamp)
+            except Exception as Error:
+                call.setError(Error)
+                print(f"Unable to obtain option chains. Error: {Error}")    
             
         return df_option_chain
 
-    def getPriceHistory(self, symbol, startDate=None, endDate=None, frequencyType=None, frequency=None, periodType=None, period=None, needExtendedHoursData=None, needPreviousClose=None):
+    def getPriceHistoryCandles(self, symbol, startDate=None, endDate=None, frequencyType=None, frequency=None, periodType=None, period=None, needExtendedHoursData=None, needPreviousClose=None, priority=None):
         """
-        Get price history for the specified symbol with optional parameters.
+        Get the raw candles of the price history for the specified symbol.
         
         Args:
             symbol (str): The symbol to get price history for.
-            startDate (str, optional): The start date for the price history (YYYY-MM-DD).
-            endDate (str, optional): The end date for the price history (YYYY-MM-DD).
+            startDate (datetime, optional): The start date for the price history.
+            endDate (datetime, optional): The end date for the price history.
             frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
             frequency (int, optional): The frequency of data points.
             periodType (str, optional): The period type (day, month, year, ytd).
             period (int, optional): The period of data points.
             needExtendedHoursData (boolean, optional): Need extended hours data.
             needPreviousClose (boolean, optional): Need previous close price.
+            priority (int, optional): RequestScheduler priority class of the request.
         
         Returns:
-            dict: The JSON response containing the price history.
+            list: The candle dicts (open, high, low, close, volume, datetime in epoch milliseconds), or None on failure.
+        """
+        params = self._priceHistoryParams(symbol, startDate, endDate, frequencyType, frequency, periodType, period, needExtendedHoursData, needPreviousClose)
+        with self.transport.call('pricehistory') as call:
+            try:
+                return self._fetchPriceHistoryCandles(symbol, params, priority)
+            except Exception as Error:
+                call.setError(Error)
+                print(f"Schwab API getPriceHistory Failure: Ticker: {symbol}: {Error}")
+        return None
+
+    def _priceHistoryParams(self, symbol, startDate, endDate, frequencyType, frequency, periodType, period, needExtendedHoursData, needPreviousClose):
+        """
+        Build the query parameters of a /pricehistory request.
         """
-        url = f"{self.baseUrl}/pricehistory"
         params = {'symbol': symbol}
         
         util = Utilities()
@@ -288,35 +623,211 @@ class MarketData:
             params['needExtendedHoursData'] = needExtendedHoursData
         if needPreviousClose:
             params['needPreviousClose'] = needPreviousClose
+        return params
+
+    def _fetchPriceHistoryCandles(self, symbol, params, priority=None):
+        """
+        Send one /pricehistory request and return its candles, raising a RequestError on failure.
+        """
+        url = f"{self.baseUrl}/pricehistory"
+        with self.transport.call('pricehistory') as call:
+            response = self._get('pricehistory', url, params=params, priority=priority)
+            raiseForStatus(response)
+            with call.phase('decode'):
+                price_history_json = decodeJson(response.content, PRICE_HISTORY_SCHEMA)
+            if 'candles' not in price_history_json:
+                raise RequestError(f"No candles in response for {symbol}")
+            return price_history_json['candles']
 
-        response = requests.get(url, headers=self.getHeaders(), params=params)
+    def getPriceHistory(self, symbol, startDate=None, endDate=None, frequencyType=None, frequency=None, periodType=None, period=None, needExtendedHoursData=None, needPreviousClose=None, outputFormat='strings'):
+        """
+        Get price history for the specified symbol with optional parameters.
+        
+        Args:
+            symbol (str): The symbol to get price history for.
+            startDate (datetime, optional): The start date for the price history.
+            endDate (datetime, optional): The end date for the price history.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            periodType (str, optional): The period type (day, month, year, ytd).
+            period (int, optional): The period of data points.
+            needExtendedHoursData (boolean, optional): Need extended hours data.
+            needPreviousClose (boolean, optional): Need previous close price.
+            outputFormat (str, optional): Layout of the result:
+                'strings' - epoch datetime column plus formatted Eastern 'date' and 'time' string columns.
+                'index' - tz-aware US/Eastern DatetimeIndex with a 'sessionDate' column.
+                'epoch' - int64 epoch millisecond 'datetime' column with a 'sessionDate' column.
+                'numpy' - NumPy structured array of CANDLE_DTYPE records, no pandas objects.
         
-        price_history_json = response.json()
+        Returns:
+            DataFrame: The candles in the requested layout, or an ndarray for 'numpy'.
+        """
+        with self.transport.call('pricehistory') as call:
+            candles = self.getPriceHistoryCandles(symbol, startDate=startDate, endDate=endDate, frequencyType=frequencyType, frequency=frequency, periodType=periodType, period=period, needExtendedHoursData=needExtendedHoursData, needPreviousClose=needPreviousClose)
 
-        try:
-            if response is not None and response.status_code == 200:
-                if 'candles' in price_history_json:
-                    df_price_history = pd.DataFrame(price_history_json['candles'])
-                    
-                    # Convert the epoch milliseconds to datetime objects in UTC
-                    df_price_history['datetime_utc'] = pd.to_datetime(df_price_history['datetime'], unit='ms', utc=True)
+            if outputFormat == 'numpy':
+                if candles is None:
+                    return np.empty(0, dtype=CANDLE_DTYPE)
+                with call.phase('frame'):
+                    return Utilities().candlesToArray(candles)
 
-                    # Convert the datetime objects to Eastern Time
-                    df_price_history['datetime_eastern'] = df_price_history['datetime_utc'].dt.tz_convert('US/Eastern')
+            import pandas as pd
+            # getPriceHistoryCandles has already reported the failed request
+            if candles is None:
+                return pd.DataFrame()
 
-                    # Split the datetime string into separate date and time columns
-                    df_price_history['date'] = df_price_history['datetime_eastern'].dt.strftime('%Y-%m-%d')
-                    df_price_history['time'] = df_price_history['datetime_eastern'].dt.strftime('%H:%M:%S %Z%z')
+            try:
+                with call.phase('frame'):
+                    if outputFormat == 'strings':
+                        df_price_history = pd.DataFrame(candles)
+                        
+                        # Convert the epoch milliseconds to datetime objects in UTC
+                        df_price_history['datetime_utc'] = pd.to_datetime(df_price_history['datetime'], unit='ms', utc=True)
 
-                    # Drop the intermediate columns if needed
-                    df_price_history.drop(columns=['datetime_utc', 'datetime_eastern'], inplace=True)
+                        # Convert the datetime objects to Eastern Time
+                        df_price_history['datetime_eastern'] = df_price_history['datetime_utc'].dt.tz_convert('US/Eastern')
 
-                else:
-                    raise ValueError
-            else:
-                raise ValueError
-        
-        except Exception as Error:
-            print(f"Unable to obtain price history. Error: {Error}")    
-            df_price_history = pd.DataFrame()   
+                        # Split the datetime string into separate date and time columns
+                        df_price_history['date'] = df_price_history['datetime_eastern'].dt.strftime('%Y-%m-%d')
+                        df_price_history['time'] = df_price_history['datetime_eastern'].dt.strftime('%H:%M:%S %Z%z')
+
+                        # Drop the intermediate columns if needed
+                        df_price_history.drop(columns=['datetime_utc', 'datetime_eastern'], inplace=True)
+
+                    elif outputFormat in ('index', 'epoch'):
+                        df_price_history = self._candlesToTypedFrame(candles, outputFormat)
+
+                    else:
+                        raise ValueError(f"Unknown outputFormat {outputFormat}")
+            
+            except Exception as Error:
+                call.setError(Error)
+                print(f"Unable to obtain price history. Error: {Error}")    
+                df_price_history = pd.DataFrame()   
         return df_price_history
+
+    def _candlesToTypedFrame(self, candles, outputFormat):
+        """
+        Build a candle frame with typed timestamps and no per-row string formatting.
+        """
+        import pandas as pd
+        records = Utilities().candlesToArray(candles)
+        datetimeEastern = pd.DatetimeIndex(pd.to_datetime(records['datetime'], unit='ms', utc=True)).tz_convert('US/Eastern')
+
+        columns = {name: records[name] for name in ['open', 'high', 'low', 'close', 'volume']}
+        # Dropping the zone keeps the Eastern wall clock, flooring it to midnight gives the session date
+        columns['sessionDate'] = datetimeEastern.tz_localize(None).normalize()
+
+        if outputFormat == 'index':
+            return pd.DataFrame(columns, index=datetimeEastern.rename('datetime'))
+
+        columns['datetime'] = records['datetime']
+        return pd.DataFrame(columns)
+
+    def _fetchPriceHistoryWindow(self, symbol, windowStart, windowEnd, frequencyType, frequency, needExtendedHoursData, retries):
+        """
+        Fetch the candles of one backfill window, retrying only this window on failure.
+        """
+        params = self._priceHistoryParams(
+            symbol,
+            startDate=datetime.fromtimestamp(windowStart / 1000, timezone.utc),
+            endDate=datetime.fromtimestamp(windowEnd / 1000, timezone.utc),
+            frequencyType=frequencyType,
+            frequency=frequency,
+            periodType=PRICE_HISTORY_PERIOD_TYPES.get(frequencyType),
+            period=None,
+            needExtendedHoursData=needExtendedHoursData,
+            needPreviousClose=None,
+        )
+        return callWithRetries(lambda: self._fetchPriceHistoryCandles(symbol, params, RequestScheduler.PRIORITY_LOW), retries, f"Price history window {windowStart}-{windowEnd} for {symbol}")
+
+    def iterPriceHistoryWindows(self, symbol, startDate, endDate=None, frequencyType='minute', frequency=1, needExtendedHoursData=None, windowDays=None, maxWorkers=4, retries=2, asFrame=True):
+        """
+        Backfill a long price history range by fetching server-sized windows concurrently.
+        
+        Windows are yielded in chronological order as soon as they and every earlier window have
+        completed. Candles already yielded by an earlier window are dropped by epoch, and at most
+        2 * maxWorkers windows are held in memory at once.
+        
+        Args:
+            symbol (str): The symbol to get price history for.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            needExtendedHoursData (boolean, optional): Need extended hours data.
+            windowDays (int, optional): Days per request. Defaults to PRICE_HISTORY_WINDOW_DAYS for the frequency type.
+            maxWorkers (int, optional): Number of windows fetched concurrently.
+            retries (int, optional): Number of retries per failed window.
+            asFrame (boolean, optional): Yield DataFrames instead of CANDLE_DTYPE records.
+        
+        Yields:
+            DataFrame: The new candles of each window, or CANDLE_DTYPE records if asFrame is False.
+        """
+        if endDate is None:
+            endDate = datetime.now(timezone.utc)
+        if windowDays is None:
+            windowDays = PRICE_HISTORY_WINDOW_DAYS.get(frequencyType, 10)
+
+        util = Utilities()
+        startMs = util.convertDatetimeToUnixEpoch(startDate)
+        endMs = util.convertDatetimeToUnixEpoch(endDate)
+        windowMs = windowDays * 86400000
+        windows = iter([(windowStart, min(windowStart + windowMs - 1, endMs)) for windowStart in range(startMs, endMs + 1, windowMs)])
+
+        lastEpoch = None
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            def submitWindows():
+                while len(pending) < 2 * maxWorkers:
+                    window = next(windows, None)
+                    if window is None:
+                        return
+                    pending.append(executor.submit(self._fetchPriceHistoryWindow, symbol, window[0], window[1], frequencyType, frequency, needExtendedHoursData, retries))
+
+            submitWindows()
+            try:
+                while pending:
+                    candles = pending.popleft().result()
+                    submitWindows()
+
+                    records = util.candlesToArray(candles)
+                    records = records[np.argsort(records['datetime'], kind='stable')]
+                    keep = np.append(True, records['datetime'][1:] != records['datetime'][:-1]) if len(records) else np.empty(0, dtype=bool)
+                    records = records[keep]
+                    if lastEpoch is not None:
+                        records = records[records['datetime'] > lastEpoch]
+                    if len(records) == 0:
+                        continue
+                    lastEpoch = records['datetime'][-1]
+
+                    if asFrame:
+                        yield util.candleArrayToFrame(records)
+                    else:
+                        yield records
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def getPriceHistoryBackfill(self, symbol, startDate, endDate=None, frequencyType='minute', frequency=1, needExtendedHoursData=None, windowDays=None, maxWorkers=4, retries=2):
+        """
+        Backfill a long price history range and stitch the windows into one DataFrame.
+        
+        Args:
+            symbol (str): The symbol to get price history for.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            frequencyType (str, optional): The frequency type (minute, daily, weekly, monthly).
+            frequency (int, optional): The frequency of data points.
+            needExtendedHoursData (boolean, optional): Need extended hours data.
+            windowDays (int, optional): Days per request. Defaults to PRICE_HISTORY_WINDOW_DAYS for the frequency type.
+            maxWorkers (int, optional): Number of windows fetched concurrently.
+            retries (int, optional): Number of retries per failed window.
+        
+        Returns:
+            DataFrame: The deduplicated candles of the whole range, datetime in epoch milliseconds.
+        """
+        windows = list(self.iterPriceHistoryWindows(symbol, startDate, endDate=endDate, frequencyType=frequencyType, frequency=frequency, needExtendedHoursData=needExtendedHoursData, windowDays=windowDays, maxWorkers=maxWorkers, retries=retries, asFrame=False))
+        if len(windows) == 0:
+            return Utilities().candleArrayToFrame(np.empty(0, dtype=CANDLE_DTYPE))
+        return Utilities().candleArrayToFrame(np.concatenate(windows))
@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+import numpy as np
+from schwab_python_api.decoding import recordSchema
+
+# Output column suffix, source key in the option contract JSON and column type
+LEG_FIELDS = [
+    ('timestamp', 'quoteTimeInLong', 'int'),
+    ('symbol', 'symbol', 'str'),
+    ('option_root', 'optionRoot', 'str'),
+    ('option_type', 'putCall', 'str'),
+    ('strike_price', 'strikePrice', 'float'),
+    ('volume', 'totalVolume', 'int'),
+    ('open_interest', 'openInterest', 'int'),
+    ('last_price', 'last', 'float'),
+    ('bid', 'bid', 'float'),
+    ('ask', 'ask', 'float'),
+    ('itm', 'intrinsicValue', 'float'),
+    ('net_change', 'netChange', 'float'),
+    ('delta', 'delta', 'float'),
+    ('gamma', 'gamma', 'float'),
+    ('theta', 'theta', 'float'),
+    ('vega', 'vega', 'float'),
+    ('rho', 'rho', 'float'),
+    ('iv', 'volatility', 'float'),
+    ('osi', 'symbol', 'str'),
+]
+
+EXPIRATION_COLUMNS = ['expiration_year', 'expiration_month', 'expiration_day', 'expiration_date']
+
+# Decoding schemas of the contract fields the parser reads and of the /chains response around them
+OPTION_CONTRACT_SCHEMA = recordSchema('OptionContract', {key: kind for name, key, kind in LEG_FIELDS})
+OPTION_CHAIN_SCHEMA = recordSchema('OptionChain', {
+    'symbol': 'str',
+    'status': 'str',
+    'isDelayed': 'bool',
+    'underlyingPrice': 'float',
+    'interestRate': 'float',
+    'volatility': 'float',
+    'callExpDateMap': dict[str, dict[str, list[OPTION_CONTRACT_SCHEMA]]],
+    'putExpDateMap': dict[str, dict[str, list[OPTION_CONTRACT_SCHEMA]]],
+})
+
+class OptionChainParser:
+    def _collectLeg(self, expDateMap):
+        """
+        Flatten an expiration date map into a list of contracts plus the expiry key and strike of each.
+        """
+        contracts = []
+        expiryKeys = []
+        strikeKeys = []
+        for expiry, strikes in expDateMap.items():
+            strikeKeys.extend(strikes.keys())
+            contracts.extend(contractList[0] for contractList in strikes.values())
+            expiryKeys.extend([expiry] * len(strikes))
+        return contracts, expiryKeys, strikeKeys
+
+    def _buildColumns(self, contracts):
+        """
+        Fill one typed array per leg field directly from the contracts.
+        """
+        columns = {}
+        for name, key, kind in LEG_FIELDS:
+            if name == 'osi':
+                columns[name] = columns['symbol']
+                continue
+
+            values = [contract.get(key) for contract in contracts]
+            if kind == 'str':
+                columns[name] = np.array(values, dtype=object)
+            else:
+                array = np.array(values, dtype=np.float64)
+                if kind == 'int' and not np.isnan(array).any():
+                    array = array.astype(np.int64)
+                columns[name] = array
+
+        columns['itm'] = np.maximum(columns['itm'], 0)
+        columns['iv'] = columns['iv'] / 100
+        return columns
+
+    def _legColumns(self, expDateMap):
+        contracts, expiryKeys, strikeKeys = self._collectLeg(expDateMap)
+        columns = self._buildColumns(contracts)
+        columns['expiry_key'] = np.array(expiryKeys, dtype=object)
+        columns['strike'] = np.array(strikeKeys, dtype=np.float64)
+        return columns
+
+    def _legFrame(self, expDateMap):
+        import pandas as pd
+        return pd.DataFrame(self._legColumns(expDateMap))
+
+    def _addExpirationColumns(self, df):
+        """
+        Derive the expiration columns once per distinct expiry and broadcast them to the rows.
+        """
+        import pandas as pd
+        codes, uniques = pd.factorize(df['expiry_key'])
+        dates = pd.to_datetime([key.split(':')[0] for key in uniques], format='%Y-%m-%d')
+        dte = np.array([int(key.split(':')[1]) for key in uniques], dtype=np.int64)
+
+        df['expiration_year'] = np.asarray(dates.year, dtype=np.int64)[codes]
+        df['expiration_month'] = np.asarray(dates.month, dtype=np.int64)[codes]
+        df['expiration_day'] = np.asarray(dates.day, dtype=np.int64)[codes]
+        df['expiration_date'] = np.asarray(dates.strftime('%d-%b-%y'), dtype=object)[codes]
+        df['days_to_expiration'] = dte[codes]
+        return df
+
+    def parseColumns(self, optionChainJson):
+        """
+        Parse an option chain response into typed NumPy columns per leg, without pandas.
+
+        Args:
+            optionChainJson (dict): The decoded /chains response.
+
+        Returns:
+            dict: 'call' and 'put' column dicts in response order, each with the LEG_FIELDS columns plus
+                expiry_key, strike, expiration (datetime64[D]) and days_to_expiration.
+        """
+        legs = {}
+        for leg, mapName in [('call', 'callExpDateMap'), ('put', 'putExpDateMap')]:
+            columns = self._legColumns(optionChainJson.get(mapName, {}))
+
+            # Expiry keys are 'yyyy-mm-dd:dte', split each distinct key once
+            expirations = {}
+            for key in dict.fromkeys(columns['expiry_key']):
+                date, dte = key.split(':')
+                expirations[key] = (np.datetime64(date, 'D'), int(dte))
+            columns['expiration'] = np.array([expirations[key][0] for key in columns['expiry_key']], dtype='datetime64[D]')
+            columns['days_to_expiration'] = np.array([expirations[key][1] for key in columns['expiry_key']], dtype=np.int64)
+            legs[leg] = columns
+        return legs
+
+    def parseLegs(self, optionChainJson, timestamp=None):
+        """
+        Parse an option chain response into separate long-format call and put frames.
+
+        Args:
+            optionChainJson (dict): The decoded /chains response.
+            timestamp (int, optional): Epoch seconds the chain was fetched at. Defaults to now.
+
+        Returns:
+            tuple: (df_calls, df_puts), one row per contract, ordered by expiration and strike.
+        """
+        if timestamp is None:
+            timestamp = int(datetime.now(timezone.utc).timestamp())
+
+        legs = []
+        for mapName in ['callExpDateMap', 'putExpDateMap']:
+            df_leg = self._legFrame(optionChainJson.get(mapName, {}))
+            df_leg = self._addExpirationColumns(df_leg)
+            df_leg.sort_values(['expiry_key', 'strike'], inplace=True, kind='stable')
+            df_leg.rename(columns={'timestamp': 'quote_timestamp'}, inplace=True)
+            df_leg.insert(0, 'timestamp', timestamp)
+            df_leg.drop(columns=['expiry_key', 'strike'], inplace=True)
+            df_leg.reset_index(drop=True, inplace=True)
+            legs.append(df_leg)
+
+        return legs[0], legs[1]
+
+    def parse(self, optionChainJson, timestamp=None):
+        """
+        Parse an option chain response into one row per expiration and strike with call and put columns side by side.
+
+        Strikes listed on only one side are kept, with the other side's columns left empty.
+
+        Args:
+            optionChainJson (dict): The decoded /chains response.
+            timestamp (int, optional): Epoch seconds the chain was fetched at. Defaults to now.
+
+        Returns:
+            DataFrame: The option chain in the same layout as MarketData.getOptionChains.
+        """
+        if timestamp is None:
+            timestamp = int(datetime.now(timezone.utc).timestamp())
+
+        df_calls = self._legFrame(optionChainJson.get('callExpDateMap', {}))
+        df_puts = self._legFrame(optionChainJson.get('putExpDateMap', {}))
+        legColumns = [name for name, key, kind in LEG_FIELDS]
+        df_calls.rename(columns={name: f"call_{name}" for name in legColumns}, inplace=True)
+        df_puts.rename(columns={name: f"put_{name}" for name in legColumns}, inplace=True)
+
+        df_option_chain = df_calls.merge(df_puts, on=['expiry_key', 'strike'], how='outer', sort=False)
+        df_option_chain = self._addExpirationColumns(df_option_chain)
+        df_option_chain.sort_values(['expiry_key', 'strike'], inplace=True, kind='stable')
+        df_option_chain.insert(0, 'timestamp', timestamp)
+
+        columns = ['timestamp']
+        columns += [f"call_{name}" for name in legColumns]
+        columns += [f"put_{name}" for name in legColumns]
+        columns += EXPIRATION_COLUMNS
+        return df_option_chain[columns].reset_index(drop=True)
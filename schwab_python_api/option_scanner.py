@@ -0,0 +1,234 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+import numpy as np
+from schwab_python_api.option_chain import OptionChainParser
+
+# Output columns of a scan, one row per matching contract
+SCAN_COLUMNS = [
+    'underlying',
+    'underlying_price',
+    'quote_timestamp',
+    'symbol',
+    'option_root',
+    'option_type',
+    'strike_price',
+    'expiration',
+    'days_to_expiration',
+    'moneyness',
+    'volume',
+    'open_interest',
+    'last_price',
+    'bid',
+    'ask',
+    'itm',
+    'net_change',
+    'delta',
+    'gamma',
+    'theta',
+    'vega',
+    'rho',
+    'iv',
+]
+
+# Furthest expiration requested when only a minimum days to expiration is given
+MAX_SCAN_DAYS = 3650
+
+class OptionScanner:
+    def __init__(self, marketData, maxWorkers=4, priority=None):
+        """
+        Initialize a scanner that screens the option chains of many underlyings concurrently.
+
+        Every filter the chains endpoint supports is sent with the request, so only the remaining
+        filters run locally on the much smaller response.
+
+        Args:
+            marketData (MarketData): The client used to fetch the option chains.
+            maxWorkers (int, optional): Number of underlyings fetched concurrently.
+            priority (int, optional): RequestScheduler priority class of the chain requests.
+        """
+        self.marketData = marketData
+        self.maxWorkers = maxWorkers
+        self.priority = priority
+        # Underlyings whose chain could not be fetched or parsed in the most recent scan
+        self.failed = []
+
+    def _requestFilters(self, contractType, strikeCount, strikeRange, minDte, maxDte, minStrike, maxStrike, expMonth, optionType):
+        """
+        Translate the scan filters into the server-side parameters of getOptionChainJson.
+        """
+        filters = {
+            'contractType': contractType,
+            'strikeCount': strikeCount,
+            'strikeRange': strikeRange,
+            'expMonth': expMonth,
+            'optionType': optionType,
+        }
+        if minStrike is not None and minStrike == maxStrike:
+            filters['strike'] = minStrike
+
+        # The DTE window becomes an expiration date window, the exact bounds are applied locally
+        if minDte is not None or maxDte is not None:
+            today = datetime.now().date()
+            filters['fromDate'] = (today + timedelta(days=minDte or 0)).strftime('%Y-%m-%d')
+            filters['toDate'] = (today + timedelta(days=maxDte if maxDte is not None else MAX_SCAN_DAYS)).strftime('%Y-%m-%d')
+        return filters
+
+    def _matchColumns(self, symbol, optionChainJson, localFilters):
+        """
+        Apply the local filters to one chain response and return the matching contracts as columns.
+        """
+        legs = OptionChainParser().parseColumns(optionChainJson)
+        columns = {name: np.concatenate([legs['call'][name], legs['put'][name]]) for name in legs['call']}
+        count = len(columns['strike'])
+
+        underlyingPrice = optionChainJson.get('underlyingPrice')
+        underlyingPrice = np.nan if underlyingPrice is None else float(underlyingPrice)
+        columns['underlying'] = np.full(count, symbol, dtype=object)
+        columns['underlying_price'] = np.full(count, underlyingPrice)
+        columns['moneyness'] = columns['strike_price'] / underlyingPrice - 1
+        columns['quote_timestamp'] = columns['timestamp']
+
+        mask = np.ones(count, dtype=bool)
+        bounds = [
+            ('days_to_expiration', localFilters['minDte'], localFilters['maxDte']),
+            ('strike_price', localFilters['minStrike'], localFilters['maxStrike']),
+            ('moneyness', localFilters['minMoneyness'], localFilters['maxMoneyness']),
+            ('open_interest', localFilters['minOpenInterest'], None),
+        ]
+        for name, low, high in bounds:
+            if low is not None:
+                mask &= columns[name] >= low
+            if high is not None:
+                mask &= columns[name] <= high
+
+        if localFilters['contractType'] in ('CALL', 'PUT'):
+            mask &= columns['option_type'] == localFilters['contractType']
+
+        absDelta = np.abs(columns['delta'])
+        if localFilters['minAbsDelta'] is not None:
+            mask &= absDelta >= localFilters['minAbsDelta']
+        if localFilters['maxAbsDelta'] is not None:
+            mask &= absDelta <= localFilters['maxAbsDelta']
+
+        index = np.flatnonzero(mask)
+        index = index[np.lexsort((columns['option_type'][index].astype(str), columns['strike_price'][index], columns['expiration'][index]))]
+        return {name: columns[name][index] for name in SCAN_COLUMNS}
+
+    def _scanSymbol(self, symbol, requestFilters, localFilters):
+        optionChainJson = self.marketData.getOptionChainJson(symbol, priority=self.priority, **requestFilters)
+        if optionChainJson is None:
+            return None
+        return self._matchColumns(symbol, optionChainJson, localFilters)
+
+    def scan(self, symbols, contractType=None, strikeCount=None, strikeRange=None, minDte=None, maxDte=None, minStrike=None, maxStrike=None, minMoneyness=None, maxMoneyness=None, minAbsDelta=None, maxAbsDelta=None, minOpenInterest=None, expMonth=None, optionType=None, asFrame=True):
+        """
+        Scan the option chains of a universe of underlyings.
+
+        contractType, strikeCount, strikeRange, expMonth, optionType, the DTE window (as an expiration
+        date window) and a single strike (minStrike == maxStrike) are applied by the server. The exact
+        contract type, DTE, strike, moneyness, delta and open interest bounds are applied locally.
+
+        Underlyings are yielded in completion order and at most 2 * maxWorkers chains are in flight or
+        held at once. Underlyings without matches are skipped. Underlyings whose request fails are
+        skipped too and listed in the failed attribute, which each scan resets.
+
+        Args:
+            symbols (list): The underlyings to scan.
+            contractType (str, optional): CALL, PUT or ALL.
+            strikeCount (int, optional): Number of strikes above and below the at-the-money price.
+            strikeRange (str, optional): ITM, NTM, OTM, SAK, SBK, SNK or ALL.
+            minDte (int, optional): Minimum days to expiration.
+            maxDte (int, optional): Maximum days to expiration.
+            minStrike (float, optional): Minimum strike price.
+            maxStrike (float, optional): Maximum strike price.
+            minMoneyness (float, optional): Minimum strike / underlying price - 1.
+            maxMoneyness (float, optional): Maximum strike / underlying price - 1.
+            minAbsDelta (float, optional): Minimum absolute delta.
+            maxAbsDelta (float, optional): Maximum absolute delta.
+            minOpenInterest (int, optional): Minimum open interest.
+            expMonth (str, optional): Expiration month, JAN to DEC or ALL.
+            optionType (str, optional): S (standard), NS (non-standard) or ALL.
+            asFrame (boolean, optional): Yield DataFrames. If False, yield dicts of NumPy columns without importing pandas.
+
+        Yields:
+            DataFrame: The matching contracts of one underlying with the SCAN_COLUMNS, ordered by expiration, strike and type.
+        """
+        requestFilters = self._requestFilters(contractType, strikeCount, strikeRange, minDte, maxDte, minStrike, maxStrike, expMonth, optionType)
+        localFilters = {
+            'contractType': contractType,
+            'minDte': minDte,
+            'maxDte': maxDte,
+            'minStrike': minStrike,
+            'maxStrike': maxStrike,
+            'minMoneyness': minMoneyness,
+            'maxMoneyness': maxMoneyness,
+            'minAbsDelta': minAbsDelta,
+            'maxAbsDelta': maxAbsDelta,
+            'minOpenInterest': minOpenInterest,
+        }
+
+        self.failed = []
+        symbols = iter(dict.fromkeys(symbols))
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            def submitSymbols():
+                while len(pending) < 2 * self.maxWorkers:
+                    symbol = next(symbols, None)
+                    if symbol is None:
+                        return
+                    pending[executor.submit(self._scanSymbol, symbol, requestFilters, localFilters)] = symbol
+
+            submitSymbols()
+            try:
+                while pending:
+                    done, notDone = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        symbol = pending.pop(future)
+                        try:
+                            columns = future.result()
+                        except Exception as Error:
+                            print(f"Schwab API scan Failure: Ticker: {symbol}: {Error}")
+                            self.failed.append(symbol)
+                            continue
+                        if columns is None:
+                            # getOptionChainJson has already reported the failed request
+                            self.failed.append(symbol)
+                            continue
+                        if len(columns['symbol']) == 0:
+                            continue
+
+                        if asFrame:
+                            import pandas as pd
+                            yield pd.DataFrame(columns)
+                        else:
+                            yield columns
+                    submitSymbols()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def scanAll(self, symbols, returnFailed=False, **filters):
+        """
+        Scan a universe of underlyings and collect the matches into one DataFrame.
+
+        Args:
+            symbols (list): The underlyings to scan.
+            returnFailed (boolean, optional): Also return the underlyings whose chain could not be fetched.
+            **filters: The filters accepted by scan.
+
+        Returns:
+            DataFrame: The matching contracts of all underlyings, ordered by underlying, expiration, strike and type.
+                With returnFailed, a (matches, failedSymbols) tuple.
+        """
+        import pandas as pd
+        frames = list(self.scan(symbols, asFrame=True, **filters))
+        if len(frames) == 0:
+            df_matches = pd.DataFrame(columns=SCAN_COLUMNS)
+        else:
+            df_matches = pd.concat(frames, ignore_index=True)
+            df_matches.sort_values(['underlying', 'expiration', 'strike_price', 'option_type'], inplace=True, kind='stable')
+            df_matches.reset_index(drop=True, inplace=True)
+
+        if returnFailed:
+            return df_matches, list(self.failed)
+        return df_matches
@@ -0,0 +1,579 @@
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from schwab_python_api.decoding import decodeJson
+from schwab_python_api.rate_limiter import RequestScheduler
+from schwab_python_api.transport import RequestError, raiseForStatus
+from schwab_python_api.utilities import formatTransactionTime
+
+# Allowed values of the order fields checked when a template is built
+ORDER_TYPES = ['MARKET', 'LIMIT', 'STOP', 'STOP_LIMIT', 'TRAILING_STOP', 'MARKET_ON_CLOSE', 'LIMIT_ON_CLOSE', 'NET_DEBIT', 'NET_CREDIT', 'NET_ZERO']
+SESSIONS = ['NORMAL', 'AM', 'PM', 'SEAMLESS']
+DURATIONS = ['DAY', 'GOOD_TILL_CANCEL', 'FILL_OR_KILL', 'IMMEDIATE_OR_CANCEL']
+ORDER_STRATEGY_TYPES = ['SINGLE', 'TRIGGER', 'OCO']
+INSTRUCTIONS = ['BUY', 'SELL', 'BUY_TO_COVER', 'SELL_SHORT', 'BUY_TO_OPEN', 'BUY_TO_CLOSE', 'SELL_TO_OPEN', 'SELL_TO_CLOSE']
+PRICED_ORDER_TYPES = ['LIMIT', 'STOP_LIMIT', 'LIMIT_ON_CLOSE', 'NET_DEBIT', 'NET_CREDIT']
+
+class OrderError(RequestError):
+    def __init__(self, message, records, statusCode=None):
+        """
+        An order request, or some requests of a bulk cancel or replace, that failed.
+
+        Args:
+            message (str): Description of the failure.
+            records (list): The latency records of the requests, the failed ones with ok False and their error.
+            statusCode (int, optional): The HTTP status of the first failure.
+        """
+        super().__init__(message, statusCode)
+        self.records = records
+
+class OrderParameter:
+    def __init__(self, name):
+        """
+        A placeholder for an order field whose value is supplied when the template is rendered, e.g. OrderParameter('price').
+
+        Args:
+            name (str): The name of the keyword argument of OrderTemplate.render.
+        """
+        self.name = name
+        self.marker = f"__schwab_order_parameter_{name}__"
+
+class OrderTemplate:
+    def __init__(self, order):
+        """
+        Validate an order once and serialize it into the request body.
+
+        Fields holding an OrderParameter are left open and filled in by render, so the price or
+        quantity of a prepared order can change without validating or serializing it again.
+
+        Args:
+            order (dict): The order JSON, e.g. built with equityOrder or optionOrder.
+        """
+        self.validate(order)
+        self.order = order
+        self.parameters = []
+
+        # Serialize with each parameter as a quoted marker, then split the body at the markers
+        body = json.dumps(order, separators=(',', ':'), default=self._markParameter)
+        segments = [body]
+        for name in self.parameters:
+            marker = f'"__schwab_order_parameter_{name}__"'
+            segments = [part for segment in segments for part in self._splitKeep(segment, marker)]
+        self.segments = segments
+        self.body = body.encode() if not self.parameters else None
+
+    def _markParameter(self, value):
+        if isinstance(value, OrderParameter):
+            if value.name not in self.parameters:
+                self.parameters.append(value.name)
+            return value.marker
+        raise TypeError(f"Order field of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def _splitKeep(segment, marker):
+        parts = segment.split(marker)
+        result = [parts[0]]
+        for part in parts[1:]:
+            result.extend([marker, part])
+        return result
+
+    @staticmethod
+    def validate(order):
+        """
+        Check the fields of an order that Schwab rejects when missing or invalid.
+
+        Args:
+            order (dict): The order JSON.
+
+        Raises:
+            ValueError: If the order is incomplete or holds an invalid value.
+        """
+        def check(name, value, allowed):
+            if value not in allowed:
+                raise ValueError(f"Invalid order {name} {value!r}, expected one of {', '.join(allowed)}")
+
+        check('orderType', order.get('orderType'), ORDER_TYPES)
+        check('session', order.get('session'), SESSIONS)
+        check('duration', order.get('duration'), DURATIONS)
+        check('orderStrategyType', order.get('orderStrategyType'), ORDER_STRATEGY_TYPES)
+
+        if order['orderType'] in PRICED_ORDER_TYPES and order.get('price') is None:
+            raise ValueError(f"A {order['orderType']} order needs a price")
+        if order['orderType'] in ('STOP', 'STOP_LIMIT') and order.get('stopPrice') is None:
+            raise ValueError(f"A {order['orderType']} order needs a stopPrice")
+
+        if order['orderStrategyType'] == 'OCO':
+            if len(order.get('childOrderStrategies', [])) < 2:
+                raise ValueError("An OCO order needs at least two childOrderStrategies")
+        else:
+            legs = order.get('orderLegCollection')
+            if not legs:
+                raise ValueError("An order needs an orderLegCollection")
+            for leg in legs:
+                check('instruction', leg.get('instruction'), INSTRUCTIONS)
+                if leg.get('quantity') is None:
+                    raise ValueError("Every order leg needs a quantity")
+                instrument = leg.get('instrument', {})
+                if not instrument.get('symbol') or not instrument.get('assetType'):
+                    raise ValueError("Every order leg needs an instrument symbol and assetType")
+
+        for child in order.get('childOrderStrategies', []):
+            OrderTemplate.validate(child)
+
+    def render(self, **values):
+        """
+        Get the request body of the order with the parameters filled in.
+
+        Args:
+            **values: A number or string for every OrderParameter of the template.
+
+        Returns:
+            bytes: The JSON request body.
+
+        Raises:
+            ValueError: If a parameter of the template has no value, or a value has no parameter.
+        """
+        unexpected = [name for name in values if name not in self.parameters]
+        if unexpected:
+            raise ValueError(f"Unexpected order parameters: {', '.join(unexpected)}")
+        if self.body is not None:
+            return self.body
+
+        missing = [name for name in self.parameters if name not in values]
+        if missing:
+            raise ValueError(f"Missing order parameters: {', '.join(missing)}")
+
+        rendered = {f'"__schwab_order_parameter_{name}__"': json.dumps(values[name]) for name in self.parameters}
+        return ''.join(rendered.get(segment, segment) for segment in self.segments).encode()
+
+    @staticmethod
+    def equityOrder(symbol, instruction, quantity, orderType='LIMIT', price=None, stopPrice=None, duration='DAY', session='NORMAL'):
+        """
+        Build a single-leg equity order.
+
+        Args:
+            symbol (str): Ticker symbol.
+            instruction (str): BUY, SELL, BUY_TO_COVER or SELL_SHORT.
+            quantity (float or OrderParameter): Number of shares.
+            orderType (str, optional): One of ORDER_TYPES.
+            price (float or OrderParameter, optional): Limit price.
+            stopPrice (float or OrderParameter, optional): Stop price.
+            duration (str, optional): One of DURATIONS.
+            session (str, optional): One of SESSIONS.
+
+        Returns:
+            dict: The order JSON.
+        """
+        return OrderTemplate._singleLegOrder(symbol, 'EQUITY', instruction, quantity, orderType, price, stopPrice, duration, session)
+
+    @staticmethod
+    def optionOrder(symbol, instruction, quantity, orderType='LIMIT', price=None, stopPrice=None, duration='DAY', session='NORMAL'):
+        """
+        Build a single-leg option order.
+
+        Args:
+            symbol (str): OSI option symbol, e.g. 'AAPL  240621C00190000'.
+            instruction (str): BUY_TO_OPEN, BUY_TO_CLOSE, SELL_TO_OPEN or SELL_TO_CLOSE.
+            quantity (float or OrderParameter): Number of contracts.
+            orderType (str, optional): One of ORDER_TYPES.
+            price (float or OrderParameter, optional): Limit price.
+            stopPrice (float or OrderParameter, optional): Stop price.
+            duration (str, optional): One of DURATIONS.
+            session (str, optional): One of SESSIONS.
+
+        Returns:
+            dict: The order JSON.
+        """
+        return OrderTemplate._singleLegOrder(symbol, 'OPTION', instruction, quantity, orderType, price, stopPrice, duration, session)
+
+    @staticmethod
+    def _singleLegOrder(symbol, assetType, instruction, quantity, orderType, price, stopPrice, duration, session):
+        order = {
+            'orderType': orderType,
+            'session': session,
+            'duration': duration,
+            'orderStrategyType': 'SINGLE',
+            'orderLegCollection': [{
+                'instruction': instruction,
+                'quantity': quantity,
+                'instrument': {'symbol': symbol, 'assetType': assetType},
+            }],
+        }
+        if price is not None:
+            order['price'] = price
+        if stopPrice is not None:
+            order['stopPrice'] = stopPrice
+        return order
+
+class Orders:
+    def __init__(self, authInstance, transport=None, minimumTokenValidity=120, maxLatencyRecords=10000):
+        """
+        Initialize the Orders class with an authentication instance.
+
+        Args:
+            authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to authInstance.transport.
+            minimumTokenValidity (float, optional): Seconds the access token must remain valid when an order is sent.
+            maxLatencyRecords (int, optional): Number of the most recent order latency records kept.
+        """
+        self.authInstance = authInstance
+        self.transport = transport if transport is not None else authInstance.transport
+        self.baseUrl = "https://api.schwabapi.com/trader/v1"
+        self.minimumTokenValidity = minimumTokenValidity
+        self.latencies = deque(maxlen=maxLatencyRecords)
+        self.keepWarmThread = None
+        self.stopKeepWarmEvent = threading.Event()
+
+    def getHeaders(self):
+        """
+        Get the authorization and JSON content headers for API requests.
+
+        Returns:
+            dict: A dictionary containing the authorization and content type headers.
+        """
+        return {
+            'Authorization': f"Bearer {self.authInstance.getAccessToken(self.minimumTokenValidity)}",
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        }
+
+    def prepare(self, connections=1, keepWarmSeconds=None):
+        """
+        Take the token refresh and the connection setup off the order path.
+
+        Starts the background token refresh with a margin above minimumTokenValidity, so sending an
+        order never waits on a refresh, and opens keep-alive connections to the trader API.
+
+        Args:
+            connections (int, optional): Number of connections to open, e.g. the concurrency of bulk cancel/replace.
+            keepWarmSeconds (float, optional): If given, ping the trader API at this interval so idle connections are not closed.
+        """
+        self.authInstance.refreshMargin = max(self.authInstance.refreshMargin, self.minimumTokenValidity + 60)
+        self.authInstance.getAccessToken(self.authInstance.refreshMargin)
+        self.authInstance.startAutoRefresh()
+
+        self.warmConnections(connections)
+        if keepWarmSeconds is not None:
+            self.startKeepWarm(keepWarmSeconds)
+
+    def warmConnections(self, connections=1):
+        """
+        Open keep-alive connections to the trader API with concurrent account number requests.
+        The requests bypass the RequestScheduler, so they never delay an order waiting for a trader token.
+
+        Args:
+            connections (int, optional): Number of connections to open.
+        """
+        url = f"{self.baseUrl}/accounts/accountNumbers"
+        headers = self.getHeaders()
+        # Concurrent requests cannot share a connection, so each one opens or reuses its own
+        barrier = threading.Barrier(connections)
+
+        def warm():
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            # Not scheduled, so keep-warm pings never take a trader token an order is waiting for
+            self.transport.get(url, headers=headers, scheduled=False)
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            for future in [executor.submit(warm) for i in range(connections)]:
+                future.result()
+
+    def startKeepWarm(self, intervalSeconds=30):
+        """
+        Start a background thread that keeps a trader API connection open between orders.
+
+        Args:
+            intervalSeconds (float, optional): Seconds between pings.
+        """
+        if self.keepWarmThread is not None and self.keepWarmThread.is_alive():
+            return
+
+        self.stopKeepWarmEvent.clear()
+        self.keepWarmThread = threading.Thread(target=self._keepWarmLoop, args=(intervalSeconds,), name='schwab-orders-keep-warm', daemon=True)
+        self.keepWarmThread.start()
+
+    def stopKeepWarm(self):
+        """
+        Stop the keep warm thread.
+        """
+        self.stopKeepWarmEvent.set()
+        if self.keepWarmThread is not None:
+            self.keepWarmThread.join()
+            self.keepWarmThread = None
+
+    def _keepWarmLoop(self, intervalSeconds):
+        while not self.stopKeepWarmEvent.wait(intervalSeconds):
+            try:
+                self.warmConnections(1)
+            except Exception as Error:
+                print(f"Unable to keep the trader API connection warm. Error: {Error}")
+
+    def _send(self, operation, method, url, accountID, orderId=None, body=None, raiseOnError=True):
+        """
+        Send an order request and record its submit-to-ack latency.
+
+        The trader token is acquired before the clock starts, so seconds covers only the request
+        and queueSeconds holds the wait for the rate limiter.
+
+        Returns:
+            dict: The latency record, with the orderId assigned by Schwab for place and replace.
+
+        Raises:
+            OrderError: With the record, if the request failed and raiseOnError is True.
+        """
+        headers = self.getHeaders()
+        record = {
+            'operation': operation,
+            'accountID': accountID,
+            'orderId': orderId,
+            'submitted': time.time(),
+            'queueSeconds': None,
+            'seconds': None,
+            'statusCode': None,
+            'ok': False,
+            'error': None,
+        }
+        with self.transport.call('orders') as call:
+            queueStart = time.perf_counter()
+            family = self.transport.scheduler.getApiFamily(url)
+            if family is not None:
+                self.transport.scheduler.acquire(family, RequestScheduler.PRIORITY_HIGH)
+            start = time.perf_counter()
+            record['queueSeconds'] = start - queueStart
+            call.addTiming('queue', record['queueSeconds'])
+            try:
+                response = self.transport.request(method, url, headers=headers, data=body, scheduled=False)
+                record['seconds'] = time.perf_counter() - start
+                record['statusCode'] = response.status_code
+                raiseForStatus(response)
+            except Exception as Error:
+                if record['seconds'] is None:
+                    record['seconds'] = time.perf_counter() - start
+                # Schwab explains a rejected order in the response body
+                record['error'] = str(Error) if record['statusCode'] is None else f"{Error}: {response.text}"
+                call.setError(Error)
+                self.latencies.append(record)
+                print(f"Schwab API {operation} Failure: Order: {orderId}: {record['error']}")
+                if raiseOnError:
+                    raise OrderError(f"Order {operation} failed: {record['error']}", [record], record['statusCode']) from Error
+                return record
+
+        record['ok'] = True
+        # Place and replace answer 201 with the new order in the Location header
+        location = response.headers.get('Location')
+        if location:
+            newOrderId = location.rstrip('/').rsplit('/', 1)[-1]
+            if newOrderId.isdigit():
+                record['orderId'] = int(newOrderId)
+            else:
+                print(f"Schwab API {operation}: Unable to read the orderId from Location {location}")
+
+        self.latencies.append(record)
+        return record
+
+    def placeOrder(self, accountID, order, raiseOnError=True, **values):
+        """
+        Place an order.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            order (OrderTemplate or dict): A prepared template, or an order JSON that is validated and serialized now.
+            raiseOnError (boolean, optional): Raise an OrderError if the order is rejected. If False, return its failed record instead.
+            **values: The OrderParameter values of the template.
+
+        Returns:
+            dict: The latency record of the order with its orderId, statusCode, ok and seconds from submit to acknowledgement.
+
+        Raises:
+            OrderError: With the record, if the request failed and raiseOnError is True.
+        """
+        if not isinstance(order, OrderTemplate):
+            order = OrderTemplate(order)
+        body = order.render(**values)
+        return self._send('place', 'POST', f"{self.baseUrl}/accounts/{accountID}/orders", accountID, body=body, raiseOnError=raiseOnError)
+
+    def replaceOrder(self, accountID, orderId, order, raiseOnError=True, **values):
+        """
+        Replace a working order. Schwab cancels the order and places the replacement under a new orderId.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            orderId (int): The order to replace.
+            order (OrderTemplate or dict): The replacement order.
+            raiseOnError (boolean, optional): Raise an OrderError if the replacement is rejected. If False, return its failed record instead.
+            **values: The OrderParameter values of the template.
+
+        Returns:
+            dict: The latency record with the orderId of the replacement order.
+
+        Raises:
+            OrderError: With the record, if the request failed and raiseOnError is True.
+        """
+        if not isinstance(order, OrderTemplate):
+            order = OrderTemplate(order)
+        body = order.render(**values)
+        return self._send('replace', 'PUT', f"{self.baseUrl}/accounts/{accountID}/orders/{orderId}", accountID, orderId=orderId, body=body, raiseOnError=raiseOnError)
+
+    def cancelOrder(self, accountID, orderId, raiseOnError=True):
+        """
+        Cancel a working order.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            orderId (int): The order to cancel.
+            raiseOnError (boolean, optional): Raise an OrderError if the cancellation is rejected. If False, return its failed record instead.
+
+        Returns:
+            dict: The latency record of the cancellation.
+
+        Raises:
+            OrderError: With the record, if the request failed and raiseOnError is True.
+        """
+        return self._send('cancel', 'DELETE', f"{self.baseUrl}/accounts/{accountID}/orders/{orderId}", accountID, orderId=orderId, raiseOnError=raiseOnError)
+
+    @staticmethod
+    def _checkRecords(operation, records, raiseOnError):
+        failed = [record for record in records if not record['ok']]
+        if failed and raiseOnError:
+            raise OrderError(f"{len(failed)} of {len(records)} order {operation}s failed", records, failed[0]['statusCode'])
+        return records
+
+    def cancelOrders(self, accountID, orderIds, maxWorkers=8, raiseOnError=True):
+        """
+        Cancel several orders concurrently. Every cancellation is sent even if others fail.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            orderIds (list): The orders to cancel.
+            maxWorkers (int, optional): Number of cancellations in flight.
+            raiseOnError (boolean, optional): Raise an OrderError if any cancellation failed. If False, return the failed records with ok False.
+
+        Returns:
+            list: The latency records in the order of orderIds.
+
+        Raises:
+            OrderError: With the records of all the cancellations, if one failed and raiseOnError is True.
+        """
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            records = list(executor.map(lambda orderId: self.cancelOrder(accountID, orderId, raiseOnError=False), orderIds))
+        return self._checkRecords('cancel', records, raiseOnError)
+
+    def replaceOrders(self, accountID, replacements, maxWorkers=8, raiseOnError=True):
+        """
+        Replace several orders concurrently. Every replacement is sent even if others fail.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            replacements (list): (orderId, order, values) tuples, where values is a dict of the OrderParameter values or None.
+            maxWorkers (int, optional): Number of replacements in flight.
+            raiseOnError (boolean, optional): Raise an OrderError if any replacement failed. If False, return the failed records with ok False.
+
+        Returns:
+            list: The latency records in the order of replacements.
+
+        Raises:
+            OrderError: With the records of all the replacements, if one failed and raiseOnError is True.
+        """
+        def replace(replacement):
+            orderId, order, values = replacement
+            return self.replaceOrder(accountID, orderId, order, raiseOnError=False, **(values or {}))
+
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            records = list(executor.map(replace, replacements))
+        return self._checkRecords('replace', records, raiseOnError)
+
+    def getOrder(self, accountID, orderId):
+        """
+        Get the status and details of an order.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            orderId (int): The order.
+
+        Returns:
+            dict: The JSON response containing the order, or None on failure.
+        """
+        url = f"{self.baseUrl}/accounts/{accountID}/orders/{orderId}"
+        with self.transport.call('orders') as call:
+            response = self.transport.get(url, headers=self.getHeaders())
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getOrder Failure: Order: {orderId}: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def getOrders(self, accountID=None, fromEnteredTime=None, toEnteredTime=None, status=None, maxResults=None):
+        """
+        Get the orders of one account, or of all linked accounts.
+
+        Args:
+            accountID (str, optional): Encrypted ID of the account. Defaults to all linked accounts.
+            fromEnteredTime (datetime, optional): Orders entered at or after this time. Defaults to one day ago.
+            toEnteredTime (datetime, optional): Orders entered before this time. Defaults to now.
+            status (str, optional): Only orders with this status, e.g. WORKING.
+            maxResults (int, optional): Maximum number of orders returned.
+
+        Returns:
+            list: The JSON response containing the orders, or None on failure.
+        """
+        if toEnteredTime is None:
+            toEnteredTime = datetime.now(timezone.utc)
+        if fromEnteredTime is None:
+            fromEnteredTime = toEnteredTime - timedelta(days=1)
+
+        if accountID is None:
+            url = f"{self.baseUrl}/orders"
+        else:
+            url = f"{self.baseUrl}/accounts/{accountID}/orders"
+        params = {
+            'fromEnteredTime': formatTransactionTime(fromEnteredTime),
+            'toEnteredTime': formatTransactionTime(toEnteredTime),
+        }
+        if status is not None:
+            params['status'] = status
+        if maxResults is not None:
+            params['maxResults'] = maxResults
+
+        with self.transport.call('orders') as call:
+            response = self.transport.get(url, headers=self.getHeaders(), params=params)
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getOrders Failure: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def getLatencyStats(self):
+        """
+        Summarize the recorded submit-to-ack latencies per operation.
+
+        Returns:
+            dict: Keyed by operation, with count, failed, and mean, p50, p90, p99 and max milliseconds.
+        """
+        byOperation = {}
+        for record in list(self.latencies):
+            byOperation.setdefault(record['operation'], []).append(record)
+
+        stats = {}
+        for operation, records in byOperation.items():
+            milliseconds = sorted(record['seconds'] * 1000 for record in records)
+            count = len(milliseconds)
+            stats[operation] = {
+                'count': count,
+                'failed': sum(1 for record in records if not record['ok']),
+                'meanMilliseconds': sum(milliseconds) / count,
+                'p50Milliseconds': milliseconds[min(int(count * 0.5), count - 1)],
+                'p90Milliseconds': milliseconds[min(int(count * 0.9), count - 1)],
+                'p99Milliseconds': milliseconds[min(int(count * 0.99), count - 1)],
+                'maxMilliseconds': milliseconds[-1],
+            }
+        return stats
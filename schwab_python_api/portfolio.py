@@ -0,0 +1,77 @@
+import numpy as np
+from schwab_python_api.utilities import nanEqual
+
+# Position columns compared between snapshots to decide whether a position changed
+DIFF_COLUMNS = [
+    'longQuantity',
+    'shortQuantity',
+    'averagePrice',
+]
+
+class PortfolioTracker:
+    def __init__(self, accounts, accountIDs=None, diffColumns=None):
+        """
+        Initialize a tracker that takes portfolio snapshots and diffs each against the previous one.
+
+        Args:
+            accounts (Accounts): The client used to fetch positions.
+            accountIDs (list, optional): Encrypted IDs of the accounts. Defaults to all linked accounts.
+            diffColumns (list, optional): Columns compared between snapshots. Defaults to DIFF_COLUMNS.
+        """
+        self.accounts = accounts
+        self.accountIDs = accountIDs
+        self.diffColumns = diffColumns if diffColumns is not None else DIFF_COLUMNS
+        self.snapshot = None
+
+    def diff(self, previous, current):
+        """
+        Get the positions that were added, removed or changed between two snapshots.
+
+        Args:
+            previous (DataFrame): The earlier snapshot, indexed by accountNumber and contractSpec.
+            current (DataFrame): The later snapshot, indexed by accountNumber and contractSpec.
+
+        Returns:
+            DataFrame: The added and changed rows of current and the removed rows of previous, with a 'change' column of added, removed or changed.
+        """
+        import pandas as pd
+        added = current.index.difference(previous.index)
+        removed = previous.index.difference(current.index)
+        common = current.index.intersection(previous.index)
+
+        columns = [column for column in self.diffColumns if column in current.columns and column in previous.columns]
+        before = previous.loc[common, columns].to_numpy(dtype=np.float64)
+        after = current.loc[common, columns].to_numpy(dtype=np.float64)
+        changed = common[~nanEqual(before, after).all(axis=1)]
+
+        df_diff = pd.concat([
+            current.loc[added].assign(change='added'),
+            current.loc[changed].assign(change='changed'),
+            previous.loc[removed].assign(change='removed'),
+        ])
+        return df_diff.sort_index()
+
+    def refresh(self):
+        """
+        Take a new snapshot and diff it against the previous one. The first snapshot reports every position as added.
+
+        Only positions of accounts that were fetched can be reported as removed. If any account could not be
+        fetched, the failure is reported and the positions of the accounts that were not fetched are carried
+        over from the previous snapshot, so they stay the baseline of the next refresh for those accounts.
+
+        Returns:
+            tuple: (snapshot, diff) DataFrames.
+        """
+        import pandas as pd
+        current, fetchedAccountNumbers, failedAccountIDs = self.accounts.getPortfolioSnapshot(accountIDs=self.accountIDs, returnFailed=True)
+        previous = self.snapshot
+        if previous is None:
+            previous = current.iloc[0:0]
+        fetched = previous.index.get_level_values('accountNumber').isin(fetchedAccountNumbers)
+
+        df_diff = self.diff(previous[fetched], current)
+        if failedAccountIDs:
+            print(f"Unable to refresh {len(failedAccountIDs)} account(s), keeping their previous positions")
+            current = pd.concat([current, previous[~fetched]]).sort_index()
+        self.snapshot = current
+        return current, df_diff
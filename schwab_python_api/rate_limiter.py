@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+class TokenBucket:
+    def __init__(self, requestsPerMinute, burst):
+        """
+        Initialize a token bucket that refills continuously at requestsPerMinute.
+
+        Args:
+            requestsPerMinute (float): Sustained request rate.
+            burst (int): Maximum number of tokens the bucket can hold.
+        """
+        self.rate = requestsPerMinute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def secondsUntilToken(self):
+        return max(1.0 - self.tokens, 0.0) / self.rate
+
+class RequestScheduler:
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+
+    # Schwab allows 120 requests per minute per API family. A sustained rate of 110 plus a
+    # burst of 10 keeps any 60 second window at or below that quota.
+    DEFAULT_QUOTAS = {
+        'marketdata': {'requestsPerMinute': 110, 'burst': 10},
+        'trader': {'requestsPerMinute': 110, 'burst': 10},
+    }
+
+    # Account and order traffic jumps ahead of market data by default
+    DEFAULT_PRIORITIES = {
+        'marketdata': PRIORITY_NORMAL,
+        'trader': PRIORITY_HIGH,
+    }
+
+    def __init__(self, quotas=None, defaultPriorities=None):
+        """
+        Initialize a priority request scheduler with one token bucket per API family.
+
+        Args:
+            quotas (dict, optional): Per family dict with requestsPerMinute and burst. Merged over DEFAULT_QUOTAS.
+            defaultPriorities (dict, optional): Priority used per family when a request does not specify one.
+        """
+        self.quotas = {family: dict(quota) for family, quota in self.DEFAULT_QUOTAS.items()}
+        if quotas is not None:
+            for family, quota in quotas.items():
+                self.quotas.setdefault(family, {}).update(quota)
+
+        self.defaultPriorities = dict(self.DEFAULT_PRIORITIES)
+        if defaultPriorities is not None:
+            self.defaultPriorities.update(defaultPriorities)
+
+        self.buckets = {}
+        self.waiters = {}
+        self.conditions = {}
+        self.metrics = {}
+        for family, quota in self.quotas.items():
+            self.buckets[family] = TokenBucket(quota['requestsPerMinute'], quota.get('burst', 1))
+            self.waiters[family] = []
+            self.conditions[family] = threading.Condition()
+            self.metrics[family] = {
+                'requests': 0,
+                'delayedRequests': 0,
+                'totalWaitSeconds': 0.0,
+                'maxWaitSeconds': 0.0,
+                'maxQueueDepth': 0,
+                'byPriority': {},
+            }
+        self.sequence = itertools.count()
+
+    def getApiFamily(self, url):
+        """
+        Map a request URL to its API family, e.g. https://api.schwabapi.com/marketdata/v1/quotes -> marketdata.
+
+        Returns:
+            str: The family name, or None if the URL is not rate limited.
+        """
+        path = urlparse(url).path.strip('/')
+        family = path.split('/', 1)[0]
+        if family in self.buckets:
+            return family
+        return None
+
+    def acquire(self, family, priority=None):
+        """
+        Block until a request of the given family and priority may be sent.
+
+        Waiters are served lowest priority value first, then first come first served.
+
+        Args:
+            family (str): The API family.
+            priority (int, optional): One of the PRIORITY_* constants. Defaults to the family default.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if priority is None:
+            priority = self.defaultPriorities.get(family, self.PRIORITY_NORMAL)
+
+        bucket = self.buckets[family]
+        waiters = self.waiters[family]
+        condition = self.conditions[family]
+        metrics = self.metrics[family]
+
+        start = time.monotonic()
+        with condition:
+            entry = (priority, next(self.sequence))
+            heapq.heappush(waiters, entry)
+            metrics['maxQueueDepth'] = max(metrics['maxQueueDepth'], len(waiters))
+            try:
+                while True:
+                    bucket.refill(time.monotonic())
+                    if waiters[0] == entry:
+                        if bucket.tokens >= 1:
+                            heapq.heappop(waiters)
+                            bucket.tokens -= 1
+                            break
+                        condition.wait(bucket.secondsUntilToken())
+                    else:
+                        condition.wait()
+            except BaseException:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+                raise
+            finally:
+                # Let the next waiter in line check the bucket
+                condition.notify_all()
+
+            waited = time.monotonic() - start
+            metrics['requests'] += 1
+            metrics['totalWaitSeconds'] += waited
+            metrics['maxWaitSeconds'] = max(metrics['maxWaitSeconds'], waited)
+            if waited > 0.001:
+                metrics['delayedRequests'] += 1
+            priorityMetrics = metrics['byPriority'].setdefault(priority, {'requests': 0, 'totalWaitSeconds': 0.0, 'maxWaitSeconds': 0.0})
+            priorityMetrics['requests'] += 1
+            priorityMetrics['totalWaitSeconds'] += waited
+            priorityMetrics['maxWaitSeconds'] = max(priorityMetrics['maxWaitSeconds'], waited)
+
+        return waited
+
+    def getMetrics(self):
+        """
+        Get queue depth, wait time and quota headroom per API family.
+
+        Returns:
+            dict: Metrics keyed by API family.
+        """
+        result = {}
+        for family, metrics in self.metrics.items():
+            with self.conditions[family]:
+                bucket = self.buckets[family]
+                bucket.refill(time.monotonic())
+                familyMetrics = dict(metrics)
+                familyMetrics['byPriority'] = {priority: dict(values) for priority, values in metrics['byPriority'].items()}
+                familyMetrics['queueDepth'] = len(self.waiters[family])
+                familyMetrics['availableTokens'] = bucket.tokens
+                familyMetrics['requestsPerMinute'] = self.quotas[family]['requestsPerMinute']
+                if metrics['requests'] > 0:
+                    familyMetrics['meanWaitSeconds'] = metrics['totalWaitSeconds'] / metrics['requests']
+                else:
+                    familyMetrics['meanWaitSeconds'] = 0.0
+            result[family] = familyMetrics
+        return result
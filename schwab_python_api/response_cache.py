@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+def secondsUntilNextSession(now=None):
+    """
+    Seconds until the next 09:30 US/Eastern weekday session open. Exchange holidays are not taken into account.
+
+    Args:
+        now (datetime, optional): The current time. Defaults to now.
+
+    Returns:
+        float: Seconds until the next session opens.
+    """
+    eastern = ZoneInfo('US/Eastern')
+    now = datetime.now(eastern) if now is None else now.astimezone(eastern)
+    sessionOpen = now.replace(hour=9, minute=30, second=0, microsecond=0)
+    if sessionOpen <= now:
+        sessionOpen += timedelta(days=1)
+    while sessionOpen.weekday() >= 5:
+        sessionOpen += timedelta(days=1)
+    return (sessionOpen - now).total_seconds()
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    # Seconds a successful response stays fresh per endpoint, or a callable returning it.
+    # Endpoints not listed are never cached.
+    DEFAULT_TTLS = {
+        'quotes': 0.5,
+        'expirationchain': secondsUntilNextSession,
+        'instruments': 24 * 3600,
+    }
+
+    def __init__(self, ttls=None, maxBytes=64 * 1024 * 1024):
+        """
+        Initialize an LRU response cache with per-endpoint TTLs and single-flight request coalescing.
+
+        Concurrent requests for the same key while one is in flight wait for that request instead
+        of sending their own, whether or not the endpoint is cached.
+
+        Args:
+            ttls (dict, optional): Endpoint name to TTL in seconds or a callable returning it. Merged over DEFAULT_TTLS, None disables an endpoint.
+            maxBytes (int, optional): Maximum total size of the cached response bodies.
+        """
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.maxBytes = maxBytes
+
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.size = 0
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'uncacheable': 0}
+
+    def _ttl(self, endpoint):
+        ttl = self.ttls.get(endpoint)
+        if callable(ttl):
+            return ttl()
+        return ttl
+
+    def _store(self, key, response, ttl):
+        size = len(response.content)
+        if size > self.maxBytes:
+            return
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[2]
+        self.entries[key] = (time.monotonic() + ttl, response, size)
+        self.size += size
+        while self.size > self.maxBytes:
+            evictedKey, (expires, evicted, evictedSize) = self.entries.popitem(last=False)
+            self.size -= evictedSize
+            self.stats['evictions'] += 1
+
+    def get(self, endpoint, url, params, fetch):
+        """
+        Get a response from the cache, from an identical in-flight request, or by calling fetch.
+
+        Args:
+            endpoint (str): Endpoint name used to look up the TTL, e.g. 'quotes'.
+            url (str): The request URL.
+            params (dict): The query parameters.
+            fetch (callable): Sends the request and returns the requests.Response.
+
+        Returns:
+            requests.Response: The response. Only status 200 responses are cached.
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                self.size -= self.entries.pop(key)[2]
+
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self.inflight[key] = flight
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except BaseException as Error:
+            flight.error = Error
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+                if flight.error is None:
+                    ttl = self._ttl(endpoint)
+                    if ttl and flight.value.status_code == 200:
+                        self._store(key, flight.value, ttl)
+                    else:
+                        self.stats['uncacheable'] += 1
+            flight.event.set()
+        return flight.value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def getStats(self):
+        """
+        Get hit, miss, coalesce, eviction and size counters.
+
+        Returns:
+            dict: The counters plus the number of entries and cached bytes.
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.entries)
+            stats['bytes'] = self.size
+        return stats
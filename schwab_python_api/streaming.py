@@ -0,0 +1,337 @@
+import asyncio
+import itertools
+import json
+import numpy as np
+from schwab_python_api.user_preference import UserPreference
+
+# Numeric LEVELONE_EQUITIES fields tracked in the live quote table, keyed by streamer field number
+LEVELONE_EQUITY_FIELDS = {
+    1: 'bidPrice',
+    2: 'askPrice',
+    3: 'lastPrice',
+    4: 'bidSize',
+    5: 'askSize',
+    8: 'totalVolume',
+    9: 'lastSize',
+    10: 'highPrice',
+    11: 'lowPrice',
+    12: 'closePrice',
+    17: 'openPrice',
+    18: 'netChange',
+    33: 'mark',
+    34: 'quoteTime',
+    35: 'tradeTime',
+    42: 'netPercentChange',
+}
+
+# Numeric LEVELONE_OPTIONS fields tracked in the live quote table, keyed by streamer field number
+LEVELONE_OPTION_FIELDS = {
+    2: 'bidPrice',
+    3: 'askPrice',
+    4: 'lastPrice',
+    5: 'highPrice',
+    6: 'lowPrice',
+    7: 'closePrice',
+    8: 'totalVolume',
+    9: 'openInterest',
+    10: 'volatility',
+    16: 'bidSize',
+    17: 'askSize',
+    19: 'netChange',
+    20: 'strikePrice',
+    28: 'delta',
+    29: 'gamma',
+    30: 'theta',
+    31: 'vega',
+    32: 'rho',
+    35: 'underlyingPrice',
+    37: 'mark',
+    38: 'quoteTime',
+    39: 'tradeTime',
+}
+
+SERVICE_FIELDS = {
+    'LEVELONE_EQUITIES': LEVELONE_EQUITY_FIELDS,
+    'LEVELONE_OPTIONS': LEVELONE_OPTION_FIELDS,
+}
+
+class LiveQuoteTable:
+    def __init__(self, fields, initialCapacity=256):
+        """
+        Initialize an array-backed quote table with one row per symbol and one float64 column per field.
+
+        Args:
+            fields (dict): Streamer field number to field name.
+            initialCapacity (int, optional): Number of rows allocated up front. Capacity doubles when full.
+        """
+        self.fieldNumbers = list(fields.keys())
+        self.fieldNames = list(fields.values())
+        self.columnByNumber = {str(number): column for column, number in enumerate(self.fieldNumbers)}
+        self.columnByName = {name: column for column, name in enumerate(self.fieldNames)}
+
+        self.values = np.full((initialCapacity, len(self.fieldNames)), np.nan)
+        self.updatedAt = np.zeros(initialCapacity, dtype=np.int64)
+        self.rowBySymbol = {}
+        self.symbols = []
+
+    def _row(self, symbol):
+        row = self.rowBySymbol.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            if row == len(self.values):
+                self.values = np.vstack([self.values, np.full_like(self.values, np.nan)])
+                self.updatedAt = np.concatenate([self.updatedAt, np.zeros_like(self.updatedAt)])
+            self.rowBySymbol[symbol] = row
+            self.symbols.append(symbol)
+        return row
+
+    def apply(self, symbol, content, timestamp=None):
+        """
+        Apply an incremental streamer update. Fields missing from content keep their last value.
+
+        Args:
+            symbol (str): The symbol of the update.
+            content (dict): Streamer content keyed by field number strings.
+            timestamp (int, optional): Update time in epoch milliseconds.
+
+        Returns:
+            dict: The changed fields keyed by field name.
+        """
+        row = self._row(symbol)
+        changed = {}
+        for key, value in content.items():
+            column = self.columnByNumber.get(key)
+            if column is None or isinstance(value, str):
+                continue
+            self.values[row, column] = value
+            changed[self.fieldNames[column]] = value
+        if timestamp is not None:
+            self.updatedAt[row] = timestamp
+        return changed
+
+    def get(self, symbol):
+        """
+        Get the latest values of a symbol.
+
+        Returns:
+            dict: Field name to value, or None if the symbol has no updates yet.
+        """
+        row = self.rowBySymbol.get(symbol)
+        if row is None:
+            return None
+        return dict(zip(self.fieldNames, self.values[row].tolist()))
+
+    def getField(self, symbol, field):
+        """
+        Get the latest value of one field of a symbol.
+        """
+        row = self.rowBySymbol.get(symbol)
+        if row is None:
+            return None
+        return float(self.values[row, self.columnByName[field]])
+
+    def toArray(self):
+        """
+        Get the filled rows of the table.
+
+        Returns:
+            tuple: (symbols, values) where values is a view of shape (len(symbols), len(fieldNames)).
+        """
+        return list(self.symbols), self.values[:len(self.symbols)]
+
+    def toFrame(self):
+        """
+        Get a copy of the table as a DataFrame indexed by symbol.
+        """
+        import pandas as pd
+        symbols, values = self.toArray()
+        return pd.DataFrame(values.copy(), index=pd.Index(symbols, name='symbol'), columns=self.fieldNames)
+
+class StreamerClient:
+    def __init__(self, authInstance, streamerInfo=None, streamerUrl=None, queueSize=10000):
+        """
+        Initialize a client for the Schwab websocket streaming service.
+
+        Level one updates are applied to one LiveQuoteTable per service. Consumers either register
+        callbacks with addCallback or iterate over updates() from a coroutine.
+
+        Args:
+            authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            streamerInfo (dict, optional): Streamer connection information. Defaults to UserPreference.getStreamerInfo.
+            streamerUrl (str, optional): Overrides streamerSocketUrl, e.g. to connect to a local replay server.
+            queueSize (int, optional): Maximum number of updates buffered for updates() before the oldest are dropped.
+        """
+        self.authInstance = authInstance
+        self.streamerInfo = streamerInfo
+        self.streamerUrl = streamerUrl
+        self.queueSize = queueSize
+
+        self.tables = {service: LiveQuoteTable(fields) for service, fields in SERVICE_FIELDS.items()}
+        self.subscriptions = {service: set() for service in SERVICE_FIELDS}
+        self.callbacks = []
+        self.queues = []
+        self.requestIds = itertools.count()
+        self.websocket = None
+        self.droppedUpdates = 0
+
+    def addCallback(self, callback):
+        """
+        Register a callback called as callback(service, symbol, changedFields) for every update.
+
+        An exception raised by a callback is printed and the stream continues.
+        """
+        self.callbacks.append(callback)
+
+    def _request(self, service, command, parameters):
+        return {
+            'service': service,
+            'command': command,
+            'requestid': str(next(self.requestIds)),
+            'SchwabClientCustomerId': self.streamerInfo['schwabClientCustomerId'],
+            'SchwabClientCorrelId': self.streamerInfo['schwabClientCorrelId'],
+            'parameters': parameters,
+        }
+
+    async def _send(self, requests):
+        await self.websocket.send(json.dumps({'requests': requests}))
+
+    async def connect(self):
+        """
+        Open the websocket and log in with the current access token.
+        """
+        try:
+            import websockets
+        except ImportError:
+            raise ImportError("StreamerClient requires the websockets package: pip install websockets")
+
+        loop = asyncio.get_running_loop()
+        if self.streamerInfo is None:
+            self.streamerInfo = await loop.run_in_executor(None, UserPreference(self.authInstance).getStreamerInfo)
+            if self.streamerInfo is None:
+                raise Exception("Unable to obtain streamer info.")
+        accessToken = await loop.run_in_executor(None, self.authInstance.getAccessToken)
+
+        url = self.streamerUrl if self.streamerUrl is not None else self.streamerInfo['streamerSocketUrl']
+        self.websocket = await websockets.connect(url, max_size=None)
+
+        await self._send([self._request('ADMIN', 'LOGIN', {
+            'Authorization': accessToken,
+            'SchwabClientChannel': self.streamerInfo['schwabClientChannel'],
+            'SchwabClientFunctionId': self.streamerInfo['schwabClientFunctionId'],
+        })])
+        message = json.loads(await self.websocket.recv())
+        for response in message.get('response', []):
+            if response.get('command') == 'LOGIN' and response.get('content', {}).get('code') != 0:
+                raise Exception(f"Streamer login failed: {response.get('content')}")
+
+    async def subscribe(self, service, symbols, fields=None):
+        """
+        Subscribe to level one updates of a service, adding to any existing subscription.
+
+        Args:
+            service (str): LEVELONE_EQUITIES or LEVELONE_OPTIONS.
+            symbols (list): The symbols to subscribe to. Options use the OSI contract symbol.
+            fields (list, optional): Field numbers to request. Defaults to the fields tracked by the quote table.
+        """
+        if fields is None:
+            fields = [0] + list(SERVICE_FIELDS[service].keys())
+        command = 'ADD' if self.subscriptions[service] else 'SUBS'
+        self.subscriptions[service].update(symbols)
+        await self._send([self._request(service, command, {
+            'keys': ','.join(symbols),
+            'fields': ','.join(str(field) for field in fields),
+        })])
+
+    async def subscribeEquities(self, symbols, fields=None):
+        await self.subscribe('LEVELONE_EQUITIES', symbols, fields=fields)
+
+    async def subscribeOptions(self, symbols, fields=None):
+        await self.subscribe('LEVELONE_OPTIONS', symbols, fields=fields)
+
+    async def unsubscribe(self, service, symbols):
+        self.subscriptions[service].difference_update(symbols)
+        await self._send([self._request(service, 'UNSUBS', {'keys': ','.join(symbols)})])
+
+    def handleMessage(self, message):
+        """
+        Apply the data entries of one decoded streamer message to the quote tables and notify consumers.
+
+        Returns:
+            int: Number of symbol updates applied.
+        """
+        updates = 0
+        for data in message.get('data', []):
+            table = self.tables.get(data.get('service'))
+            if table is None:
+                continue
+            timestamp = data.get('timestamp')
+            for content in data.get('content', []):
+                symbol = content.get('key')
+                changed = table.apply(symbol, content, timestamp)
+                updates += 1
+                for callback in self.callbacks:
+                    # A failing callback must not stop the stream for the other consumers
+                    try:
+                        callback(data['service'], symbol, changed)
+                    except Exception as Error:
+                        print(f"Streamer callback {getattr(callback, '__name__', callback)} failed for {data['service']} {symbol}. Error: {Error}")
+                for queue in self.queues:
+                    self._enqueue(queue, (data['service'], symbol, changed))
+        return updates
+
+    def _enqueue(self, queue, item):
+        """
+        Put an item on a consumer queue, dropping the oldest update when the queue is full.
+        """
+        if queue.full():
+            queue.get_nowait()
+            self.droppedUpdates += 1
+        queue.put_nowait(item)
+
+    async def run(self):
+        """
+        Receive and apply messages until the connection closes.
+
+        The update iterators end when run returns, also when the connection closed with an error,
+        which is raised again afterwards.
+        """
+        try:
+            async for raw in self.websocket:
+                self.handleMessage(json.loads(raw))
+        finally:
+            for queue in list(self.queues):
+                self._enqueue(queue, None)
+
+    def updates(self):
+        """
+        Get an async iterator over (service, symbol, changedFields) updates while run() is active.
+
+        Updates are buffered from the moment this is called, not from the first iteration.
+        """
+        queue = asyncio.Queue(maxsize=self.queueSize)
+        self.queues.append(queue)
+
+        async def iterate():
+            try:
+                while True:
+                    update = await queue.get()
+                    if update is None:
+                        return
+                    yield update
+            finally:
+                self.queues.remove(queue)
+
+        return iterate()
+
+    async def close(self):
+        """
+        Log out and close the websocket.
+        """
+        if self.websocket is None:
+            return
+        try:
+            await self._send([self._request('ADMIN', 'LOGOUT', {})])
+        except Exception:
+            pass
+        await self.websocket.close()
+        self.websocket = None
@@ -0,0 +1,383 @@
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from schwab_python_api.decoding import decodeJson
+from schwab_python_api.rate_limiter import RequestScheduler
+from schwab_python_api.transport import callWithRetries, raiseForStatus
+from schwab_python_api.utilities import formatTransactionTime
+
+# Transaction types accepted by the types parameter of the transactions endpoint
+TRANSACTION_TYPES = [
+    'TRADE',
+    'RECEIVE_AND_DELIVER',
+    'DIVIDEND_OR_INTEREST',
+    'ACH_RECEIPT',
+    'ACH_DISBURSEMENT',
+    'CASH_RECEIPT',
+    'CASH_DISBURSEMENT',
+    'ELECTRONIC_FUND',
+    'WIRE_OUT',
+    'WIRE_IN',
+    'JOURNAL',
+    'MEMORANDUM',
+    'MARGIN_CALL',
+    'MONEY_MARKET',
+    'SMA_ADJUSTMENT',
+]
+
+# The endpoint accepts at most a one year range and returns at most this many transactions per request
+MAX_TRANSACTION_DAYS = 365
+MAX_TRANSACTIONS_PER_REQUEST = 3000
+
+def transactionTimeMs(value):
+    """
+    Convert a transaction time string, e.g. 2024-01-02T14:30:00+0000, to UTC epoch milliseconds. Returns None for a missing or unparseable time.
+    """
+    if not value:
+        return None
+    timeFormat = '%Y-%m-%dT%H:%M:%S.%f%z' if '.' in value else '%Y-%m-%dT%H:%M:%S%z'
+    try:
+        return int(datetime.strptime(value, timeFormat).timestamp() * 1000)
+    except ValueError:
+        return None
+
+def transactionSortKey(transaction):
+    """
+    Order transactions by their UTC time, with those missing a parseable time last.
+    """
+    timeMs = transactionTimeMs(transaction.get('time'))
+    return (timeMs is None, timeMs or 0)
+
+class Transactions:
+    def __init__(self, authInstance, transport=None):
+        """
+        Initialize the Transactions class with an authentication instance.
+
+        Args:
+            authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to authInstance.transport.
+        """
+        self.authInstance = authInstance
+        self.transport = transport if transport is not None else authInstance.transport
+        self.baseUrl = "https://api.schwabapi.com/trader/v1"
+
+    def getHeaders(self):
+        """
+        Get the authorization headers for API requests.
+
+        Returns:
+            dict: A dictionary containing the authorization header.
+        """
+        return {
+            'Authorization': f"Bearer {self.authInstance.getAccessToken()}"
+        }
+
+    def getAccountIDs(self):
+        """
+        Get the encrypted IDs of all linked accounts.
+
+        Returns:
+            list: The hashValue of every linked account.
+        """
+        url = f"{self.baseUrl}/accounts/accountNumbers"
+        with self.transport.call('accountNumbers') as call:
+            response = self.transport.get(url, headers=self.getHeaders())
+            raiseForStatus(response)
+            with call.phase('decode'):
+                return [account['hashValue'] for account in decodeJson(response.content)]
+
+    def getTransactions(self, accountID, startDate, endDate, types=None, symbol=None, priority=None):
+        """
+        Get the transactions of an account in one request.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            startDate (datetime): The start of the range.
+            endDate (datetime): The end of the range, at most MAX_TRANSACTION_DAYS after startDate.
+            types (list, optional): Transaction types to get. Defaults to all TRANSACTION_TYPES.
+            symbol (str, optional): Only transactions of this symbol.
+            priority (int, optional): RequestScheduler priority class of the request.
+
+        Returns:
+            list: The transaction JSON objects.
+        """
+        url = f"{self.baseUrl}/accounts/{accountID}/transactions"
+        params = {
+            'startDate': formatTransactionTime(startDate),
+            'endDate': formatTransactionTime(endDate),
+            'types': ','.join(types if types is not None else TRANSACTION_TYPES),
+        }
+        if symbol is not None:
+            params['symbol'] = symbol
+
+        with self.transport.call('transactions') as call:
+            response = self.transport.get(url, headers=self.getHeaders(), params=params, priority=priority)
+            raiseForStatus(response)
+            with call.phase('decode'):
+                return decodeJson(response.content)
+
+    def getTransaction(self, accountID, transactionId):
+        """
+        Get a single transaction by ID.
+
+        Args:
+            accountID (str): Encrypted ID of the account.
+            transactionId (int): The activityId of the transaction.
+
+        Returns:
+            dict: The JSON response containing the transaction, or None on failure.
+        """
+        url = f"{self.baseUrl}/accounts/{accountID}/transactions/{transactionId}"
+        with self.transport.call('transactions') as call:
+            response = self.transport.get(url, headers=self.getHeaders())
+            if response.status_code == 200:
+                with call.phase('decode'):
+                    return decodeJson(response.content)
+
+            else:
+                print(f"Schwab API getTransaction Failure: Transaction: {transactionId}: Response Status Code {response.status_code}: {response.reason}")
+                return None
+
+    def _fetchWindow(self, accountID, windowStart, windowEnd, types, symbol, retries):
+        """
+        Fetch the transactions of one window, retrying only this window on failure.
+
+        A window that hits MAX_TRANSACTIONS_PER_REQUEST may have been truncated, so it is split in
+        half and both halves are fetched instead.
+        """
+        transactions = callWithRetries(
+            lambda: self.getTransactions(accountID, windowStart, windowEnd, types=types, symbol=symbol, priority=RequestScheduler.PRIORITY_LOW),
+            retries,
+            f"Transactions window {formatTransactionTime(windowStart)} to {formatTransactionTime(windowEnd)}",
+        )
+
+        if len(transactions) >= MAX_TRANSACTIONS_PER_REQUEST and windowEnd - windowStart > timedelta(minutes=1):
+            middle = windowStart + (windowEnd - windowStart) / 2
+            return self._fetchWindow(accountID, windowStart, middle, types, symbol, retries) + self._fetchWindow(accountID, middle, windowEnd, types, symbol, retries)
+        return transactions
+
+    def getTransactionHistory(self, accountIDs, startDate, endDate=None, types=None, symbol=None, windowDays=30, maxWorkers=4, retries=2):
+        """
+        Get the transactions of several accounts over a long range by fetching date windows concurrently.
+
+        Args:
+            accountIDs (list): Encrypted IDs of the accounts.
+            startDate (datetime): The start of the range.
+            endDate (datetime, optional): The end of the range. Defaults to now.
+            types (list, optional): Transaction types to get. Defaults to all TRANSACTION_TYPES.
+            symbol (str, optional): Only transactions of this symbol.
+            windowDays (int, optional): Days per request, at most MAX_TRANSACTION_DAYS.
+            maxWorkers (int, optional): Number of windows fetched concurrently.
+            retries (int, optional): Number of retries per failed window.
+
+        Returns:
+            dict: Transaction lists keyed by account ID, deduplicated by activityId and ordered by time.
+        """
+        if endDate is None:
+            endDate = datetime.now(timezone.utc)
+        window = timedelta(days=min(windowDays, MAX_TRANSACTION_DAYS))
+
+        windows = []
+        for accountID in accountIDs:
+            windowStart = startDate
+            while windowStart < endDate:
+                windowEnd = min(windowStart + window, endDate)
+                windows.append((accountID, windowStart, windowEnd))
+                windowStart = windowEnd
+
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            futures = [executor.submit(self._fetchWindow, accountID, windowStart, windowEnd, types, symbol, retries) for accountID, windowStart, windowEnd in windows]
+            results = [future.result() for future in futures]
+
+        history = {accountID: {} for accountID in accountIDs}
+        for (accountID, windowStart, windowEnd), transactions in zip(windows, results):
+            for transaction in transactions:
+                # Windows share their boundary instant, keep one copy of a transaction on it.
+                # A transaction without an activityId is keyed by its content instead.
+                key = transaction.get('activityId')
+                if key is None:
+                    key = json.dumps(transaction, sort_keys=True)
+                history[accountID][key] = transaction
+
+        return {accountID: sorted(transactions.values(), key=transactionSortKey) for accountID, transactions in history.items()}
+
+    def sync(self, store, accountIDs=None, startDate=None, lookbackDays=3, types=None, windowDays=30, maxWorkers=4, retries=2):
+        """
+        Download only the activity since the last sync of each account into a TransactionStore.
+
+        Each account is fetched from lookbackDays before its last synced time, so transactions
+        that posted late or changed status are picked up again and updated in place.
+
+        Args:
+            store (TransactionStore): The local store.
+            accountIDs (list, optional): Encrypted IDs of the accounts. Defaults to all linked accounts.
+            startDate (datetime, optional): Start of the first sync of an account. Defaults to MAX_TRANSACTION_DAYS ago.
+            lookbackDays (int, optional): Days re-fetched before the last synced time.
+            types (list, optional): Transaction types to sync. Defaults to all TRANSACTION_TYPES.
+            windowDays (int, optional): Days per request.
+            maxWorkers (int, optional): Number of windows fetched concurrently.
+            retries (int, optional): Number of retries per failed window.
+
+        Returns:
+            dict: Number of transactions new to the store, keyed by account ID.
+        """
+        if accountIDs is None:
+            accountIDs = self.getAccountIDs()
+
+        endDate = datetime.now(timezone.utc)
+        if startDate is None:
+            startDate = endDate - timedelta(days=MAX_TRANSACTION_DAYS)
+
+        # Accounts synced up to the same time share one fetch
+        groups = {}
+        for accountID in accountIDs:
+            syncedThrough = store.getSyncedThrough(accountID)
+            accountStart = startDate if syncedThrough is None else max(startDate, syncedThrough - timedelta(days=lookbackDays))
+            groups.setdefault(accountStart, []).append(accountID)
+
+        added = {}
+        for accountStart, groupIDs in groups.items():
+            history = self.getTransactionHistory(groupIDs, accountStart, endDate=endDate, types=types, windowDays=windowDays, maxWorkers=maxWorkers, retries=retries)
+            for accountID, transactions in history.items():
+                added[accountID] = store.upsert(transactions)
+                store.setSyncedThrough(accountID, endDate)
+        return added
+
+    def formatTransactions(self, transactions, asFrame=True):
+        """
+        Flatten transactions into one row each, with the traded instrument and the fees pulled out of the transfer items.
+
+        Args:
+            transactions (list): Transaction JSON objects.
+            asFrame (boolean, optional): Return a DataFrame. If False, return the flattened records without importing pandas.
+
+        Returns:
+            DataFrame: One row per transaction, or a list of dicts if asFrame is False.
+        """
+        records = []
+        for transaction in transactions:
+            record = {key: transaction.get(key) for key in ['activityId', 'accountNumber', 'time', 'tradeDate', 'settlementDate', 'type', 'status', 'subAccount', 'description', 'orderId', 'positionId', 'netAmount']}
+            record.update({'symbol': None, 'assetType': None, 'amount': None, 'price': None, 'cost': None, 'positionEffect': None, 'fees': 0.0})
+            for item in transaction.get('transferItems', []):
+                instrument = item.get('instrument', {})
+                if 'feeType' in item:
+                    record['fees'] += item.get('cost', 0.0)
+                elif instrument.get('assetType') != 'CURRENCY' and record['symbol'] is None:
+                    record.update({
+                        'symbol': instrument.get('symbol'),
+                        'assetType': instrument.get('assetType'),
+                        'amount': item.get('amount'),
+                        'price': item.get('price'),
+                        'cost': item.get('cost'),
+                        'positionEffect': item.get('positionEffect'),
+                    })
+            records.append(record)
+
+        if not asFrame:
+            return records
+
+        import pandas as pd
+        df_transactions = pd.DataFrame(records)
+        if len(df_transactions.index) > 0:
+            df_transactions['time'] = pd.to_datetime(df_transactions['time'], utc=True)
+        return df_transactions
+
+class TransactionStore:
+    def __init__(self, path='schwab_transactions.db'):
+        """
+        Initialize a local SQLite store of transactions keyed by activityId.
+
+        Times are compared as UTC epoch milliseconds in the timeMs column. The time column keeps the
+        string Schwab sent, whose offset notation does not sort against other ISO-8601 forms.
+
+        Args:
+            path (str, optional): The database file.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    activityId INTEGER PRIMARY KEY,
+                    accountNumber TEXT,
+                    time TEXT,
+                    timeMs INTEGER,
+                    type TEXT,
+                    status TEXT,
+                    netAmount REAL,
+                    json TEXT NOT NULL
+                )
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_account_time ON transactions (accountNumber, timeMs)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS sync_state (accountID TEXT PRIMARY KEY, syncedThrough TEXT NOT NULL)")
+
+    def upsert(self, transactions):
+        """
+        Insert new transactions and replace stored ones with the same activityId.
+
+        Args:
+            transactions (list): Transaction JSON objects.
+
+        Returns:
+            int: The number of transactions that were not in the store yet.
+        """
+        rows = [
+            (transaction['activityId'], transaction.get('accountNumber'), transaction.get('time'), transactionTimeMs(transaction.get('time')), transaction.get('type'), transaction.get('status'), transaction.get('netAmount'), json.dumps(transaction))
+            for transaction in transactions if transaction.get('activityId') is not None
+        ]
+        with self.lock, self.connection:
+            before = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            self.connection.executemany("INSERT OR REPLACE INTO transactions (activityId, accountNumber, time, timeMs, type, status, netAmount, json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            after = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        return after - before
+
+    def getSyncedThrough(self, accountID):
+        with self.lock:
+            row = self.connection.execute("SELECT syncedThrough FROM sync_state WHERE accountID = ?", (accountID,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row is not None else None
+
+    def setSyncedThrough(self, accountID, syncedThrough):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO sync_state (accountID, syncedThrough) VALUES (?, ?)", (accountID, syncedThrough.astimezone(timezone.utc).isoformat()))
+
+    def read(self, accountNumber=None, startDate=None, endDate=None, types=None):
+        """
+        Read stored transactions.
+
+        Args:
+            accountNumber (str, optional): Only this account number.
+            startDate (datetime, optional): Only transactions at or after this time.
+            endDate (datetime, optional): Only transactions before this time.
+            types (list, optional): Only these transaction types.
+
+        Returns:
+            list: The transaction JSON objects ordered by time.
+        """
+        conditions = []
+        params = []
+        if accountNumber is not None:
+            conditions.append("accountNumber = ?")
+            params.append(accountNumber)
+        if startDate is not None:
+            conditions.append("timeMs >= ?")
+            params.append(int(startDate.timestamp() * 1000))
+        if endDate is not None:
+            conditions.append("timeMs < ?")
+            params.append(int(endDate.timestamp() * 1000))
+        if types is not None:
+            conditions.append(f"type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+
+        query = "SELECT json FROM transactions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timeMs, activityId"
+        with self.lock:
+            return [json.loads(row[0]) for row in self.connection.execute(query, params)]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
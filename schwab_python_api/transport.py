@@ -0,0 +1,230 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from schwab_python_api.rate_limiter import RequestScheduler
+from schwab_python_api.instrumentation import NULL_CALL, TIMED_POOL_CLASSES, endpointFromUrl, takeConnectTime
+
+class RequestError(RuntimeError):
+    def __init__(self, message, statusCode=None):
+        """
+        A request that failed with an HTTP error status, or before a response arrived if statusCode is None.
+
+        Args:
+            message (str): Description of the failure.
+            statusCode (int, optional): The HTTP status of the response.
+        """
+        super().__init__(message)
+        self.statusCode = statusCode
+
+    @property
+    def retryable(self):
+        """
+        Whether sending the request again may succeed: network errors, 429 and 5xx responses.
+        """
+        return self.statusCode is None or self.statusCode == 429 or self.statusCode >= 500
+
+def raiseForStatus(response):
+    """
+    Raise a RequestError for a non-2xx response.
+    """
+    if not 200 <= response.status_code < 300:
+        raise RequestError(f"Response Status Code {response.status_code}: {response.reason}", response.status_code)
+
+def callWithRetries(function, retries, description, backoffSeconds=0.5):
+    """
+    Call function until it returns, retrying with exponential backoff.
+
+    A RequestError that is not retryable, e.g. 400 or 404, is not retried.
+
+    Args:
+        function (callable): Sends the request and returns its result, raising on failure.
+        retries (int): Number of retries after the first attempt.
+        description (str): What is being fetched, used in the error message.
+        backoffSeconds (float, optional): Wait before the first retry, doubled for each further retry.
+
+    Returns:
+        The result of function.
+
+    Raises:
+        RequestError: With the statusCode of the last failure, once the retries are exhausted or the failure is not retryable.
+    """
+    error = None
+    attempts = 0
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(backoffSeconds * 2 ** (attempt - 1))
+        attempts += 1
+        try:
+            return function()
+        except RequestError as Error:
+            error = Error
+            if not Error.retryable:
+                break
+        except Exception as Error:
+            error = Error
+    raise RequestError(f"{description} failed after {attempts} attempts: {error}", getattr(error, 'statusCode', None)) from error
+
+class SchwabTransport:
+    def __init__(self, poolConnections=4, poolMaxSize=20, connectTimeout=5.0, readTimeout=30.0, maxRetries=0, gzip=True, scheduler=None, instrumentation=None):
+        """
+        Initialize a pooled, keep-alive HTTP transport shared by the API clients.
+
+        The clients default to the transport of their SchwabAuth instance, so the token refresh,
+        market data, account and order requests all reuse the same warm connections.
+
+        Args:
+            poolConnections (int, optional): Number of per-host connection pools to cache.
+            poolMaxSize (int, optional): Maximum number of keep-alive connections kept per host.
+            connectTimeout (float, optional): Seconds to wait for the TCP/TLS connection to be established.
+            readTimeout (float, optional): Seconds to wait for the server to send data.
+            maxRetries (int, optional): Number of connection-level retries performed by urllib3.
+            gzip (boolean, optional): Negotiate gzip/deflate compressed response bodies.
+            scheduler (RequestScheduler, optional): Rate limiter every API request waits on. Defaults to one with the Schwab quotas.
+            instrumentation (Instrumentation, optional): Records per-endpoint timings of every request. Defaults to none.
+        """
+        self.poolConnections = poolConnections
+        self.poolMaxSize = poolMaxSize
+        self.timeout = (connectTimeout, readTimeout)
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.instrumentation = instrumentation
+
+        self.adapter = HTTPAdapter(pool_connections=poolConnections, pool_maxsize=poolMaxSize, max_retries=maxRetries)
+        # Time the connect of new connections so instrumentation can split it from time to first byte
+        self.adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+        if gzip:
+            self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        else:
+            self.session.headers['Accept-Encoding'] = 'identity'
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None, priority=None, scheduled=True):
+        """
+        Send a request over the pooled session.
+
+        Args:
+            method (str): The HTTP method (GET, POST, PUT, DELETE).
+            url (str): The URL to request.
+            headers (dict, optional): Additional request headers.
+            params (dict, optional): Query string parameters.
+            data (dict, str or bytes, optional): Request body.
+            timeout (float or tuple, optional): Overrides the transport timeouts for this request.
+            priority (int, optional): RequestScheduler priority class. Defaults to the API family default.
+            scheduled (boolean, optional): Wait for a scheduler token. False sends the request without using the quota of its API family.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        if self.instrumentation is None or not self.instrumentation.enabled:
+            family = self.scheduler.getApiFamily(url) if scheduled else None
+            if family is not None:
+                self.scheduler.acquire(family, priority)
+            return self.session.request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+        with self.instrumentation.call(endpointFromUrl(url)) as call:
+            start = time.perf_counter()
+            family = self.scheduler.getApiFamily(url) if scheduled else None
+            if family is not None:
+                self.scheduler.acquire(family, priority)
+            sent = time.perf_counter()
+            call.addTiming('queue', sent - start)
+
+            takeConnectTime()
+            call.requests += 1
+            # Stream so the headers and the body are timed separately
+            response = self.session.request(method, url, headers=headers, params=params, data=data, timeout=timeout, stream=True)
+            headersReceived = time.perf_counter()
+            content = response.content
+            connectSeconds = takeConnectTime()
+            call.addTiming('connect', connectSeconds)
+            call.addTiming('ttfb', headersReceived - sent - connectSeconds)
+            call.addTiming('download', time.perf_counter() - headersReceived)
+
+            call.status = response.status_code
+            call.responseBytes += len(content)
+            call.wireBytes += response.raw.tell() if hasattr(response.raw, 'tell') else len(content)
+            return response
+
+    def call(self, endpoint):
+        """
+        Open an instrumented endpoint call that the requests made inside it are attributed to.
+
+        A call opened inside another call of the same endpoint joins it, so a method that wraps
+        its request, decode and frame steps in one call produces a single record with all of
+        their timings.
+
+        Args:
+            endpoint (str): The endpoint name, matching endpointFromUrl of its requests, e.g. chains.
+
+        Returns:
+            context manager: Yields a CallRecord, or a no-op stand-in when instrumentation is disabled.
+        """
+        if self.instrumentation is None:
+            return NULL_CALL
+        return self.instrumentation.call(endpoint)
+
+    def get(self, url, headers=None, params=None, timeout=None, priority=None, scheduled=True):
+        return self.request('GET', url, headers=headers, params=params, timeout=timeout, priority=priority, scheduled=scheduled)
+
+    def post(self, url, headers=None, params=None, data=None, timeout=None, priority=None):
+        return self.request('POST', url, headers=headers, params=params, data=data, timeout=timeout, priority=priority)
+
+    def put(self, url, headers=None, params=None, data=None, timeout=None, priority=None):
+        return self.request('PUT', url, headers=headers, params=params, data=data, timeout=timeout, priority=priority)
+
+    def delete(self, url, headers=None, params=None, timeout=None, priority=None):
+        return self.request('DELETE', url, headers=headers, params=params, timeout=timeout, priority=priority)
+
+    def getConnectionStats(self):
+        """
+        Get per-host connection reuse statistics from the underlying connection pools.
+
+        Returns:
+            dict: Keyed by host, with the number of requests sent, new connections opened and requests served over a reused connection.
+        """
+        stats = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            hostStats = stats.setdefault(host, {'requests': 0, 'connections': 0, 'reused': 0})
+            hostStats['requests'] += pool.num_requests
+            hostStats['connections'] += pool.num_connections
+
+        for hostStats in stats.values():
+            hostStats['reused'] = max(hostStats['requests'] - hostStats['connections'], 0)
+            if hostStats['requests'] > 0:
+                hostStats['reuseRatio'] = hostStats['reused'] / hostStats['requests']
+            else:
+                hostStats['reuseRatio'] = 0.0
+
+        return stats
+
+    def getHostStats(self, url):
+        """
+        Get connection reuse statistics for the host of a single URL.
+
+        Args:
+            url (str): Any URL on the host of interest.
+
+        Returns:
+            dict: The statistics for that host, or None if no connection has been made to it yet.
+        """
+        parsed = urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        return self.getConnectionStats().get(f"{parsed.scheme}://{parsed.hostname}:{port}")
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,56 @@
+class UserPreference:
+    def __init__(self, authInstance, transport=None):
+        """
+        Initialize the UserPreference class with an authentication instance.
+
+        Args:
+            authInstance (SchwabAuth): An instance of the SchwabAuth class.
+            transport (SchwabTransport, optional): HTTP transport to use. Defaults to the transport of authInstance so connections are shared.
+        """
+        self.authInstance = authInstance
+        self.transport = transport if transport is not None else authInstance.transport
+        self.baseUrl = "https://api.schwabapi.com/trader/v1"
+
+    def getHeaders(self):
+        """
+        Get the authorization headers for API requests.
+
+        Returns:
+            dict: A dictionary containing the authorization header.
+        """
+        return {
+            'Authorization': f"Bearer {self.authInstance.getAccessToken()}"
+        }
+
+    def getUserPreference(self):
+        """
+        Get the user preferences, including the accounts, streamer connection information and offers.
+
+        Returns:
+            dict: The JSON response containing the user preferences.
+        """
+        url = f"{self.baseUrl}/userPreference"
+        response = self.transport.get(url, headers=self.getHeaders())
+        if response.status_code == 200:
+            return response.json()
+
+        else:
+            print(f"Schwab API getUserPreference Failure: Response Status Code {response.status_code}: {response.reason}")
+            return None
+
+    def getStreamerInfo(self):
+        """
+        Get the connection information of the streaming service.
+
+        Returns:
+            dict: streamerSocketUrl, schwabClientCustomerId, schwabClientCorrelId, schwabClientChannel and schwabClientFunctionId, or None on failure.
+        """
+        preference = self.getUserPreference()
+        if preference is None or not preference.get('streamerInfo'):
+            return None
+
+        streamerInfo = preference['streamerInfo']
+        # Depending on the account the streamer info is a single object or a list of them
+        if isinstance(streamerInfo, list):
+            return streamerInfo[0]
+        return streamerInfo
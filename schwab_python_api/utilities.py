@@ -1,25 +1,151 @@
-import pandas as pd 
+import re
+from datetime import timezone
+from functools import lru_cache
+import numpy as np
+from schwab_python_api.decoding import recordSchema
 
-class Utilities:
-    def extractOptionsContractSpecifications(self, df, contractSpecificationColumn='symbol'):
-        # Regular expression to extract the relevant parts
-        regex = r'(\d{6})([CPS])(\d{8})'
+# Fixed-width record layout of a price history candle
+CANDLE_DTYPE = np.dtype([
+    ('datetime', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.int64),
+])
+
+# Decoding schema of a /pricehistory response
+PRICE_HISTORY_SCHEMA = recordSchema('PriceHistory', {
+    'symbol': 'str',
+    'empty': 'bool',
+    'previousClose': 'float',
+    'previousCloseDate': 'int',
+    'candles': list[recordSchema('Candle', {'datetime': 'int', 'open': 'float', 'high': 'float', 'low': 'float', 'close': 'float', 'volume': 'int'})],
+})
 
-        # Extracting using vectorized string operations
-        matches = df[contractSpecificationColumn].str.extract(regex)
+# Contract symbol: expiry yymmdd, C, P or S, strike times 1000 in 8 digits, after the root. OSI pads
+# the root to 6 characters; like the original extractOptionsContractSpecifications regex, the
+# pattern is searched anywhere in the symbol, so unpadded roots and other prefixes still parse.
+OSI_PATTERN = re.compile(r'(\d{2})(\d{2})(\d{2})([CPS])(\d{8})')
+
+@lru_cache(maxsize=65536)
+def parseOsiSymbol(symbol):
+    """
+    Parse one OSI contract symbol, memoized for repeated contracts.
+    
+    Args:
+        symbol (str): The contract symbol, e.g. 'AAPL  240621C00190000'.
+    
+    Returns:
+        tuple: (root, expiry as datetime64[D], 'C', 'P' or 'S', strike), or (None, NaT, None, nan) if the symbol is not a contract symbol.
+            root is the text before the expiry without padding, None if there is none.
+    """
+    match = OSI_PATTERN.search(symbol) if isinstance(symbol, str) else None
+    if match is None:
+        return None, np.datetime64('NaT', 'D'), None, np.nan
+    year, month, day, callPut, strike = match.groups()
+    root = symbol[:match.start()].strip() or None
+    return root, np.datetime64(f"20{year}-{month}-{day}", 'D'), callPut, int(strike) / 1000
 
-        # Converting and formatting the expiration date
-        df['expiry'] = pd.to_datetime(matches[0], format='%y%m%d').dt.strftime('%d-%b-%y')
+def nanEqual(before, after):
+    """
+    Compare two float arrays elementwise, treating NaN as equal to NaN.
+    
+    Args:
+        before (ndarray): The earlier values.
+        after (ndarray): The later values, of the same shape.
+    
+    Returns:
+        ndarray: True where the values are equal or both NaN.
+    """
+    return (before == after) | (np.isnan(before) & np.isnan(after))
 
-        # Formatting the strike price
-        df['strikePrice'] = matches[2].astype(float) / 1000
+def formatTransactionTime(value):
+    """
+    Format a datetime as the ISO-8601 UTC timestamp the transactions endpoint expects.
+    """
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
 
+class Utilities:
+    def extractOptionsContractSpecifications(self, df, contractSpecificationColumn='symbol'):
+        """
+        Add expiry and strikePrice columns parsed from the contract symbols of a column.
+        
+        Kept for existing callers: expiry is a '%d-%b-%y' string here, use parseOsiSymbols for typed columns.
+        
+        Args:
+            df (DataFrame): Rows with a contract symbol column.
+            contractSpecificationColumn (str, optional): The column holding the contract symbols.
+        
+        Returns:
+            DataFrame: df with the expiry and strikePrice columns added.
+        """
+        contracts = self.parseOsiSymbols(df[contractSpecificationColumn], fields=['expiry', 'strike'])
+        df['expiry'] = contracts['expiry'].dt.strftime('%d-%b-%y')
+        df['strikePrice'] = contracts['strike']
         return df
     
+    def parseOsiSymbols(self, symbols, fields=None):
+        """
+        Parse OSI contract symbols into typed columns.
+        
+        Each distinct symbol is parsed once through the memoized parseOsiSymbol and the results
+        are broadcast back to the rows. Symbols that are not contract symbols, e.g. equities, yield
+        empty values.
+        
+        Args:
+            symbols (Series or list): The contract symbols.
+            fields (list, optional): The columns to build, out of root, expiry, callPut and strike. Defaults to all.
+        
+        Returns:
+            DataFrame: root, expiry (datetime64), callPut ('C', 'P' or 'S') and strike columns, aligned with symbols.
+        """
+        import pandas as pd
+        if fields is None:
+            fields = ['root', 'expiry', 'callPut', 'strike']
+        codes, uniques = pd.factorize(pd.Series(symbols), use_na_sentinel=False)
+        parsed = [parseOsiSymbol(symbol) for symbol in uniques]
+
+        dtypes = {'root': object, 'expiry': 'datetime64[D]', 'callPut': object, 'strike': np.float64}
+        positions = {'root': 0, 'expiry': 1, 'callPut': 2, 'strike': 3}
+        columns = {}
+        for field in fields:
+            values = np.array([contract[positions[field]] for contract in parsed], dtype=dtypes[field])
+            columns[field] = values[codes]
+
+        index = symbols.index if isinstance(symbols, pd.Series) else None
+        return pd.DataFrame(columns, index=index)
+
     def convertDatetimeToUnixEpoch(self, date_datetime):
         
         unix_timestamp_milliseconds = int(date_datetime.timestamp() * 1000)
         
         return unix_timestamp_milliseconds
+
+    def candlesToArray(self, candles):
+        """
+        Convert price history candle dicts into a NumPy structured array of CANDLE_DTYPE.
+        
+        Args:
+            candles (list): The candles of a /pricehistory response.
+        
+        Returns:
+            ndarray: One CANDLE_DTYPE record per candle.
+        """
+        array = np.empty(len(candles), dtype=CANDLE_DTYPE)
+        for name in CANDLE_DTYPE.names:
+            array[name] = [candle[name] for candle in candles]
+        return array
+
+    def candleArrayToFrame(self, candles):
+        """
+        Convert CANDLE_DTYPE records into a DataFrame with the columns of a /pricehistory candle.
+        
+        Args:
+            candles (ndarray): CANDLE_DTYPE records.
         
-        
\ No newline at end of file
+        Returns:
+            DataFrame: open, high, low, close, volume and datetime in epoch milliseconds.
+        """
+        import pandas as pd
+        return pd.DataFrame({name: candles[name] for name in ['open', 'high', 'low', 'close', 'volume', 'datetime']})
@@ -0,0 +1,89 @@
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from benchmarks.mock_server import MockSchwabServer
+from benchmarks.run_benchmarks import makeClients
+from schwab_python_api.authentication import SchwabAuth
+
+class JsonServer:
+    """
+    Local keep-alive HTTP server answering every request with the JSON body set for its path.
+    A callable body is called with the parsed query parameters of the request.
+
+    Status codes queued in failures[path] are returned, one per request, before that body.
+    """
+    def __init__(self):
+        self.responses = {}
+        self.failures = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                path = self.path.split('?')[0]
+                length = int(self.headers.get('Content-Length') or 0)
+                server.requests.append((self.command, self.path, self.rfile.read(length)))
+                status, body = server.responses.get(path, (200, {}))
+                if server.failures.get(path):
+                    status, body = server.failures[path].pop(0), {}
+                elif callable(body):
+                    body = body({key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()})
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.baseUrl = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def jsonServer():
+    server = JsonServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def auth():
+    """
+    A SchwabAuth with a placeholder access token, for clients pointed at a local server.
+    """
+    auth = SchwabAuth('client', 'secret', 'https://127.0.0.1')
+    auth.accessToken = 'token'
+    yield auth
+    auth.transport.close()
+
+@pytest.fixture
+def mockServer():
+    server = MockSchwabServer(profile='small').start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def clients(mockServer):
+    """
+    (auth, marketData, accounts) pointed at the mock server, without client-side rate limits.
+    """
+    auth, marketData, accounts = makeClients(mockServer, 4)
+    yield auth, marketData, accounts
+    auth.transport.close()
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+
+class ReplayStreamerServer:
+    def __init__(self, frames, host='127.0.0.1', port=0, interval=0.0, abortCode=None):
+        """
+        Initialize a local stand-in for the streaming service that replays recorded frames.
+
+        The server acknowledges LOGIN and subscription requests like the real service and, after
+        the first subscription, sends every recorded frame in order, then closes the connection.
+
+        Args:
+            frames (list): Recorded streamer messages, as dicts or JSON strings.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on. 0 picks a free port.
+            interval (float, optional): Seconds between replayed frames.
+            abortCode (int, optional): Close code sent after the last frame, e.g. 1011 to simulate a server error. Defaults to a normal close.
+        """
+        self.abortCode = abortCode
+        self.frames = [frame if isinstance(frame, str) else json.dumps(frame) for frame in frames]
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.server = None
+        self.received = []
+
+    @classmethod
+    def fromFile(cls, filename, **kwargs):
+        """
+        Create a server replaying a file with one recorded streamer message per line.
+        """
+        with open(filename, 'r') as f:
+            frames = [line.strip() for line in f if line.strip()]
+        return cls(frames, **kwargs)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def _response(self, request, code=0):
+        return json.dumps({'response': [{
+            'service': request.get('service'),
+            'command': request.get('command'),
+            'requestid': request.get('requestid'),
+            'SchwabClientCorrelId': request.get('SchwabClientCorrelId'),
+            'timestamp': int(time.time() * 1000),
+            'content': {'code': code, 'msg': 'replay'},
+        }]})
+
+    async def _handler(self, websocket):
+        replaying = False
+        async for raw in websocket:
+            for request in json.loads(raw).get('requests', []):
+                self.received.append(request)
+                await websocket.send(self._response(request))
+                if request.get('command') == 'LOGOUT':
+                    await websocket.close()
+                    return
+                if request.get('command') in ('SUBS', 'ADD') and not replaying:
+                    replaying = True
+                    for frame in self.frames:
+                        await websocket.send(frame)
+                        await asyncio.sleep(self.interval)
+                    if self.abortCode is not None:
+                        await websocket.close(code=self.abortCode, reason='replay abort')
+                    else:
+                        await websocket.close()
+                    return
+
+    async def start(self):
+        """
+        Start listening. The chosen port is available as self.port afterwards.
+        """
+        import websockets
+        self.server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = list(self.server.sockets)[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
@@ -0,0 +1,43 @@
+import asyncio
+from schwab_python_api.async_market_data import AsyncMarketData
+from schwab_python_api.authentication import SchwabAuth
+
+def makeAsyncMarketData(server, maxConcurrency=4):
+    auth = SchwabAuth('client', 'secret', 'https://127.0.0.1')
+    auth.accessToken = 'token'
+    asyncMarketData = AsyncMarketData(auth, maxConcurrency=maxConcurrency)
+    asyncMarketData.marketData.baseUrl = server.baseUrl
+    return asyncMarketData
+
+def test_gather_maps_each_symbol_to_its_result(jsonServer):
+    jsonServer.responses['/AAPL/quotes'] = (200, {'AAPL': {'quote': {'lastPrice': 1.0}}})
+    jsonServer.responses['/MSFT/quotes'] = (200, {'MSFT': {'quote': {'lastPrice': 2.0}}})
+    jsonServer.responses['/BAD/quotes'] = (404, {})
+    asyncMarketData = makeAsyncMarketData(jsonServer)
+
+    quotes = asyncio.run(asyncMarketData.gatherQuote(['AAPL', 'BAD', 'MSFT']))
+    assert list(quotes) == ['AAPL', 'BAD', 'MSFT']
+    assert quotes['AAPL']['AAPL']['quote']['lastPrice'] == 1.0
+    assert quotes['MSFT']['MSFT']['quote']['lastPrice'] == 2.0
+    assert quotes['BAD'] is None
+    asyncMarketData.close()
+
+def test_a_raising_symbol_keeps_the_other_results(jsonServer):
+    asyncMarketData = makeAsyncMarketData(jsonServer)
+
+    def getQuote(symbol):
+        if symbol == 'BAD':
+            raise ValueError('bad symbol')
+        return {symbol: {}}
+
+    asyncMarketData.marketData.getQuote = getQuote
+    quotes = asyncio.run(asyncMarketData.gatherQuote(['AAPL', 'BAD']))
+    assert quotes == {'AAPL': {'AAPL': {}}, 'BAD': None}
+    asyncMarketData.close()
+
+def test_instance_is_reusable_across_event_loops(jsonServer):
+    asyncMarketData = makeAsyncMarketData(jsonServer, maxConcurrency=2)
+    for _ in range(2):
+        quotes = asyncio.run(asyncMarketData.gatherQuote(['AAPL', 'MSFT', 'SPY']))
+        assert len(quotes) == 3
+    asyncMarketData.close()
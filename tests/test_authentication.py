@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from schwab_python_api.authentication import SchwabAuth
+
+def makeAuth(tokenFilename):
+    auth = SchwabAuth('client', 'secret', 'https://127.0.0.1')
+    auth.tokenFilename = str(tokenFilename)
+    return auth
+
+def test_token_file_round_trip(tmp_path):
+    auth = makeAuth(tmp_path / 'token.json')
+    auth.refreshToken = 'refresh'
+    auth.accessToken = 'access'
+    auth.accessTokenExpiry = time.time() + 1800
+    auth.saveTokenFile()
+
+    loaded = makeAuth(tmp_path / 'token.json')
+    loaded.loadTokenFile()
+    assert loaded.refreshToken == 'refresh'
+    assert loaded.accessToken == 'access'
+    assert loaded.accessTokenExpiry == auth.accessTokenExpiry
+    assert loaded.isAccessTokenValid()
+    # The file is moved into place, no temporary file is left behind
+    assert os.listdir(tmp_path) == ['token.json']
+
+def test_expired_access_token_is_not_loaded(tmp_path):
+    auth = makeAuth(tmp_path / 'token.json')
+    auth.refreshToken = 'refresh'
+    auth.accessToken = 'access'
+    auth.accessTokenExpiry = time.time() - 1
+    auth.saveTokenFile()
+
+    loaded = makeAuth(tmp_path / 'token.json')
+    loaded.loadTokenFile()
+    assert loaded.refreshToken == 'refresh'
+    assert loaded.accessToken is None
+    assert not loaded.isAccessTokenValid()
+
+def test_legacy_token_file_is_loaded(tmp_path):
+    # Earlier versions stored a JSON encoded string holding only the refresh token
+    with open(tmp_path / 'token.json', 'w') as f:
+        json.dump(json.dumps({'refresh_token': 'refresh'}), f)
+
+    loaded = makeAuth(tmp_path / 'token.json')
+    loaded.loadTokenFile()
+    assert loaded.refreshToken == 'refresh'
+    assert loaded.accessToken is None
+
+def test_valid_access_token_is_reused_without_refresh(tmp_path):
+    auth = makeAuth(tmp_path / 'token.json')
+    auth.refreshToken = 'refresh'
+    auth.accessToken = 'access'
+    auth.accessTokenExpiry = time.time() + 1800
+    auth.saveTokenFile()
+
+    def refreshAccessToken():
+        raise AssertionError('the persisted access token should have been used')
+
+    other = makeAuth(tmp_path / 'token.json')
+    other.refreshAccessToken = refreshAccessToken
+    assert other.getAccessToken() == 'access'
+
+def test_concurrent_callers_share_one_refresh(tmp_path, jsonServer):
+    jsonServer.responses['/token'] = (200, {'access_token': 'refreshed', 'expires_in': 1800})
+    auth = makeAuth(tmp_path / 'token.json')
+    auth.tokenUrl = f"{jsonServer.baseUrl}/token"
+    auth.refreshToken = 'refresh'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tokens = list(executor.map(lambda _: auth.getAccessToken(), range(8)))
+
+    assert tokens == ['refreshed'] * 8
+    assert [request[0] for request in jsonServer.requests] == ['POST']
+    auth.transport.close()
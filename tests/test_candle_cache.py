@@ -0,0 +1,100 @@
+import threading
+from urllib.parse import parse_qsl, urlparse
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from schwab_python_api.candle_cache import CandleCache, CandleCacheError
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.utilities import Utilities
+
+START = datetime(2021, 1, 4, tzinfo=timezone.utc)
+MIDDLE = datetime(2021, 1, 16, tzinfo=timezone.utc)
+END = datetime(2021, 1, 30, tzinfo=timezone.utc)
+HOUR_MS = 3600 * 1000
+
+def epochMs(value):
+    return int(value.timestamp() * 1000)
+
+def hourlyCandles(startMs, endMs):
+    first = -(-startMs // HOUR_MS) * HOUR_MS
+    return [{'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 100, 'datetime': epochMs} for epochMs in range(first, endMs + 1, HOUR_MS)]
+
+def priceHistory(params):
+    # Like the real endpoint, daily candles need a periodType other than the default 'day'
+    if params.get('frequencyType', 'minute') != 'minute' and params.get('periodType', 'day') == 'day':
+        return {'errors': ['periodType day only supports minute candles']}
+    return {'symbol': params['symbol'], 'empty': False, 'candles': hourlyCandles(int(params['startDate']), int(params['endDate']))}
+
+def priceHistoryRequests(jsonServer):
+    return [dict(parse_qsl(urlparse(path).query)) for method, path, body in jsonServer.requests if path.startswith('/pricehistory')]
+
+@pytest.fixture
+def marketData(auth, jsonServer):
+    jsonServer.responses['/pricehistory'] = (200, priceHistory)
+    marketData = MarketData(auth)
+    marketData.baseUrl = jsonServer.baseUrl
+    return marketData
+
+def test_cache_fetches_range_once(marketData, jsonServer, tmp_path):
+    cache = CandleCache(marketData, cacheDir=str(tmp_path))
+    records = cache.getPriceHistory('SPY', START, MIDDLE, frequencyType='minute', asFrame=False)
+    np.testing.assert_array_equal(records['datetime'], [candle['datetime'] for candle in hourlyCandles(epochMs(START), epochMs(MIDDLE))])
+    fetched = len(priceHistoryRequests(jsonServer))
+    assert fetched > 0
+
+    again = cache.getPriceHistory('SPY', START, MIDDLE, frequencyType='minute', asFrame=False)
+    assert len(priceHistoryRequests(jsonServer)) == fetched
+    np.testing.assert_array_equal(again, records)
+
+def test_cache_refetches_only_the_missing_range(marketData, jsonServer, tmp_path):
+    cache = CandleCache(marketData, cacheDir=str(tmp_path))
+    cache.update('SPY', START, MIDDLE, frequencyType='minute')
+    fetched = len(priceHistoryRequests(jsonServer))
+
+    assert cache.update('SPY', START, END, frequencyType='minute') == 1
+    newRequests = priceHistoryRequests(jsonServer)[fetched:]
+    assert newRequests
+    assert all(int(params['startDate']) > epochMs(MIDDLE) for params in newRequests)
+
+    records = cache.read('SPY', START, END, frequencyType='minute')
+    assert len(records) == len(hourlyCandles(epochMs(START), epochMs(END)))
+    assert np.all(np.diff(records['datetime']) > 0)
+
+def test_cache_sends_a_period_type_the_endpoint_accepts(marketData, jsonServer, tmp_path):
+    cache = CandleCache(marketData, cacheDir=str(tmp_path))
+    cache.update('SPY', START, END, frequencyType='daily')
+    requests = priceHistoryRequests(jsonServer)
+    assert requests
+    assert all(params['periodType'] == 'year' and params['frequencyType'] == 'daily' for params in requests)
+    assert len(cache.read('SPY', START, END, frequencyType='daily')) > 0
+
+def test_cache_reports_failed_ranges_and_refetches_them(marketData, jsonServer, tmp_path):
+    cache = CandleCache(marketData, cacheDir=str(tmp_path))
+    jsonServer.failures['/pricehistory'] = [404]
+    with pytest.raises(CandleCacheError) as raised:
+        cache.update('SPY', START, MIDDLE, frequencyType='minute')
+    assert len(raised.value.failedRanges) == 1
+    assert raised.value.failedRanges[0][:2] == (epochMs(START), epochMs(MIDDLE))
+
+    # The failed range stays uncovered
+    assert cache.update('SPY', START, MIDDLE, frequencyType='minute') == 1
+    assert len(cache.read('SPY', START, MIDDLE, frequencyType='minute')) == len(hourlyCandles(epochMs(START), epochMs(MIDDLE)))
+
+def test_updates_of_different_symbols_do_not_wait_on_each_other(tmp_path):
+    otherDone = threading.Event()
+
+    class BlockingMarketData:
+        def iterPriceHistoryWindows(self, symbol, startDate, endDate=None, **kwargs):
+            # The first symbol is only answered once the second symbol's update has finished
+            if symbol == 'AAA' and not otherDone.wait(timeout=10):
+                raise TimeoutError('the other update did not finish')
+            yield Utilities().candlesToArray(hourlyCandles(epochMs(startDate), epochMs(endDate)))
+
+    cache = CandleCache(BlockingMarketData(), cacheDir=str(tmp_path))
+    thread = threading.Thread(target=cache.update, args=('AAA', START, MIDDLE), kwargs={'frequencyType': 'minute'})
+    thread.start()
+    cache.update('BBB', START, MIDDLE, frequencyType='minute')
+    otherDone.set()
+    thread.join(timeout=10)
+
+    assert len(cache.read('AAA', START, MIDDLE, frequencyType='minute')) == len(cache.read('BBB', START, MIDDLE, frequencyType='minute')) > 0
@@ -0,0 +1,93 @@
+import copy
+import numpy as np
+import pandas as pd
+from schwab_python_api.chain_recorder import OptionChainRecorder
+from schwab_python_api.option_chain import OptionChainParser
+from tests.test_option_chain import optionChain
+
+class StubMarketData:
+    """
+    Serves the option chain currently held in chain.
+    """
+    def __init__(self, chain):
+        self.chain = chain
+
+    def getOptionChains(self, symbol, fromDate=None, toDate=None, splitLegs=False):
+        return OptionChainParser().parseLegs(self.chain, timestamp=0)
+
+def expectedChain(chain):
+    df_calls, df_puts = OptionChainParser().parseLegs(chain, timestamp=0)
+    df_chain = pd.concat([df_calls, df_puts], ignore_index=True)
+    return df_chain.set_index(df_chain['symbol'].to_numpy())
+
+def assertSameChain(actual, expected):
+    actual = actual.sort_index()
+    expected = expected.sort_index()
+    assert actual.index.tolist() == expected.index.tolist()
+    for column in ['bid', 'ask', 'delta', 'iv', 'volume']:
+        np.testing.assert_array_equal(actual[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64), err_msg=column)
+    # Missing values come back as missing, not as the strings 'None' or 'nan'
+    assert actual['option_root'].isna().tolist() == expected['option_root'].isna().tolist()
+    assert actual['option_root'].dropna().tolist() == expected['option_root'].dropna().tolist()
+
+def firstContract(chain, mapName='callExpDateMap'):
+    expiry = next(iter(chain[mapName]))
+    strike = next(iter(chain[mapName][expiry]))
+    return expiry, strike
+
+def snapshots():
+    """
+    Three chains: the initial one, one with a changed bid and a missing delta and root, and one with a contract removed.
+    """
+    first = optionChain()
+    second = copy.deepcopy(first)
+    expiry, strike = firstContract(second)
+    second['callExpDateMap'][expiry][strike][0]['bid'] += 0.05
+    second['callExpDateMap'][expiry][strike][0]['delta'] = None
+    del second['callExpDateMap'][expiry][strike][0]['optionRoot']
+    third = copy.deepcopy(second)
+    expiry, strike = firstContract(third, 'putExpDateMap')
+    del third['putExpDateMap'][expiry][strike]
+    return [first, second, third]
+
+def record(tmp_path, chains, keyframeInterval=100):
+    marketData = StubMarketData(chains[0])
+    recorder = OptionChainRecorder(marketData, ['SPXW'], logDir=str(tmp_path), keyframeInterval=keyframeInterval)
+    written = []
+    for i, chain in enumerate(chains):
+        marketData.chain = chain
+        written.append(recorder.capture('SPXW', timestamp=1000 * (i + 1)))
+    return recorder, written
+
+def test_only_changed_contracts_are_written(tmp_path):
+    chains = snapshots()
+    recorder, written = record(tmp_path, chains)
+    assert written == [len(expectedChain(chains[0]).index), 1, 0]
+    assert recorder.readIndex('SPXW')['keyframe'].tolist() == [1, 0, 0]
+
+def test_replay_rebuilds_every_snapshot(tmp_path):
+    chains = snapshots()
+    recorder, written = record(tmp_path, chains)
+    replayed = list(recorder.replay('SPXW'))
+    assert [timestamp for timestamp, df_chain in replayed] == [1000, 2000, 3000]
+    for (timestamp, df_chain), chain in zip(replayed, chains):
+        assertSameChain(df_chain, expectedChain(chain))
+
+def test_as_of_starts_from_the_last_keyframe(tmp_path):
+    chains = snapshots()
+    recorder, written = record(tmp_path, chains, keyframeInterval=1)
+    assert recorder.readIndex('SPXW')['keyframe'].tolist() == [1, 0, 1]
+
+    assertSameChain(recorder.asOf('SPXW', 2500), expectedChain(chains[1]))
+    assertSameChain(recorder.asOf('SPXW', 3000), expectedChain(chains[2]))
+    assert recorder.asOf('SPXW', 999).empty
+
+def test_missing_values_replay_as_missing(tmp_path):
+    chains = snapshots()
+    recorder, written = record(tmp_path, chains)
+    df_chain = recorder.asOf('SPXW', 2000)
+    expiry, strike = firstContract(chains[1])
+    symbol = chains[1]['callExpDateMap'][expiry][strike][0]['symbol']
+    assert np.isnan(df_chain.loc[symbol, 'delta'])
+    assert pd.isna(df_chain.loc[symbol, 'option_root'])
+    assert df_chain['symbol'].map(type).eq(str).all()
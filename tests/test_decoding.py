@@ -0,0 +1,49 @@
+import json
+import pytest
+from benchmarks import payloads
+from schwab_python_api import decoding
+from schwab_python_api.decoding import decodeJson, recordSchema
+from schwab_python_api.option_chain import OPTION_CHAIN_SCHEMA, OptionChainParser
+
+CANDLE_SCHEMA = recordSchema('Candle', {'datetime': 'int', 'close': 'float'})
+
+@pytest.fixture(params=['msgspec', 'orjson', 'json'])
+def backend(request, monkeypatch):
+    """
+    Run a test with each decoder that is installed, disabling the ones tried before it.
+    """
+    if request.param != 'json':
+        pytest.importorskip(request.param)
+    order = ['msgspec', 'orjson']
+    for name in order[:order.index(request.param)] if request.param in order else order:
+        monkeypatch.setattr(decoding, name, None)
+    assert decoding.getBackend() == request.param
+    return request.param
+
+def test_decode_without_schema_matches_json(backend):
+    content = json.dumps(payloads.priceHistory('small')).encode()
+    assert decodeJson(content) == json.loads(content)
+
+def test_schema_decode_keeps_the_listed_fields(backend):
+    content = json.dumps({'datetime': 1, 'close': 2.5, 'extra': 'x'}).encode()
+    decoded = decodeJson(content, CANDLE_SCHEMA)
+    assert decoded['datetime'] == 1 and decoded['close'] == 2.5
+    if backend == 'msgspec':
+        assert 'extra' not in decoded
+
+def test_body_not_matching_the_schema_is_decoded_in_full(backend):
+    content = json.dumps({'datetime': 'not a number', 'close': None}).encode()
+    assert decodeJson(content, CANDLE_SCHEMA) == {'datetime': 'not a number', 'close': None}
+
+def test_schema_decoded_chain_parses_like_the_full_body(backend):
+    chainJson = payloads.optionChain('small')
+    content = json.dumps(chainJson).encode()
+    parser = OptionChainParser()
+    expected = parser.parse(chainJson, timestamp=0)
+    actual = parser.parse(decodeJson(content, OPTION_CHAIN_SCHEMA), timestamp=0)
+    assert actual.equals(expected)
+
+def test_decoded_positions_format_like_the_full_body(clients, mockServer):
+    auth, marketData, accounts = clients
+    expected = accounts.formatPositions(payloads.accountPositions('small'))
+    assert accounts.getFormattedPositions('HASH').equals(expected)
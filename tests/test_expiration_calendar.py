@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from benchmarks import payloads
+from schwab_python_api.expiration_calendar import ExpirationCalendar
+from schwab_python_api.market_data import BulkRequestError
+
+EXPIRATIONS = [expiration['expirationDate'] for expiration in payloads.expirationChain()['expirationList']]
+
+def test_bulk_expirations_raise_or_return_failed_symbols(clients, mockServer):
+    auth, marketData, accounts = clients
+    mockServer.failures['expirationchain'] = [500]
+    with pytest.raises(BulkRequestError) as raised:
+        marketData.getOptionExpirationsBulk(['SPX', 'QQQ'], maxWorkers=1, retries=0)
+    assert raised.value.failedSymbols == ['SPX']
+    assert raised.value.statusCode == 500
+
+    mockServer.failures['expirationchain'] = [500]
+    df, failedSymbols = marketData.getOptionExpirationsBulk(['SPX', 'QQQ'], maxWorkers=1, retries=0, returnFailed=True)
+    assert failedSymbols == ['SPX']
+    assert set(df.index.get_level_values('ticker')) == {'QQQ'}
+
+def test_next_expirations_and_chain_date_range(clients):
+    auth, marketData, accounts = clients
+    calendar = ExpirationCalendar(marketData)
+    assert calendar.refresh(['SPX', 'QQQ']) == ['SPX', 'QQQ']
+
+    asOf = date.fromisoformat(EXPIRATIONS[0])
+    assert list(calendar.nextExpirations('SPX', count=2, asOf=asOf)) == [np.datetime64(day) for day in EXPIRATIONS[:2]]
+    assert list(calendar.nextExpirations('SPX', asOf=asOf, minDte=1)) == [np.datetime64(EXPIRATIONS[1])]
+    assert calendar.getChainDateRange('QQQ', count=3, asOf=asOf) == (EXPIRATIONS[0], EXPIRATIONS[2])
+    assert calendar.getChainDateRange('IWM', asOf=asOf) is None
+    assert not calendar.isStale()
+
+def test_failed_symbols_keep_their_expirations_and_are_retried(clients, mockServer):
+    auth, marketData, accounts = clients
+    calendar = ExpirationCalendar(marketData, maxWorkers=1, retries=0)
+    calendar.refresh(['SPX', 'QQQ'])
+    refreshed = calendar.refreshedAt['SPX']
+
+    mockServer.failures['expirationchain'] = [500]
+    assert calendar.refresh(['SPX', 'QQQ']) == ['QQQ']
+    assert calendar.failedSymbols == ['SPX']
+    assert len(calendar.getExpirations('SPX')) == len(EXPIRATIONS)
+    assert calendar.refreshedAt['SPX'] == refreshed
+    assert calendar.isStale(maxAge=timedelta(0), symbols=['SPX'])
+
+    assert calendar.retryFailed() == ['SPX']
+    assert calendar.failedSymbols == []
+    assert calendar.refreshedAt['SPX'] > refreshed
+
+def test_never_refreshed_symbols_are_stale(clients, mockServer):
+    auth, marketData, accounts = clients
+    calendar = ExpirationCalendar(marketData, retries=0)
+    assert calendar.isStale()
+
+    mockServer.failures['expirationchain'] = [500]
+    assert calendar.refresh(['SPX']) == []
+    assert calendar.isStale()
+    assert calendar.getExpirations('SPX').size == 0
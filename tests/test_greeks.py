@@ -0,0 +1,70 @@
+import math
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from schwab_python_api.greeks import BlackScholesEngine, SECONDS_PER_YEAR, erfc, normCdf
+
+def test_erfc_matches_math_erfc():
+    x = np.concatenate([np.linspace(-6.0, 26.0, 20001), [0.46875, 4.0]])
+    expected = np.array([math.erfc(value) for value in x])
+    np.testing.assert_allclose(erfc(x), expected, rtol=2e-15, atol=0)
+
+def test_norm_cdf_edges():
+    np.testing.assert_array_equal(normCdf([0.0, np.inf, -np.inf]), [0.5, 1.0, 0.0])
+    assert np.isnan(normCdf(np.nan))
+    # The lower tail keeps its relative precision instead of cancelling to zero
+    np.testing.assert_allclose(normCdf(-30.0), 0.5 * math.erfc(30.0 / math.sqrt(2.0)), rtol=1e-14)
+
+def test_implied_volatility_round_trip():
+    engine = BlackScholesEngine(rate=0.05, dividendYield=0.01)
+    strike = np.array([90.0, 95.0, 100.0, 105.0, 120.0, 100.0])
+    timeToExpiry = np.array([0.1, 0.25, 0.5, 1.0, 2.0, 0.02])
+    volatility = np.array([0.15, 0.2, 0.3, 0.45, 0.6, 1.2])
+    isCall = np.array([True, False, True, False, True, False])
+    prices = engine.price(100.0, strike, timeToExpiry, volatility, isCall)
+    np.testing.assert_allclose(engine.impliedVolatility(prices, 100.0, strike, timeToExpiry, isCall), volatility, rtol=1e-5)
+
+def test_put_call_parity():
+    engine = BlackScholesEngine(rate=0.03)
+    strike = np.linspace(80.0, 120.0, 9)
+    call = engine.price(100.0, strike, 0.5, 0.25, True)
+    put = engine.price(100.0, strike, 0.5, 0.25, False)
+    np.testing.assert_allclose(call - put, 100.0 - strike * np.exp(-0.03 * 0.5), atol=1e-10)
+
+def test_prices_outside_bounds_have_no_volatility():
+    engine = BlackScholesEngine()
+    # Below intrinsic value, above the underlying price, and missing
+    optionPrice = np.array([5.0, 150.0, np.nan])
+    result = engine.impliedVolatility(optionPrice, 100.0, np.array([90.0, 90.0, 90.0]), 0.5, True)
+    assert np.isnan(result).all()
+
+def test_reprice_chain_recovers_volatilities():
+    engine = BlackScholesEngine(rate=0.05)
+    asOf = datetime(2024, 6, 14, 14, 0, tzinfo=timezone.utc)
+    expiry = pd.Timestamp('2024-06-21 16:00', tz='US/Eastern')
+    timeToExpiry = (expiry.timestamp() - asOf.timestamp()) / SECONDS_PER_YEAR
+    strike = np.array([4950.0, 5000.0, 5050.0])
+    volatility = np.array([0.18, 0.16, 0.15])
+
+    df_chain = pd.DataFrame({
+        'expiration_year': 2024,
+        'expiration_month': 6,
+        'expiration_day': 21,
+        'call_strike_price': strike,
+        'put_strike_price': strike,
+    })
+    for prefix, isCall in [('call_', True), ('put_', False)]:
+        theoretical = engine.price(5000.0, strike, timeToExpiry, volatility, isCall)
+        df_chain[f"{prefix}bid"] = theoretical - 0.05
+        df_chain[f"{prefix}ask"] = theoretical + 0.05
+        df_chain[f"{prefix}delta"] = -999.0
+
+    df_repriced = engine.repriceChain(df_chain, 5000.0, asOf=asOf)
+    np.testing.assert_allclose(df_repriced['call_iv'], volatility, rtol=1e-4)
+    np.testing.assert_allclose(df_repriced['put_iv'], volatility, rtol=1e-4)
+    assert (df_repriced['call_iv_bid'] < df_repriced['call_iv']).all()
+    assert (df_repriced['call_iv'] < df_repriced['call_iv_ask']).all()
+    # The sentinel greeks are replaced
+    assert df_repriced['call_delta'].between(0, 1).all()
+    assert df_repriced['put_delta'].between(-1, 0).all()
+    assert (df_chain['call_delta'] == -999.0).all()
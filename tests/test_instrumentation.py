@@ -0,0 +1,70 @@
+import pytest
+import requests
+from schwab_python_api.authentication import SchwabAuth
+from schwab_python_api.instrumentation import Histogram, HistogramRegistry, Instrumentation, PrometheusExporter, endpointFromUrl
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.transport import SchwabTransport
+
+@pytest.fixture
+def registry():
+    return HistogramRegistry()
+
+@pytest.fixture
+def marketData(mockServer, registry):
+    transport = SchwabTransport(instrumentation=Instrumentation(sinks=[registry]))
+    auth = SchwabAuth('client', 'secret', 'https://127.0.0.1', transport=transport)
+    auth.accessToken = 'token'
+    marketData = MarketData(auth)
+    marketData.baseUrl = f"{mockServer.baseUrl}/marketdata/v1"
+    yield marketData
+    transport.close()
+
+def test_endpoint_names():
+    assert endpointFromUrl('https://api.schwabapi.com/marketdata/v1/AAPL/quotes') == 'quotes'
+    assert endpointFromUrl('https://api.schwabapi.com/trader/v1/accounts/HASH/orders/123') == 'orders'
+    assert endpointFromUrl('https://api.schwabapi.com/') == 'unknown'
+
+def test_nested_calls_produce_one_record(marketData, registry):
+    marketData.getPriceHistory('SPY')
+    snapshot = registry.getSnapshot()
+    assert list(snapshot) == ['pricehistory']
+    record = snapshot['pricehistory']
+    assert record['calls'] == 1
+    assert record['statuses'] == {'200': 1}
+    assert {'queue', 'ttfb', 'download', 'decode', 'frame'} <= set(record['phases'])
+    assert record['responseBytes']['count'] == 1
+
+def test_failed_calls_are_counted(marketData, registry, mockServer):
+    mockServer.failures['pricehistory'] = [500]
+    assert marketData.getPriceHistory('SPY').empty
+    record = registry.getSnapshot()['pricehistory']
+    assert record['errors'] == 1
+    assert record['statuses'] == {'500': 1}
+
+def test_histogram_quantiles():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+    for value in [0.5, 1.5, 1.5, 3.0]:
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.summary()['mean'] == 1.625
+
+def test_prometheus_text_and_server(marketData, registry):
+    marketData.getPriceHistory('SPY')
+    exporter = PrometheusExporter(registry)
+    text = exporter.render()
+    assert 'schwab_api_call_seconds_count{endpoint="pricehistory"} 1' in text
+    assert 'schwab_api_calls_total{endpoint="pricehistory",status="200"} 1' in text
+
+    server = exporter.serve(port=0)
+    try:
+        response = requests.get(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+        assert response.text == exporter.render()
+    finally:
+        exporter.stop()
+
+def test_text_file_export(registry, tmp_path):
+    path = tmp_path / 'schwab.prom'
+    PrometheusExporter(registry).writeTextFile(str(path))
+    assert path.read_text().startswith('# HELP schwab_api_call_seconds')
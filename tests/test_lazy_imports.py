@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import pytest
+from benchmarks.import_time import IMPORT_BUDGETS_MS, measureImport
+
+WORKER = """
+import sys
+from schwab_python_api.authentication import SchwabAuth
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.accounts import Accounts
+
+auth = SchwabAuth('client', 'secret', 'https://127.0.0.1')
+auth.accessToken = 'token'
+marketData = MarketData(auth)
+marketData.baseUrl = sys.argv[1] + '/marketdata/v1'
+accounts = Accounts(auth)
+accounts.baseUrl = sys.argv[1] + '/trader/v1'
+
+quotes = marketData.getQuotesBulk(['SPY', 'QQQ'], asFrame=False)
+assert list(quotes['symbol']) == ['SPY', 'QQQ']
+chain = marketData.getOptionChains('SPXW', asFrame=False)
+assert len(chain['call']['symbol']) > 0
+positions = accounts.getFormattedPositions('HASH', asFrame=False)
+assert len(positions) > 0
+print('pandas' in sys.modules)
+"""
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS_MS))
+def test_core_modules_do_not_import_pandas(module):
+    assert measureImport(module)['heavyModules'] == []
+
+@pytest.mark.parametrize('module', ['schwab_python_api.portfolio', 'schwab_python_api.chain_recorder', 'schwab_python_api.instrumentation'])
+def test_pandas_modules_import_it_on_first_use(module):
+    assert measureImport(module)['heavyModules'] == []
+
+def test_array_results_without_pandas(mockServer):
+    result = subprocess.run([sys.executable, '-c', WORKER, mockServer.baseUrl], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False'
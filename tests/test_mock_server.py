@@ -0,0 +1,40 @@
+import requests
+from benchmarks import payloads
+from benchmarks.run_benchmarks import timeCalls
+
+def test_endpoints_serve_payloads(clients):
+    auth, marketData, accounts = clients
+    quotes = marketData.getQuotes(['SPY', 'QQQ'])
+    assert sorted(quotes) == ['QQQ', 'SPY']
+    chain = marketData.getOptionChains('SPXW')
+    assert len(chain.index) > 0
+    positions = accounts.getFormattedPositions('HASH')
+    assert len(positions.index) == len(payloads.accountPositions('small')['securitiesAccount']['positions'])
+
+def test_requests_are_logged(clients, mockServer):
+    auth, marketData, accounts = clients
+    marketData.getQuotes(['SPY'])
+    assert mockServer.requests == [('quotes', '/marketdata/v1/quotes', {'symbols': 'SPY'})]
+
+def test_queued_failures_are_returned_first(mockServer):
+    url = f"{mockServer.baseUrl}/marketdata/v1/chains"
+    mockServer.failures['chains'] = [429, 500]
+    assert [requests.get(url).status_code for _ in range(3)] == [429, 500, 200]
+
+def test_unknown_paths_are_not_found(mockServer):
+    assert requests.get(f"{mockServer.baseUrl}/marketdata/v1").status_code == 404
+
+def test_price_history_is_validated_and_filtered(mockServer):
+    url = f"{mockServer.baseUrl}/marketdata/v1/pricehistory"
+    assert requests.get(url, params={'periodType': 'day', 'frequencyType': 'daily'}).status_code == 400
+
+    candles = mockServer.priceHistory['candles']
+    startMs, endMs = candles[1]['datetime'], candles[3]['datetime']
+    response = requests.get(url, params={'symbol': 'SPY', 'startDate': startMs, 'endDate': endMs})
+    assert response.json()['candles'] == candles[1:4]
+
+def test_time_calls_summary():
+    calls = []
+    summary = timeCalls(lambda: calls.append(1), 3)
+    assert len(calls) == 5
+    assert summary['minSeconds'] <= summary['p50Seconds'] <= summary['p95Seconds']
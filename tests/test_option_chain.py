@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.option_chain import OptionChainParser
+
+TIMESTAMP = 1718900000
+
+def contract(putCall, expiry, strike, seed):
+    return {
+        'putCall': putCall,
+        'symbol': f"SPXW  {expiry:%y%m%d}{putCall[0]}{int(strike * 1000):08d}",
+        'optionRoot': 'SPXW',
+        'strikePrice': strike,
+        'quoteTimeInLong': 1718900000000 + seed,
+        'totalVolume': seed * 10,
+        'openInterest': seed * 100,
+        'last': 1.5 + seed,
+        'bid': 1.25 + seed,
+        'ask': 1.75 + seed,
+        'intrinsicValue': 5000.0 - strike if putCall == 'CALL' else strike - 5000.0,
+        'netChange': -0.5,
+        'delta': 0.5 if putCall == 'CALL' else -0.5,
+        'gamma': 0.01,
+        'theta': -1.0,
+        'vega': 2.0,
+        'rho': 0.1,
+        'volatility': 20.0 + seed,
+    }
+
+def optionChain(expirations=3, strikes=4):
+    """
+    A /chains response with a call and a put on every strike of every expiration.
+    """
+    callMap = {}
+    putMap = {}
+    for e in range(expirations):
+        expiry = datetime(2024, 6, 21) + timedelta(days=7 * e)
+        key = f"{expiry:%Y-%m-%d}:{1 + 7 * e}"
+        callMap[key] = {}
+        putMap[key] = {}
+        for s in range(strikes):
+            strike = 4990.0 + 5 * s
+            callMap[key][str(strike)] = [contract('CALL', expiry, strike, e * strikes + s)]
+            putMap[key][str(strike)] = [contract('PUT', expiry, strike, e * strikes + s)]
+    return {'symbol': 'SPXW', 'status': 'SUCCESS', 'callExpDateMap': callMap, 'putExpDateMap': putMap}
+
+def baselineOptionChain(option_data_raw, current_timestamp):
+    """
+    The row building of MarketData.getOptionChains before the columnar parser, kept as the reference output.
+    """
+    option_data = []
+    call_map = option_data_raw.get('callExpDateMap', {})
+    put_map = option_data_raw.get('putExpDateMap', {})
+    for expiry in call_map:
+        expiry_date_str, dte = expiry.split(':')
+        expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d')
+        call_strikes = set(call_map.get(expiry, {}).keys())
+        put_strikes = set(put_map.get(expiry, {}).keys())
+        common_strikes = sorted(call_strikes.intersection(put_strikes), key=float)
+        for strike_price in common_strikes:
+            row = {'timestamp': current_timestamp}
+            for prefix, option in [('call', call_map[expiry][strike_price][0]), ('put', put_map[expiry][strike_price][0])]:
+                row.update({
+                    f'{prefix}_timestamp': option.get('quoteTimeInLong'),
+                    f'{prefix}_symbol': option.get('symbol'),
+                    f'{prefix}_option_root': option.get('optionRoot'),
+                    f'{prefix}_option_type': option.get('putCall'),
+                    f'{prefix}_strike_price': option.get('strikePrice'),
+                    f'{prefix}_volume': option.get('totalVolume'),
+                    f'{prefix}_open_interest': option.get('openInterest'),
+                    f'{prefix}_last_price': option.get('last'),
+                    f'{prefix}_bid': option.get('bid'),
+                    f'{prefix}_ask': option.get('ask'),
+                    f'{prefix}_itm': max(option.get('intrinsicValue'), 0),
+                    f'{prefix}_net_change': option.get('netChange'),
+                    f'{prefix}_delta': option.get('delta'),
+                    f'{prefix}_gamma': option.get('gamma'),
+                    f'{prefix}_theta': option.get('theta'),
+                    f'{prefix}_vega': option.get('vega'),
+                    f'{prefix}_rho': option.get('rho'),
+                    f'{prefix}_iv': option.get('volatility') / 100,
+                    f'{prefix}_osi': option.get('symbol'),
+                })
+            row.update({
+                'expiration_year': expiry_date.year,
+                'expiration_month': expiry_date.month,
+                'expiration_day': expiry_date.day,
+                'expiration_date': expiry_date.strftime('%d-%b-%y'),
+            })
+            option_data.append(row)
+    return pd.DataFrame(option_data)
+
+def assertSameValues(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    assert len(actual.index) == len(expected.index)
+    for column in expected.columns:
+        if expected[column].dtype.kind in 'iuf':
+            np.testing.assert_array_equal(actual[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64), err_msg=column)
+        else:
+            assert actual[column].astype(object).tolist() == expected[column].astype(object).tolist(), column
+
+def test_option_chain_parse_matches_baseline():
+    chainJson = optionChain()
+    assertSameValues(OptionChainParser().parse(chainJson, timestamp=TIMESTAMP), baselineOptionChain(chainJson, TIMESTAMP))
+
+def test_option_chain_keeps_one_sided_strikes():
+    chainJson = optionChain()
+    expiry = next(iter(chainJson['callExpDateMap']))
+    strike = next(iter(chainJson['callExpDateMap'][expiry]))
+    del chainJson['putExpDateMap'][expiry][strike]
+
+    df_chain = OptionChainParser().parse(chainJson, timestamp=TIMESTAMP)
+    row = df_chain[df_chain['call_strike_price'] == float(strike)].iloc[0]
+    assert row['call_symbol'] is not None
+    assert pd.isna(row['put_symbol'])
+    assert len(df_chain.index) == len(baselineOptionChain(chainJson, TIMESTAMP).index) + 1
+
+def test_option_chain_legs_match_wide_frame():
+    chainJson = optionChain()
+    df_chain = OptionChainParser().parse(chainJson, timestamp=TIMESTAMP)
+    df_calls, df_puts = OptionChainParser().parseLegs(chainJson, timestamp=TIMESTAMP)
+    assert df_calls['symbol'].tolist() == df_chain['call_symbol'].tolist()
+    assert df_puts['symbol'].tolist() == df_chain['put_symbol'].tolist()
+    np.testing.assert_array_equal(df_puts['iv'].to_numpy(), df_chain['put_iv'].to_numpy())
+
+def test_get_option_chains_over_http_matches_baseline(auth, jsonServer):
+    jsonServer.responses['/chains'] = (200, optionChain())
+    marketData = MarketData(auth)
+    marketData.baseUrl = jsonServer.baseUrl
+    df_chain = marketData.getOptionChains('SPXW')
+    expected = baselineOptionChain(optionChain(), TIMESTAMP)
+    assertSameValues(df_chain.drop(columns=['timestamp']), expected.drop(columns=['timestamp']))
@@ -0,0 +1,64 @@
+import asyncio
+import numpy as np
+from schwab_python_api.async_market_data import AsyncMarketData
+from schwab_python_api.option_scanner import SCAN_COLUMNS, OptionScanner
+
+def chainRequests(mockServer):
+    return [params for endpoint, path, params in mockServer.requests if endpoint == 'chains']
+
+def test_filters_are_pushed_to_the_server(clients, mockServer):
+    auth, marketData, accounts = clients
+    OptionScanner(marketData).scanAll(['SPXW'], contractType='CALL', strikeCount=10, strikeRange='NTM', minDte=0, maxDte=30)
+    params = chainRequests(mockServer)[0]
+    assert params['symbol'] == 'SPXW'
+    assert params['contractType'] == 'CALL'
+    assert params['strikeCount'] == '10'
+    assert params['range'] == 'NTM'
+    assert 'fromDate' in params and 'toDate' in params
+
+def test_local_filters_and_ordering(clients):
+    auth, marketData, accounts = clients
+    df_matches = OptionScanner(marketData).scanAll(['SPXW'], contractType='PUT', minStrike=4950.0, maxStrike=4970.0, maxDte=10)
+    assert list(df_matches.columns) == SCAN_COLUMNS
+    assert len(df_matches.index) > 0
+    assert (df_matches['option_type'] == 'PUT').all()
+    assert df_matches['strike_price'].between(4950.0, 4970.0).all()
+    assert (df_matches['days_to_expiration'] <= 10).all()
+    assert df_matches[['expiration', 'strike_price']].apply(tuple, axis=1).is_monotonic_increasing
+
+def test_scan_yields_columns_per_underlying(clients):
+    auth, marketData, accounts = clients
+    results = list(OptionScanner(marketData).scan(['SPXW', 'SPY', 'SPXW'], minMoneyness=-0.001, maxMoneyness=0.001, asFrame=False))
+    assert sorted(columns['underlying'][0] for columns in results) == ['SPXW', 'SPY']
+    for columns in results:
+        assert set(columns) == set(SCAN_COLUMNS)
+        assert np.all(np.abs(columns['moneyness']) <= 0.001)
+
+def test_failed_underlyings_are_recorded(clients, mockServer):
+    auth, marketData, accounts = clients
+    mockServer.failures['chains'] = [500]
+    scanner = OptionScanner(marketData, maxWorkers=1)
+    df_matches, failedSymbols = scanner.scanAll(['QQQ', 'SPY'], maxDte=10, returnFailed=True)
+    assert failedSymbols == ['QQQ']
+    assert set(df_matches['underlying']) == {'SPY'}
+
+    # Each scan starts over
+    scanner.scanAll(['QQQ'], maxDte=10)
+    assert scanner.failed == []
+
+def test_async_chain_filters(clients, mockServer):
+    auth, marketData, accounts = clients
+    asyncMarketData = AsyncMarketData(auth, maxConcurrency=2)
+    asyncMarketData.marketData.baseUrl = marketData.baseUrl
+
+    async def fetch():
+        chainJson = await asyncMarketData.getOptionChainJson('SPXW', contractType='PUT')
+        df_chain = await asyncMarketData.getOptionChains('SPXW', strikeCount=5)
+        return chainJson, df_chain
+
+    chainJson, df_chain = asyncio.run(fetch())
+    asyncMarketData.close()
+    assert chainJson['symbol'] == 'SPXW'
+    assert len(df_chain.index) > 0
+    assert [params.get('contractType') for params in chainRequests(mockServer)] == ['PUT', None]
+    assert chainRequests(mockServer)[1]['strikeCount'] == '5'
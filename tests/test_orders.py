@@ -0,0 +1,87 @@
+import json
+import pytest
+from schwab_python_api.orders import OrderError, OrderParameter, OrderTemplate, Orders
+
+@pytest.fixture
+def orders(clients, mockServer):
+    auth, marketData, accounts = clients
+    orders = Orders(auth)
+    orders.baseUrl = f"{mockServer.baseUrl}/trader/v1"
+    return orders
+
+def test_template_renders_parameters():
+    template = OrderTemplate(OrderTemplate.equityOrder('SPY', 'BUY', OrderParameter('quantity'), price=OrderParameter('price')))
+    assert template.parameters == ['quantity', 'price']
+
+    order = json.loads(template.render(quantity=5, price=501.25))
+    assert order['price'] == 501.25
+    assert order['orderLegCollection'][0]['quantity'] == 5
+    assert json.loads(template.render(quantity=1, price=1.5))['price'] == 1.5
+
+def test_template_rejects_missing_and_unexpected_values():
+    template = OrderTemplate(OrderTemplate.equityOrder('SPY', 'BUY', 10, price=OrderParameter('price')))
+    with pytest.raises(ValueError, match='Missing'):
+        template.render()
+    with pytest.raises(ValueError, match='Unexpected'):
+        template.render(price=1.0, quantity=2)
+
+    fixed = OrderTemplate(OrderTemplate.equityOrder('SPY', 'BUY', 10, price=500.0))
+    assert json.loads(fixed.render())['price'] == 500.0
+    with pytest.raises(ValueError, match='Unexpected'):
+        fixed.render(price=1.0)
+
+def test_template_validates_the_order():
+    with pytest.raises(ValueError, match='needs a price'):
+        OrderTemplate(OrderTemplate.equityOrder('SPY', 'BUY', 10))
+    with pytest.raises(ValueError, match='Invalid order instruction'):
+        OrderTemplate(OrderTemplate.optionOrder('SPY   240621C00500000', 'HOLD', 1, price=2.0))
+
+def test_place_replace_and_cancel(orders, mockServer):
+    template = OrderTemplate(OrderTemplate.equityOrder('SPY', 'BUY', 10, price=OrderParameter('price')))
+
+    placed = orders.placeOrder('HASH', template, price=500.0)
+    assert placed['ok'] and placed['statusCode'] == 201
+    replaced = orders.replaceOrder('HASH', placed['orderId'], template, price=499.5)
+    assert replaced['orderId'] != placed['orderId']
+    cancelled = orders.cancelOrder('HASH', replaced['orderId'])
+    assert cancelled['ok'] and cancelled['statusCode'] == 200
+
+    assert [(method, path) for method, path, order in mockServer.orders] == [
+        ('POST', '/trader/v1/accounts/HASH/orders'),
+        ('PUT', f"/trader/v1/accounts/HASH/orders/{placed['orderId']}"),
+        ('DELETE', f"/trader/v1/accounts/HASH/orders/{replaced['orderId']}"),
+    ]
+    assert mockServer.orders[1][2]['price'] == 499.5
+    stats = orders.getLatencyStats()
+    assert {operation: stats[operation]['count'] for operation in stats} == {'place': 1, 'replace': 1, 'cancel': 1}
+    assert all(record['queueSeconds'] is not None for record in orders.latencies)
+
+def test_rejected_order_raises_with_its_record(orders, mockServer):
+    mockServer.failures['orders'] = [400]
+    with pytest.raises(OrderError) as raised:
+        orders.placeOrder('HASH', OrderTemplate.equityOrder('SPY', 'BUY', 10, price=500.0))
+    assert raised.value.statusCode == 400
+    record, = raised.value.records
+    assert not record['ok'] and record['statusCode'] == 400 and record['error']
+    assert list(orders.latencies) == [record]
+
+    mockServer.failures['orders'] = [400]
+    record = orders.cancelOrder('HASH', 1, raiseOnError=False)
+    assert not record['ok']
+
+def test_bulk_cancel_sends_every_order_and_reports_failures(orders, mockServer):
+    mockServer.failures['orders'] = [500]
+    with pytest.raises(OrderError) as raised:
+        orders.cancelOrders('HASH', [1, 2, 3], maxWorkers=1)
+    assert [record['ok'] for record in raised.value.records] == [False, True, True]
+    assert len(mockServer.orders) == 2
+
+def test_unreadable_location_leaves_the_order_id_unset(orders, monkeypatch):
+    class Response:
+        status_code = 201
+        reason = 'Created'
+        headers = {'Location': 'https://api.schwabapi.com/trader/v1/accounts/HASH/orders/pending'}
+
+    monkeypatch.setattr(orders.transport, 'request', lambda *args, **kwargs: Response())
+    record = orders.placeOrder('HASH', OrderTemplate.equityOrder('SPY', 'BUY', 10, price=500.0))
+    assert record['ok'] and record['orderId'] is None
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+from schwab_python_api.accounts import Accounts, SnapshotError
+from schwab_python_api.portfolio import PortfolioTracker
+from schwab_python_api.transport import RequestError
+
+def snapshot(rows):
+    """
+    Build a snapshot from (accountNumber, contractSpec, longQuantity, shortQuantity, averagePrice) rows.
+    """
+    df = pd.DataFrame(rows, columns=['accountNumber', 'contractSpec', 'longQuantity', 'shortQuantity', 'averagePrice'])
+    return df.set_index(['accountNumber', 'contractSpec']).sort_index()
+
+def account(accountNumber, positions):
+    """
+    An account response with fields='positions' holding (symbol, longQuantity) positions.
+    """
+    return {'securitiesAccount': {'accountNumber': accountNumber, 'positions': [
+        {'instrument': {'symbol': symbol, 'assetType': 'EQUITY'}, 'longQuantity': longQuantity, 'shortQuantity': 0, 'averagePrice': 10.0}
+        for symbol, longQuantity in positions
+    ]}}
+
+class StubAccounts:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def getPortfolioSnapshot(self, accountIDs=None, returnFailed=False):
+        return self.results.pop(0)
+
+@pytest.fixture
+def accounts(auth, jsonServer):
+    accounts = Accounts(auth)
+    accounts.baseUrl = jsonServer.baseUrl
+    jsonServer.responses['/accounts/HASH1'] = (200, account('1', [('AAPL', 10)]))
+    jsonServer.responses['/accounts/HASH2'] = (200, account('2', [('QQQ', 3)]))
+    return accounts
+
+def test_diff_reports_added_removed_and_changed():
+    previous = snapshot([
+        ('1', 'AAPL', 10.0, 0.0, 150.0),
+        ('1', 'MSFT', 5.0, 0.0, 300.0),
+        ('1', 'SPY', 1.0, 0.0, np.nan),
+        ('2', 'QQQ', 0.0, 3.0, 400.0),
+    ])
+    current = snapshot([
+        ('1', 'AAPL', 12.0, 0.0, 150.0),
+        ('1', 'SPY', 1.0, 0.0, np.nan),
+        ('2', 'QQQ', 0.0, 3.0, 400.0),
+        ('2', 'TSLA', 1.0, 0.0, 200.0),
+    ])
+
+    df_diff = PortfolioTracker(accounts=None).diff(previous, current)
+    assert df_diff['change'].to_dict() == {
+        ('1', 'AAPL'): 'changed',
+        ('1', 'MSFT'): 'removed',
+        ('2', 'TSLA'): 'added',
+    }
+    # Removed rows carry the previous values
+    assert df_diff.loc[('1', 'MSFT'), 'longQuantity'] == 5.0
+
+def test_diff_of_identical_snapshots_is_empty():
+    current = snapshot([('1', 'AAPL', 10.0, 0.0, np.nan)])
+    assert len(PortfolioTracker(accounts=None).diff(current, current.copy()).index) == 0
+
+def test_refresh_only_removes_positions_of_fetched_accounts():
+    first = snapshot([('1', 'AAPL', 10.0, 0.0, 150.0), ('2', 'QQQ', 0.0, 3.0, 400.0)])
+    partial = snapshot([('1', 'AAPL', 12.0, 0.0, 150.0)])
+    tracker = PortfolioTracker(StubAccounts([
+        (first, ['1', '2'], []),
+        (partial, ['1'], ['HASH2']),
+        (partial, ['1', '2'], []),
+    ]))
+
+    snapshotOne, df_diff = tracker.refresh()
+    assert (df_diff['change'] == 'added').sum() == 2
+
+    # Account 2 failed: its position is not reported as removed and carried over, account 1 is refreshed
+    snapshotTwo, df_diff = tracker.refresh()
+    assert df_diff['change'].to_dict() == {('1', 'AAPL'): 'changed'}
+    assert snapshotTwo['longQuantity'].to_dict() == {('1', 'AAPL'): 12.0, ('2', 'QQQ'): 0.0}
+
+    # Account 2 fetched without the position: now it is removed, account 1 is unchanged
+    snapshotThree, df_diff = tracker.refresh()
+    assert df_diff['change'].to_dict() == {('2', 'QQQ'): 'removed'}
+    assert tracker.snapshot is snapshotThree
+
+def test_consecutive_refreshes_with_a_failed_account(accounts, jsonServer):
+    tracker = PortfolioTracker(accounts, accountIDs=['HASH1', 'HASH2'])
+    first, df_diff = tracker.refresh()
+    assert df_diff['change'].to_dict() == {('1', 'AAPL'): 'added', ('2', 'QQQ'): 'added'}
+
+    # Account 2 fails while account 1 changes: the change is reported once, on the refresh that saw it
+    jsonServer.failures['/accounts/HASH2'] = [500]
+    jsonServer.responses['/accounts/HASH1'] = (200, account('1', [('AAPL', 12)]))
+    current, df_diff = tracker.refresh()
+    assert df_diff['change'].to_dict() == {('1', 'AAPL'): 'changed'}
+    assert current.index.tolist() == [('1', 'AAPL'), ('2', 'QQQ')]
+
+    jsonServer.failures['/accounts/HASH2'] = [500]
+    current, df_diff = tracker.refresh()
+    assert len(df_diff.index) == 0
+    assert current['longQuantity'].to_dict() == {('1', 'AAPL'): 12, ('2', 'QQQ'): 3}
+
+    # Account 2 is back without its position
+    jsonServer.responses['/accounts/HASH2'] = (200, account('2', []))
+    current, df_diff = tracker.refresh()
+    assert df_diff['change'].to_dict() == {('2', 'QQQ'): 'removed'}
+    assert current.index.tolist() == [('1', 'AAPL')]
+
+def test_failed_position_requests_raise(accounts, jsonServer):
+    jsonServer.failures['/accounts/HASH1'] = [401, 401]
+    with pytest.raises(RequestError) as raised:
+        accounts.getFormattedPositions('HASH1')
+    assert raised.value.statusCode == 401
+
+    with pytest.raises(SnapshotError) as raised:
+        accounts.getPortfolioSnapshot(accountIDs=['HASH1', 'HASH2'])
+    assert raised.value.failedAccountIDs == ['HASH1']
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import pytest
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.transport import RequestError
+
+START = datetime(2021, 1, 4, tzinfo=timezone.utc)
+END = datetime(2021, 2, 3, tzinfo=timezone.utc)
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+def epochMs(value):
+    return int(value.timestamp() * 1000)
+
+def hourlyCandles(startMs, endMs):
+    first = -(-startMs // HOUR_MS) * HOUR_MS
+    return [{'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 100, 'datetime': epochMs} for epochMs in range(first, endMs + 1, HOUR_MS)]
+
+def overlappingPriceHistory(params):
+    # Every response also repeats the last day of the previous window
+    return {'symbol': params['symbol'], 'candles': hourlyCandles(int(params['startDate']) - DAY_MS, int(params['endDate']))}
+
+@pytest.fixture
+def marketData(auth, jsonServer):
+    jsonServer.responses['/pricehistory'] = (200, overlappingPriceHistory)
+    marketData = MarketData(auth)
+    marketData.baseUrl = jsonServer.baseUrl
+    return marketData
+
+def test_backfill_drops_candles_repeated_across_windows(marketData, jsonServer):
+    df_history = marketData.getPriceHistoryBackfill('SPY', START, END, windowDays=5, maxWorkers=3)
+    assert len(jsonServer.requests) == 7
+    expected = [candle['datetime'] for candle in hourlyCandles(epochMs(START) - DAY_MS, epochMs(END))]
+    np.testing.assert_array_equal(df_history['datetime'].to_numpy(), expected)
+
+def test_backfill_windows_are_yielded_in_order(marketData):
+    windows = list(marketData.iterPriceHistoryWindows('SPY', START, END, windowDays=5, maxWorkers=3, asFrame=False))
+    assert len(windows) == 7
+    for before, after in zip(windows, windows[1:]):
+        assert before['datetime'][-1] < after['datetime'][0]
+
+def test_backfill_sends_a_period_type_for_daily_candles(marketData, jsonServer):
+    marketData.getPriceHistoryBackfill('SPY', START, END, frequencyType='daily')
+    assert 'periodType=year' in jsonServer.requests[0][1]
+
+def test_failed_window_is_not_retried_on_client_errors(marketData, jsonServer):
+    jsonServer.failures['/pricehistory'] = [400]
+    with pytest.raises(RequestError) as raised:
+        marketData.getPriceHistoryBackfill('SPY', START, END, windowDays=50, retries=2)
+    assert raised.value.statusCode == 400
+    assert len(jsonServer.requests) == 1
+
+def test_failed_window_is_retried_on_server_errors(marketData, jsonServer):
+    jsonServer.failures['/pricehistory'] = [503]
+    df_history = marketData.getPriceHistoryBackfill('SPY', START, END, windowDays=50, retries=1)
+    assert len(jsonServer.requests) == 2
+    assert len(df_history.index) > 0
+
+def baselinePriceHistory(price_history_json):
+    """
+    The frame building of MarketData.getPriceHistory before the typed output modes, kept as the reference output.
+    """
+    df_price_history = pd.DataFrame(price_history_json['candles'])
+    df_price_history['datetime_utc'] = pd.to_datetime(df_price_history['datetime'], unit='ms', utc=True)
+    df_price_history['datetime_eastern'] = df_price_history['datetime_utc'].dt.tz_convert('US/Eastern')
+    df_price_history['date'] = df_price_history['datetime_eastern'].dt.strftime('%Y-%m-%d')
+    df_price_history['time'] = df_price_history['datetime_eastern'].dt.strftime('%H:%M:%S %Z%z')
+    df_price_history.drop(columns=['datetime_utc', 'datetime_eastern'], inplace=True)
+    return df_price_history
+
+@pytest.fixture
+def priceHistory(jsonServer):
+    # Spans the March daylight saving change, so both EST and EDT candles are formatted
+    priceHistory = {'symbol': 'SPY', 'candles': hourlyCandles(epochMs(datetime(2021, 3, 12, tzinfo=timezone.utc)), epochMs(datetime(2021, 3, 16, tzinfo=timezone.utc)))}
+    jsonServer.responses['/pricehistory'] = (200, priceHistory)
+    return priceHistory
+
+def test_string_output_matches_baseline(marketData, priceHistory):
+    pd.testing.assert_frame_equal(marketData.getPriceHistory('SPY'), baselinePriceHistory(priceHistory))
+
+def test_typed_outputs_match_the_candles(marketData, priceHistory):
+    candles = priceHistory['candles']
+    datetimes = [candle['datetime'] for candle in candles]
+    expected = baselinePriceHistory(priceHistory)
+
+    records = marketData.getPriceHistory('SPY', outputFormat='numpy')
+    np.testing.assert_array_equal(records['datetime'], datetimes)
+    np.testing.assert_array_equal(records['close'], [candle['close'] for candle in candles])
+
+    df_epoch = marketData.getPriceHistory('SPY', outputFormat='epoch')
+    np.testing.assert_array_equal(df_epoch['datetime'].to_numpy(), datetimes)
+    assert df_epoch['sessionDate'].dt.strftime('%Y-%m-%d').tolist() == expected['date'].tolist()
+
+    df_index = marketData.getPriceHistory('SPY', outputFormat='index')
+    assert str(df_index.index.tz) == 'US/Eastern'
+    assert df_index.index.strftime('%H:%M:%S %Z%z').tolist() == expected['time'].tolist()
+
+def test_failed_request_is_reported_once(marketData, jsonServer, capsys):
+    jsonServer.failures['/pricehistory'] = [404]
+    assert marketData.getPriceHistory('SPY').empty
+    output = capsys.readouterr().out
+    assert output.count('\n') == 1
+    assert 'SPY' in output and '404' in output
@@ -0,0 +1,60 @@
+import threading
+import time
+from schwab_python_api.rate_limiter import RequestScheduler, TokenBucket
+
+def test_token_bucket_refills_at_rate_up_to_burst():
+    bucket = TokenBucket(requestsPerMinute=60, burst=5)
+    bucket.updated = now = 1000.0
+    bucket.tokens = 0.0
+
+    bucket.refill(now + 2.5)
+    assert bucket.tokens == 2.5
+    assert bucket.secondsUntilToken() == 0.0
+
+    bucket.refill(now + 100)
+    assert bucket.tokens == 5
+
+    bucket.tokens = 0.25
+    assert bucket.secondsUntilToken() == 0.75
+
+def test_scheduler_maps_urls_to_api_families():
+    scheduler = RequestScheduler()
+    assert scheduler.getApiFamily('https://api.schwabapi.com/marketdata/v1/quotes') == 'marketdata'
+    assert scheduler.getApiFamily('https://api.schwabapi.com/trader/v1/accounts') == 'trader'
+    assert scheduler.getApiFamily('https://api.schwabapi.com/v1/oauth/token') is None
+
+def test_scheduler_serves_higher_priority_first():
+    scheduler = RequestScheduler(quotas={'marketdata': {'requestsPerMinute': 240, 'burst': 1}})
+    # Drain the burst so every later request waits in the queue
+    scheduler.acquire('marketdata')
+
+    served = []
+    lock = threading.Lock()
+
+    def request(name, priority):
+        scheduler.acquire('marketdata', priority)
+        with lock:
+            served.append(name)
+
+    threads = []
+    for name, priority in [('low1', RequestScheduler.PRIORITY_LOW), ('low2', RequestScheduler.PRIORITY_LOW), ('normal', RequestScheduler.PRIORITY_NORMAL), ('high', RequestScheduler.PRIORITY_HIGH)]:
+        thread = threading.Thread(target=request, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        # Queue the requests in this order before the next token arrives
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert served == ['high', 'normal', 'low1', 'low2']
+    metrics = scheduler.getMetrics()['marketdata']
+    assert metrics['requests'] == 5
+    assert metrics['maxQueueDepth'] == 4
+    assert metrics['byPriority'][RequestScheduler.PRIORITY_LOW]['requests'] == 2
+
+def test_unscheduled_requests_do_not_use_tokens(clients, mockServer):
+    auth, marketData, accounts = clients
+    scheduler = auth.transport.scheduler
+    accounts.getAccountNumbers()
+    auth.transport.get(f"{mockServer.baseUrl}/trader/v1/accounts/accountNumbers", scheduled=False)
+    assert scheduler.metrics['trader']['requests'] == 1
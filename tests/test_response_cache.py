@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pytest
+from schwab_python_api.market_data import MarketData
+from schwab_python_api.response_cache import ResponseCache, secondsUntilNextSession
+
+class StubResponse:
+    def __init__(self, status_code=200, content=b'{}'):
+        self.status_code = status_code
+        self.content = content
+
+def test_responses_are_cached_until_their_ttl():
+    cache = ResponseCache(ttls={'quotes': 0.05})
+    first = cache.get('quotes', 'url', {'symbols': 'SPY'}, StubResponse)
+    assert cache.get('quotes', 'url', {'symbols': 'SPY'}, StubResponse) is first
+    assert cache.get('quotes', 'url', {'symbols': 'QQQ'}, StubResponse) is not first
+    time.sleep(0.06)
+    assert cache.get('quotes', 'url', {'symbols': 'SPY'}, StubResponse) is not first
+    assert cache.getStats()['hits'] == 1
+
+def test_uncached_endpoints_and_failures_are_not_stored():
+    cache = ResponseCache()
+    cache.get('chains', 'url', None, StubResponse)
+    cache.get('quotes', 'url', None, lambda: StubResponse(500))
+    stats = cache.getStats()
+    assert stats['entries'] == 0
+    assert stats['uncacheable'] == 2
+
+def test_concurrent_requests_are_coalesced():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return StubResponse()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('chains', 'url', None, fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache.getStats()['coalesced'] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_failed_fetch_is_raised_to_every_waiter():
+    cache = ResponseCache()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise ConnectionError('down')
+
+    errors = []
+    def request():
+        try:
+            cache.get('quotes', 'url', None, fetch)
+        except ConnectionError as Error:
+            errors.append(Error)
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while cache.getStats()['coalesced'] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    with pytest.raises(ConnectionError):
+        cache.get('quotes', 'url', None, fetch)
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(maxBytes=10)
+    for symbol in ['A', 'B', 'C']:
+        cache.get('quotes', 'url', {'symbols': symbol}, lambda: StubResponse(content=b'12345'))
+    stats = cache.getStats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == 10
+
+def test_seconds_until_next_session_skips_weekends():
+    eastern = ZoneInfo('US/Eastern')
+    assert secondsUntilNextSession(datetime(2024, 6, 14, 9, 0, tzinfo=eastern)) == 1800
+    # Friday after the open waits for Monday
+    assert secondsUntilNextSession(datetime(2024, 6, 14, 10, 0, tzinfo=eastern)) == (3 * 24 - 0.5) * 3600
+
+def test_market_data_uses_the_cache(auth, jsonServer):
+    jsonServer.responses['/quotes'] = (200, {'SPY': {'quote': {'lastPrice': 1.0}}})
+    marketData = MarketData(auth, cache=ResponseCache())
+    marketData.baseUrl = jsonServer.baseUrl
+    assert marketData.getQuotes(['SPY']) == marketData.getQuotes(['SPY'])
+    assert len(jsonServer.requests) == 1
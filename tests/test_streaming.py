@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from schwab_python_api.streaming import StreamerClient
+from tests.replay_streamer import ReplayStreamerServer
+
+STREAMER_INFO = {
+    'schwabClientCustomerId': 'customer',
+    'schwabClientCorrelId': 'correl',
+    'schwabClientChannel': 'N9',
+    'schwabClientFunctionId': 'APIAPP',
+    'streamerSocketUrl': 'ws://unused',
+}
+
+class StubAuth:
+    def getAccessToken(self, minimumValidity=None):
+        return 'token'
+
+def equityFrames(count):
+    return [{'data': [{'service': 'LEVELONE_EQUITIES', 'timestamp': i, 'content': [{'key': 'AAPL', '1': 100.0 + i, '2': 101.0 + i}]}]} for i in range(count)]
+
+async def replay(frames, queueSize=10000, abortCode=None, consume=False, callback=None):
+    """
+    Replay frames into a StreamerClient and return the client, the updates its iterator produced and the error run raised.
+    """
+    server = await ReplayStreamerServer(frames, abortCode=abortCode).start()
+    client = StreamerClient(StubAuth(), streamerInfo=STREAMER_INFO, streamerUrl=server.url, queueSize=queueSize)
+    try:
+        if callback is not None:
+            client.addCallback(callback)
+        await client.connect()
+        iterator = client.updates()
+        await client.subscribeEquities(['AAPL'])
+
+        received = []
+        async def collect():
+            async for update in iterator:
+                received.append(update)
+
+        collector = asyncio.ensure_future(collect()) if consume else None
+        error = None
+        try:
+            await client.run()
+        except Exception as Error:
+            error = Error
+        if collector is None:
+            await collect()
+        else:
+            await asyncio.wait_for(collector, timeout=5)
+        return client, server, received, error
+    finally:
+        await server.stop()
+
+def test_replay_applies_every_update():
+    client, server, received, error = asyncio.run(replay(equityFrames(20), consume=True))
+    assert error is None
+    assert len(received) == 20
+    assert received[-1] == ('LEVELONE_EQUITIES', 'AAPL', {'bidPrice': 119.0, 'askPrice': 120.0})
+    assert client.tables['LEVELONE_EQUITIES'].getField('AAPL', 'bidPrice') == 119.0
+    assert client.droppedUpdates == 0
+    assert [request['command'] for request in server.received] == ['LOGIN', 'SUBS']
+
+def test_slow_consumer_drops_oldest_updates():
+    client, server, received, error = asyncio.run(replay(equityFrames(20), queueSize=5))
+    assert error is None
+    # One slot holds the end of stream marker, the newest updates are kept
+    assert [changed['bidPrice'] for service, symbol, changed in received] == [116.0, 117.0, 118.0, 119.0]
+    assert client.droppedUpdates == 16
+    # The quote table is never behind, whatever the consumer dropped
+    assert client.tables['LEVELONE_EQUITIES'].getField('AAPL', 'bidPrice') == 119.0
+
+def test_aborted_stream_ends_iterators_and_raises():
+    websockets = pytest.importorskip('websockets')
+    client, server, received, error = asyncio.run(replay(equityFrames(3), abortCode=1011))
+    assert isinstance(error, websockets.exceptions.ConnectionClosedError)
+    assert len(received) == 3
+
+def test_failing_callback_does_not_stop_the_stream(capsys):
+    calls = []
+
+    def callback(service, symbol, changed):
+        calls.append(changed['bidPrice'])
+        if len(calls) == 2:
+            raise ValueError('callback failure')
+
+    client, server, received, error = asyncio.run(replay(equityFrames(5), consume=True, callback=callback))
+    assert error is None
+    assert len(calls) == 5
+    assert len(received) == 5
+    assert 'callback failure' in capsys.readouterr().out
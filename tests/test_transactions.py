@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from schwab_python_api.transactions import Transactions, TransactionStore, transactionTimeMs
+
+def transaction(activityId, time, accountNumber='1', type='TRADE'):
+    return {'activityId': activityId, 'accountNumber': accountNumber, 'time': time, 'type': type, 'status': 'VALID', 'netAmount': -10.0}
+
+BOUNDARY = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+TRANSACTIONS = [
+    transaction(1, '2024-01-02T14:29:59+0000'),
+    transaction(2, '2024-01-02T14:30:00+0000'),
+    transaction(3, '2024-01-02T09:30:00.500-0500'),
+    transaction(4, '2024-01-03T10:00:00+0000', type='DIVIDEND_OR_INTEREST'),
+    transaction(5, '2024-01-02T14:30:00+0000', accountNumber='2'),
+]
+
+def activityIds(transactions):
+    return [transaction['activityId'] for transaction in transactions]
+
+def test_transaction_time_parsing():
+    assert transactionTimeMs('2024-01-02T14:30:00+0000') == int(BOUNDARY.timestamp() * 1000)
+    assert transactionTimeMs('2024-01-02T09:30:00.500-0500') == int(BOUNDARY.timestamp() * 1000) + 500
+    assert transactionTimeMs('2024-01-02T14:30:00Z') == int(BOUNDARY.timestamp() * 1000)
+    assert transactionTimeMs(None) is None
+
+def test_read_boundaries_are_start_inclusive_end_exclusive(tmp_path):
+    store = TransactionStore(str(tmp_path / 'transactions.db'))
+    store.upsert(TRANSACTIONS)
+
+    assert activityIds(store.read(accountNumber='1', startDate=BOUNDARY)) == [2, 3, 4]
+    assert activityIds(store.read(accountNumber='1', endDate=BOUNDARY)) == [1]
+    assert activityIds(store.read(startDate=BOUNDARY, endDate=BOUNDARY + timedelta(seconds=1))) == [2, 5, 3]
+    assert activityIds(store.read(types=['DIVIDEND_OR_INTEREST'])) == [4]
+    store.close()
+
+def test_upsert_counts_new_transactions_and_replaces_existing(tmp_path):
+    store = TransactionStore(str(tmp_path / 'transactions.db'))
+    assert store.upsert(TRANSACTIONS) == len(TRANSACTIONS)
+
+    updated = dict(TRANSACTIONS[0], status='CANCELED')
+    assert store.upsert([updated, transaction(6, '2024-01-04T00:00:00+0000')]) == 1
+    stored = {transaction['activityId']: transaction for transaction in store.read()}
+    assert stored[1]['status'] == 'CANCELED'
+    assert len(stored) == 6
+    store.close()
+
+def test_sync_state_round_trip(tmp_path):
+    store = TransactionStore(str(tmp_path / 'transactions.db'))
+    assert store.getSyncedThrough('hash') is None
+    store.setSyncedThrough('hash', BOUNDARY)
+    assert store.getSyncedThrough('hash') == BOUNDARY
+    store.close()
+
+def test_history_keeps_one_copy_per_transaction_ordered_by_utc_time(auth, jsonServer):
+    transactions = Transactions(auth)
+    transactions.baseUrl = jsonServer.baseUrl
+    # Every window gets the same response, as if each transaction sat on a window boundary
+    jsonServer.responses['/accounts/HASH1/transactions'] = (200, [
+        transaction(1, '2024-01-02T14:29:59+0000'),
+        transaction(2, '2024-01-02T09:30:00.500-0500'),
+        transaction(None, '2024-01-02T14:30:00+0000', type='JOURNAL'),
+        transaction(None, '2024-01-02T14:30:00+0000', type='MEMORANDUM'),
+    ])
+
+    history = transactions.getTransactionHistory(['HASH1'], BOUNDARY - timedelta(days=3), endDate=BOUNDARY + timedelta(days=3), windowDays=1)
+    rows = history['HASH1']
+    assert activityIds(rows) == [1, None, None, 2]
+    assert [row['type'] for row in rows[1:3]] == ['JOURNAL', 'MEMORANDUM']
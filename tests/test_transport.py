@@ -0,0 +1,76 @@
+import pytest
+from schwab_python_api.market_data import BulkRequestError, MarketData
+from schwab_python_api.transport import RequestError, SchwabTransport, callWithRetries
+
+def test_requests_reuse_pooled_connections(jsonServer):
+    transport = SchwabTransport(poolMaxSize=2)
+    for _ in range(5):
+        assert transport.get(f"{jsonServer.baseUrl}/quotes").status_code == 200
+
+    stats = transport.getHostStats(jsonServer.baseUrl)
+    assert stats['requests'] == 5
+    assert stats['connections'] == 1
+    assert stats['reused'] == 4
+    assert stats['reuseRatio'] == 0.8
+    transport.close()
+
+def test_host_stats_are_none_before_the_first_request(jsonServer):
+    assert SchwabTransport().getHostStats(jsonServer.baseUrl) is None
+
+def failing(statusCodes):
+    calls = []
+
+    def function():
+        calls.append(len(calls))
+        if len(calls) <= len(statusCodes):
+            raise RequestError('failed', statusCodes[len(calls) - 1])
+        return 'ok'
+
+    return function, calls
+
+def test_client_errors_are_not_retried():
+    function, calls = failing([404])
+    with pytest.raises(RequestError) as raised:
+        callWithRetries(function, 3, 'request', backoffSeconds=0)
+    assert raised.value.statusCode == 404
+    assert len(calls) == 1
+
+def test_rate_limits_and_server_errors_are_retried():
+    function, calls = failing([429, 503])
+    assert callWithRetries(function, 3, 'request', backoffSeconds=0) == 'ok'
+    assert len(calls) == 3
+
+def test_retries_give_up_with_the_last_status():
+    function, calls = failing([503, 503, 502])
+    with pytest.raises(RequestError) as raised:
+        callWithRetries(function, 2, 'request', backoffSeconds=0)
+    assert raised.value.statusCode == 502
+    assert len(calls) == 3
+
+def test_bulk_quotes_report_failed_symbols(auth, jsonServer):
+    symbols = [f"S{i:03d}" for i in range(10)]
+    jsonServer.responses['/quotes'] = (200, lambda params: {symbol: {'assetMainType': 'EQUITY', 'quote': {'lastPrice': 1.0}} for symbol in params['symbols'].split(',')})
+    marketData = MarketData(auth)
+    marketData.baseUrl = jsonServer.baseUrl
+
+    jsonServer.failures['/quotes'] = [400]
+    quotes, failedSymbols = marketData.getQuotesBulk(symbols, maxSymbolsPerBatch=5, maxWorkers=1, returnFailed=True)
+    assert len(failedSymbols) == 5
+    assert sorted(list(quotes.index) + failedSymbols) == symbols
+
+    jsonServer.failures['/quotes'] = [400]
+    with pytest.raises(BulkRequestError) as raised:
+        marketData.getQuotesBulk(symbols, maxSymbolsPerBatch=5, maxWorkers=1)
+    assert raised.value.statusCode == 400
+    assert len(raised.value.failedSymbols) == 5
+
+def test_bulk_quote_batches_are_retried(auth, jsonServer):
+    symbols = ['AAPL', 'MSFT']
+    jsonServer.responses['/quotes'] = (200, {symbol: {'assetMainType': 'EQUITY', 'quote': {'lastPrice': 1.0}} for symbol in symbols})
+    jsonServer.failures['/quotes'] = [503]
+    marketData = MarketData(auth)
+    marketData.baseUrl = jsonServer.baseUrl
+
+    quotes = marketData.getQuotesBulk(symbols, retries=1)
+    assert list(quotes.index) == symbols
+    assert len(jsonServer.requests) == 2
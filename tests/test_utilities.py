@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from schwab_python_api.accounts import Accounts
+from schwab_python_api.utilities import Utilities, parseOsiSymbol
+
+def test_parse_osi_symbol():
+    root, expiry, callPut, strike = parseOsiSymbol('AAPL  240621C00190000')
+    assert (root, expiry, callPut, strike) == ('AAPL', np.datetime64('2024-06-21'), 'C', 190.0)
+
+def test_parse_osi_symbol_keeps_legacy_forms():
+    assert parseOsiSymbol('SPXW240621P05432500')[:3] == ('SPXW', np.datetime64('2024-06-21'), 'P')
+    assert parseOsiSymbol('SPXW240621P05432500')[3] == 5432.5
+    assert parseOsiSymbol('XYZ   240621S00010000')[2] == 'S'
+    assert parseOsiSymbol('240621C00010000')[0] is None
+
+def test_parse_osi_symbol_rejects_non_contracts():
+    for symbol in ['SPY', None, np.nan]:
+        root, expiry, callPut, strike = parseOsiSymbol(symbol)
+        assert root is None and callPut is None
+        assert np.isnat(expiry) and np.isnan(strike)
+
+def test_parse_osi_symbols_columns():
+    symbols = pd.Series(['AAPL  240621C00190000', 'SPY', 'AAPL  240621C00190000'], index=[3, 5, 7])
+    contracts = Utilities().parseOsiSymbols(symbols)
+    assert list(contracts.columns) == ['root', 'expiry', 'callPut', 'strike']
+    assert list(contracts.index) == [3, 5, 7]
+    assert contracts['expiry'].dtype.kind == 'M'
+    assert pd.isna(contracts['expiry'].iloc[1]) and np.isnan(contracts['strike'].iloc[1])
+    assert contracts['strike'].tolist()[::2] == [190.0, 190.0]
+    assert list(Utilities().parseOsiSymbols(symbols, fields=['strike']).columns) == ['strike']
+
+def test_extract_options_contract_specifications_matches_original_format():
+    df = pd.DataFrame({'symbol': ['AAPL  240621C00190000', 'SPY']})
+    df = Utilities().extractOptionsContractSpecifications(df)
+    assert df['expiry'].iloc[0] == '21-Jun-24'
+    assert df['strikePrice'].iloc[0] == 190.0
+    assert pd.isna(df['expiry'].iloc[1])
+
+def test_format_positions(auth):
+    data = {'securitiesAccount': {'positions': [
+        {'instrument': {'symbol': 'AAPL  240621C00190000', 'underlyingSymbol': 'AAPL', 'putCall': 'CALL', 'assetType': 'OPTION'}, 'longQuantity': 2, 'shortQuantity': 0},
+        {'instrument': {'symbol': 'SPY', 'assetType': 'EQUITY'}, 'longQuantity': 10, 'shortQuantity': 0},
+    ]}}
+    df_positions = Accounts(auth).formatPositions(data)
+    option = df_positions.iloc[0]
+    assert option['contractSpec'] == 'AAPL  240621C00190000'
+    assert option['expiry'] == pd.Timestamp('2024-06-21')
+    assert option['strikePrice'] == 190.0
+    assert pd.isna(df_positions['expiry'].iloc[1])
+    assert df_positions['symbol'].tolist() == ['AAPL', 'SPY']
+    assert df_positions['quantity'].tolist() == [2, 10]
+
+def test_format_positions_without_positions(auth):
+    assert Accounts(auth).formatPositions({'securitiesAccount': {}}).empty